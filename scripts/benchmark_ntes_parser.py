@@ -0,0 +1,237 @@
+"""
+Micro-benchmark: single-pass NTES parser vs. the previous multi-pass parser.
+
+Runs both parsers over recorded NTES running-status pages, checks that they
+produce identical output and prints per-page timings.
+
+Usage:
+    python scripts/benchmark_ntes_parser.py [PAGES_DIR] [--iterations N]
+"""
+import argparse
+import os
+import re
+import sys
+import time
+from datetime import datetime as dt
+from pathlib import Path
+from typing import Dict, List, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.scheduling.ntes_parser import parse_ntes_running_status
+
+DEFAULT_PAGES_DIR = Path(__file__).parent.parent / "data" / "ntes_samples"
+
+
+class LegacyNTESParser:
+    """Reference copy of the parser IndianRailwaysAPI used before the single-pass rewrite."""
+
+    def _parse_ntes_train_status_html(self, html_text: str) -> Dict:
+        """Parse NTES HTML into structured train status data."""
+        # Extract status lines
+        text = self._strip_html_tags(html_text)
+        lines = [ln.strip() for ln in text.splitlines() if ln.strip()]
+
+        # Keywords for status lines
+        keywords = [
+            "Arrived", "Arrive", "Arriving", "Departed", "Depart", "Departure",
+            "On Time", "Yet to start", "Reached Destination", "Current Position",
+            "Last Updates On", "Start Date"
+        ]
+
+        status_lines = []
+        for ln in lines:
+            lnl = ln.lower()
+            for kw in keywords:
+                if kw.lower() in lnl:
+                    status_lines.append(ln)
+                    break
+
+        # Remove duplicates
+        seen = set()
+        unique_lines = []
+        for line in status_lines:
+            if line not in seen:
+                unique_lines.append(line)
+                seen.add(line)
+
+        # Parse last update time
+        last_update = self._parse_last_update_time(unique_lines)
+
+        # Parse start date
+        start_date = self._parse_start_date(unique_lines)
+
+        # Parse events
+        events = self._parse_train_events(unique_lines, last_update)
+
+        return {
+            'train_number': None,  # Will be set by caller
+            'start_date': start_date,
+            'last_update': last_update,
+            'events': events,
+            'raw_status': unique_lines[:5]  # First 5 status lines
+        }
+
+    def _strip_html_tags(self, html_text: str) -> str:
+        """Strip HTML tags and scripts from text."""
+        # Remove scripts and styles
+        html_text = re.sub(r"(?is)<script.*?>.*?</script>", "", html_text)
+        html_text = re.sub(r"(?is)<style.*?>.*?</style>", "", html_text)
+        # Remove HTML tags
+        return re.sub(r"<[^>]+>", "", html_text)
+
+    def _parse_last_update_time(self, lines: List[str]) -> Optional[dt]:
+        """Parse last update timestamp from status lines."""
+        for ln in lines:
+            match = re.search(
+                r"Last Updates On\s*(?P<date>\d{1,2}-[A-Za-z]{3}-\d{4})(?:\s+(?P<time>\d{1,2}:\d{2}))?",
+                ln, flags=re.I
+            )
+            if match:
+                date = match.group("date")
+                time_str = match.group("time") or "00:00"
+                try:
+                    return dt.strptime(f"{date} {time_str}", "%d-%b-%Y %H:%M")
+                except:
+                    continue
+        return None
+
+    def _parse_start_date(self, lines: List[str]) -> Optional[str]:
+        """Parse start date from status lines."""
+        for ln in lines:
+            match = re.search(
+                r"Start Date\s*:\s*(?P<date>\d{1,2}-[A-Za-z]{3}-\d{4})",
+                ln, flags=re.I
+            )
+            if match:
+                return match.group("date")
+        return None
+
+    def _parse_train_events(self, lines: List[str], last_update: Optional[dt]) -> List[Dict]:
+        """Parse arrival/departure events from status lines."""
+        events = []
+
+        for ln in lines:
+            if not re.search(r"\b(arrived|arrive|arriving|departed|depart|departure)\b", ln, flags=re.I):
+                continue
+
+            event = {
+                'raw': ln,
+                'type': None,
+                'station': None,
+                'code': None,
+                'datetime': None,
+                'delay': None
+            }
+
+            # Parse delay
+            delay_match = re.search(r"Delay[:\-\s]*\(?\s*(?:Delay\s*)?([0-9:]{1,5})\)?", ln, flags=re.I)
+            if delay_match:
+                event['delay'] = delay_match.group(1)
+
+            # Parse station and type
+            station_match = re.search(
+                r"\b(Departed|Arrived)\b\s+(?:from|at)\s+(?P<station>[^()]+?)\s*\(\s*(?P<code>[A-Z0-9]{1,6})\s*\)",
+                ln, flags=re.I
+            )
+
+            if station_match:
+                event['type'] = station_match.group(1).title()
+                event['station'] = station_match.group("station").strip()
+                event['code'] = station_match.group("code").strip()
+
+                # Parse datetime
+                time_match = re.search(r"(\d{1,2}:\d{2})", ln)
+                date_match = re.search(r"(\d{1,2}-[A-Za-z]{3}(?:-\d{4})?)", ln)
+
+                event['datetime'] = self._build_event_datetime(
+                    date_part=date_match.group(1) if date_match else None,
+                    time_part=time_match.group(1) if time_match else None,
+                    last_update=last_update
+                )
+
+                if event['type'] and event['station']:
+                    events.append(event)
+
+        # Remove duplicates
+        seen = set()
+        unique_events = []
+        for event in events:
+            key = (event.get('type'), event.get('station'), event.get('datetime'))
+            if key not in seen:
+                unique_events.append(event)
+                seen.add(key)
+
+        return unique_events
+
+    def _build_event_datetime(self, date_part: Optional[str], time_part: Optional[str], last_update: Optional[dt]) -> Optional[dt]:
+        """Build datetime object for train event."""
+        time_part = time_part or "00:00"
+
+        if date_part:
+            if re.match(r"\d{1,2}-[A-Za-z]{3}-\d{4}$", date_part):
+                date_str = date_part
+            else:
+                year = last_update.year if last_update else dt.now().year
+                date_str = f"{date_part}-{year}"
+
+            try:
+                return dt.strptime(f"{date_str} {time_part}", "%d-%b-%Y %H:%M")
+            except:
+                pass
+
+        if last_update:
+            try:
+                return dt.strptime(
+                    f"{last_update.strftime('%d-%b-%Y')} {time_part}",
+                    "%d-%b-%Y %H:%M"
+                )
+            except:
+                pass
+
+        return None
+
+
+def _time_per_call(func, html_text: str, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        func(html_text)
+    return (time.perf_counter() - start) / iterations
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("pages_dir", nargs="?", default=str(DEFAULT_PAGES_DIR))
+    parser.add_argument("--iterations", type=int, default=500)
+    args = parser.parse_args()
+
+    pages = sorted(Path(args.pages_dir).glob("*.html"))
+    if not pages:
+        print(f"No recorded .html pages found in {args.pages_dir}")
+        return 1
+
+    legacy = LegacyNTESParser()
+    total_legacy = total_new = 0.0
+
+    print(f"{'page':40s} {'legacy us':>12s} {'single-pass us':>15s} {'speedup':>8s}")
+    for page in pages:
+        html_text = page.read_text(encoding="utf-8", errors="replace")
+
+        expected = legacy._parse_ntes_train_status_html(html_text)
+        actual = parse_ntes_running_status(html_text)
+        if expected != actual:
+            print(f"MISMATCH on {page.name}")
+            return 1
+
+        t_legacy = _time_per_call(legacy._parse_ntes_train_status_html, html_text, args.iterations)
+        t_new = _time_per_call(parse_ntes_running_status, html_text, args.iterations)
+        total_legacy += t_legacy
+        total_new += t_new
+        print(f"{page.name[:40]:40s} {t_legacy * 1e6:12.1f} {t_new * 1e6:15.1f} {t_legacy / t_new:7.2f}x")
+
+    print(f"{'TOTAL':40s} {total_legacy * 1e6:12.1f} {total_new * 1e6:15.1f} {total_legacy / total_new:7.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
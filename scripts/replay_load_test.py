@@ -0,0 +1,76 @@
+"""
+Offline load test of the railway client stack against recorded responses.
+
+Serves fixtures recorded with RAILWAY_HTTP_MODE=record through the replay
+adapter (no network), drives IndianRailwaysAPI from a thread pool and prints
+throughput and latency percentiles plus replay/cache statistics.
+
+Usage:
+    python scripts/replay_load_test.py [FIXTURES_DIR] [--trains 12951 12301]
+        [--requests 500] [--workers 16] [--latency-ms 40 120] [--error-rate 0.05]
+        [--max-rps 200] [--no-cache]
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.scheduling.indian_railways_api import IndianRailwaysAPI
+from src.scheduling.ntes_session import NTESSession
+from src.scheduling.replay import DEFAULT_FIXTURES_DIR, FixtureStore, replay_transport
+from src.scheduling.response_cache import DEFAULT_TTLS, ResponseCache
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100.0 * (len(ordered) - 1))))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("fixtures_dir", nargs="?", default=str(DEFAULT_FIXTURES_DIR))
+    parser.add_argument("--trains", nargs="+", default=["12951", "12301", "12002"])
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=16)
+    parser.add_argument("--latency-ms", type=float, nargs=2, default=(0.0, 0.0), metavar=("MIN", "MAX"))
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--max-rps", type=float, default=None)
+    parser.add_argument("--no-cache", action="store_true", help="disable the response cache")
+    args = parser.parse_args()
+
+    store = FixtureStore(Path(args.fixtures_dir))
+    print(f"{len(store)} fixtures in {args.fixtures_dir}")
+
+    transport = replay_transport(
+        store, latency_s=(args.latency_ms[0] / 1000.0, args.latency_ms[1] / 1000.0),
+        error_rate=args.error_rate, max_rps=args.max_rps, seed=1
+    )
+    ttls = {endpoint: 0 for endpoint in DEFAULT_TTLS} if args.no_cache else None
+    api = IndianRailwaysAPI(transport=transport, ntes_session=NTESSession(transport=transport),
+                            cache=ResponseCache(ttls=ttls))
+
+    def one_call(index):
+        start = time.perf_counter()
+        api.get_live_train_status(args.trains[index % len(args.trains)])
+        return time.perf_counter() - start
+
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as pool:
+        latencies = list(pool.map(one_call, range(args.requests)))
+    wall = time.perf_counter() - wall_start
+
+    print(f"requests: {args.requests}  workers: {args.workers}  wall: {wall:.2f}s  "
+          f"throughput: {args.requests / wall:.1f} req/s")
+    print("latency ms: " + "  ".join(
+        f"p{pct}={_percentile(latencies, pct) * 1000:.1f}" for pct in (50, 95, 99)))
+    print(f"replay: {transport.replay.stats}")
+    print(f"cache: hit_rate={api.get_cache_stats()['hit_rate']:.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
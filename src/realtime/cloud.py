@@ -14,6 +14,8 @@ import asyncio
 from dataclasses import dataclass
 from enum import Enum
 
+from src.scheduling.metrics import MetricsRegistry, get_shared_metrics
+
 # Optional imports with graceful degradation
 try:
     import firebase_admin
@@ -469,11 +471,23 @@ class CloudIntegrationManager:
     Provides unified interface for multiple cloud providers.
     """
 
-    def __init__(self):
+    def __init__(self, metrics: Optional[MetricsRegistry] = None):
         self.services: Dict[CloudProvider, CloudService] = {}
         self.active_provider: Optional[CloudProvider] = None
         self.update_callbacks: List[Callable] = []
         self.connected = False
+        self.metrics = metrics or get_shared_metrics()
+
+    def _call(self, provider: CloudProvider, operation: str, method: Callable, *args):
+        """Run a service call, timing it into the metrics registry.
+
+        Services swallow their own exceptions, so a False result counts as a failure.
+        """
+        with self.metrics.timed(f"cloud:{provider.value}", operation) as timing:
+            result = method(*args)
+            if result is False:
+                timing.error = 'Failed'
+        return result
 
     def add_service(self, provider: CloudProvider, config: CloudConfig):
         """Add a cloud service configuration."""
@@ -498,7 +512,7 @@ class CloudIntegrationManager:
 
         service = self.services[provider]
 
-        if service.connect():
+        if self._call(provider, 'connect', service.connect):
             self.active_provider = provider
             self.connected = True
 
@@ -531,7 +545,7 @@ class CloudIntegrationManager:
             return False
 
         service = self.services[self.active_provider]
-        return service.publish_train_status(train_no, status_data)
+        return self._call(self.active_provider, 'publish_train_status', service.publish_train_status, train_no, status_data)
 
     def get_train_status(self, train_no: str) -> Optional[Dict]:
         """Get train status from cloud."""
@@ -539,7 +553,7 @@ class CloudIntegrationManager:
             return None
 
         service = self.services[self.active_provider]
-        return service.get_train_status(train_no)
+        return self._call(self.active_provider, 'get_train_status', service.get_train_status, train_no)
 
     def publish_platform_status(self, platform_no: str, status_data: Dict) -> bool:
         """Publish platform status to cloud."""
@@ -547,7 +561,7 @@ class CloudIntegrationManager:
             return False
 
         service = self.services[self.active_provider]
-        return service.publish_platform_status(platform_no, status_data)
+        return self._call(self.active_provider, 'publish_platform_status', service.publish_platform_status, platform_no, status_data)
 
     def get_platform_status(self, platform_no: str) -> Optional[Dict]:
         """Get platform status from cloud."""
@@ -555,7 +569,7 @@ class CloudIntegrationManager:
             return None
 
         service = self.services[self.active_provider]
-        return service.get_platform_status(platform_no)
+        return self._call(self.active_provider, 'get_platform_status', service.get_platform_status, platform_no)
 
     def add_update_callback(self, callback: Callable):
         """Add callback for cloud updates."""
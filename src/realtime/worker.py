@@ -13,6 +13,9 @@ import schedule
 from dataclasses import dataclass
 from enum import Enum
 
+from src.scheduling.http_transport import PooledTransport, get_shared_transport
+
+
 class WorkerStatus(Enum):
     """Background worker status."""
     STOPPED = "stopped"
@@ -206,9 +209,11 @@ class TrainStatusMonitor:
     """
 
     def __init__(self, api_base_url: str = "https://api.railwayapi.com/v2",
-                 api_key: Optional[str] = None):
+                 api_key: Optional[str] = None, transport: Optional[PooledTransport] = None):
         self.api_base_url = api_base_url
         self.api_key = api_key
+        # Shared keep-alive pools (and the record/replay harness when enabled)
+        self.transport = transport or get_shared_transport()
         self.last_status_check: Dict[str, datetime] = {}
         self.status_cache: Dict[str, Dict] = {}
         self.monitoring_trains: List[str] = []
@@ -239,7 +244,7 @@ class TrainStatusMonitor:
             if self.api_key:
                 params['key'] = self.api_key
 
-            response = requests.get(url, params=params, timeout=10)
+            response = self.transport.get('railwayapi', url, params=params)
             response.raise_for_status()
 
             data = response.json()
@@ -269,6 +274,7 @@ class TrainStatusMonitor:
         except requests.RequestException as e:
             print(f"API request failed for train {train_no}: {e}")
         except json.JSONDecodeError as e:
+            self.transport.metrics.error('railwayapi', 'live', type(e).__name__)
             print(f"JSON parsing failed for train {train_no}: {e}")
         except Exception as e:
             print(f"Status check failed for train {train_no}: {e}")
@@ -1,4 +1,4 @@
 """Repository package for data access."""
-from src.repositories.train_repository import TrainRepository
+from src.repositories.train_repository import TrainRepository, get_shared_repository
 
-__all__ = ['TrainRepository']
\ No newline at end of file
+__all__ = ['TrainRepository', 'get_shared_repository']
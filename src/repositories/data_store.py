@@ -0,0 +1,372 @@
+"""
+Process-wide, read-only railway data shared by every repository.
+
+RailwayData is one immutable load of the CSVs: the frames, the frozen
+records and every lookup index built over them. The large schedule table is
+memory-mapped (see schedule_mmap.py), so worker processes share one copy
+through the page cache; its DataFrame is only materialised if asked for.
+
+RailwayDataStore holds the current RailwayData; ``reload()`` builds a
+complete new one off to the side and then swaps the reference in a single
+assignment, so readers see either the old data or the new data, never a
+mix. A reader that keeps a reference to ``store.current`` for the length of
+a query gets a consistent view even while a reload runs.
+"""
+
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+import pandas as pd
+
+from src.repositories.record_query import sort_key
+from src.repositories.route_index import RouteIndex
+from src.repositories.schedule_mmap import MappedSchedule, open_mapped_schedule
+from src.repositories.schedule_snapshot import read_schedule_csv
+from src.repositories.suggest_index import SuggestIndex, build_suggest_index
+from src.repositories.timetable import Timetable
+from src.utils.frozen import FrozenDict, freeze
+from src.scheduling.station_index import STATION_ALIASES, StationIndex
+
+
+DATA_DIR = Path(__file__).parent.parent.parent / "data"
+
+
+def normalize_upper(value) -> Optional[str]:
+    return value.strip().upper() if isinstance(value, str) else None
+
+
+def normalize_lower(value) -> Optional[str]:
+    return value.strip().lower() if isinstance(value, str) else None
+
+
+def train_key(value) -> str:
+    """Train numbers compare as numbers ('01234' == 1234) when they are numeric."""
+    text = str(value).strip()
+    return str(int(text)) if text.isdigit() else text.upper()
+
+
+# Fields the directory views filter on, with their normalisation; counted per snapshot
+FACETS = {
+    'stations': {'state': normalize_lower, 'zone': normalize_upper, 'station_type': normalize_lower},
+    'trains': {'zone': normalize_upper},
+}
+
+
+def _group(records: Iterable[FrozenDict], key) -> Dict:
+    """Records grouped by key(record) in load order; None keys are skipped."""
+    groups: Dict = {}
+    for record in records:
+        value = key(record)
+        if value is not None:
+            groups.setdefault(value, []).append(record)
+    return {value: tuple(group) for value, group in groups.items()}
+
+
+def _records(df: Optional[pd.DataFrame]) -> Tuple[FrozenDict, ...]:
+    if df is None or df.empty:
+        return ()
+    return tuple(freeze(row) for row in df.to_dict('records'))
+
+
+def _train_record(row: Dict) -> FrozenDict:
+    """Frozen train row with its coach breakdown precomputed."""
+    row['coach_breakdown'] = {
+        'SL': int(row.get('sl_coaches', 0)),
+        'AC2': int(row.get('ac2_coaches', 0)),
+        'AC3': int(row.get('ac3_coaches', 0)),
+        'FC': int(row.get('fc_coaches', 0))
+    }
+    return freeze(row)
+
+
+class RailwayData:
+    """One immutable load of the station, train and schedule data plus its indexes.
+
+    The frames are shared by every reader and must be treated as read-only.
+    """
+
+    def __init__(self, stations_df: Optional[pd.DataFrame] = None,
+                 trains_df: Optional[pd.DataFrame] = None,
+                 schedule_df: Optional[pd.DataFrame] = None,
+                 data_path: Path = DATA_DIR, version: int = 0,
+                 routes: Optional[Union[RouteIndex, MappedSchedule]] = None):
+        self.data_path = data_path
+        self.version = version
+        self.loaded_at = time.time()
+        self.stations_df = stations_df if stations_df is not None else pd.DataFrame()
+        self.trains_df = trains_df if trains_df is not None else pd.DataFrame()
+        self._schedule_df = schedule_df
+        self._timetable: Optional[Timetable] = None
+        self._suggest_index: Optional[SuggestIndex] = None
+        self._station_index: Optional[StationIndex] = None
+        self._schedule_stations: Optional[Dict[str, FrozenDict]] = None
+        self._schedule_trains: Optional[Dict[str, FrozenDict]] = None
+        self._orders: Dict[Tuple[str, str, bool], Tuple[FrozenDict, ...]] = {}
+        self._frame_lock = threading.Lock()
+        self._build_indexes()
+
+        # Contiguous SEQ-ordered stop slices per train (mapped, or over the schedule frame)
+        self.routes = routes if routes is not None else RouteIndex(schedule_df)
+
+    @property
+    def schedule_df(self) -> pd.DataFrame:
+        """Schedule as a DataFrame; a mapped schedule is converted on first access only."""
+        if self._schedule_df is None:
+            with self._frame_lock:
+                if self._schedule_df is None:
+                    mapped = isinstance(self.routes, MappedSchedule)
+                    self._schedule_df = self.routes.to_frame() if mapped else pd.DataFrame()
+        return self._schedule_df
+
+    @property
+    def timetable(self) -> Timetable:
+        """Journey-planner arrays over the schedule; built on first use."""
+        if self._timetable is None:
+            stop_index = self.routes.stop_index()
+            with self._frame_lock:
+                if self._timetable is None:
+                    self._timetable = Timetable(stop_index)
+        return self._timetable
+
+    @property
+    def schedule_stations(self) -> Dict[str, FrozenDict]:
+        """Stations found only in the schedule, as code/name records by code; built on first use."""
+        if self._schedule_stations is None:
+            records = {}
+            for code, name in self.routes.distinct('Station Code', 'Station Name'):
+                code = normalize_upper(code)
+                if code and isinstance(name, str) and code not in self.stations_by_code:
+                    records.setdefault(code, freeze({'station_code': code, 'station_name': name.strip()}))
+            with self._frame_lock:
+                if self._schedule_stations is None:
+                    self._schedule_stations = records
+        return self._schedule_stations
+
+    @property
+    def schedule_trains(self) -> Dict[str, FrozenDict]:
+        """Trains found only in the schedule, as number/name records by train_key; built on first use."""
+        if self._schedule_trains is None:
+            records = {}
+            for number, name in self.routes.distinct('Train No', 'Train Name'):
+                key = train_key(number)
+                if key and key not in self.trains_by_no:
+                    records.setdefault(key, freeze({'train_no': key,
+                                                    'train_name': name.strip() if isinstance(name, str) else ''}))
+            with self._frame_lock:
+                if self._schedule_trains is None:
+                    self._schedule_trains = records
+        return self._schedule_trains
+
+    @property
+    def suggest_index(self) -> SuggestIndex:
+        """Autocomplete over station and train records plus the schedule's; built on first use."""
+        if self._suggest_index is None:
+            index = build_suggest_index(
+                self.stations, self.trains,
+                [(code, station['station_name']) for code, station in self.schedule_stations.items()],
+                [(number, train['train_name']) for number, train in self.schedule_trains.items()],
+            )
+            with self._frame_lock:
+                if self._suggest_index is None:
+                    self._suggest_index = index
+        return self._suggest_index
+
+    @property
+    def station_index(self) -> StationIndex:
+        """Name, code and alias search over the station table plus the schedule-only stations."""
+        if self._station_index is None:
+            names = [(code, station.get('station_name')) for code, station in self.stations_by_code.items()]
+            names += [(code, station['station_name']) for code, station in self.schedule_stations.items()]
+            index = StationIndex(((code, name) for code, name in names if code and isinstance(name, str)),
+                                 STATION_ALIASES)
+            with self._frame_lock:
+                if self._station_index is None:
+                    self._station_index = index
+        return self._station_index
+
+    def station(self, code) -> Optional[FrozenDict]:
+        """Station record by code; schedule-only stations carry just their code and name."""
+        code = normalize_upper(code)
+        return self.stations_by_code.get(code) or self.schedule_stations.get(code)
+
+    def train(self, number) -> Optional[FrozenDict]:
+        """Train details by number; schedule-only trains carry just their number and name."""
+        key = train_key(number)
+        return self.trains_by_no.get(key) or self.schedule_trains.get(key)
+
+    def facet_counts(self, kind: str, field: str) -> Dict[str, int]:
+        """Records per distinct value of a FACETS field ('stations' or 'trains'), by value label."""
+        position = list(FACETS[kind]).index(field)
+        totals = Counter()
+        for combination, count in self._facet_counts[kind].items():
+            if combination[position]:
+                totals[combination[position]] += count
+        labels = self._facet_labels[kind][field]
+        return {labels[value]: totals[value] for value in sorted(totals, key=lambda value: labels[value])}
+
+    def count(self, kind: str, **filters) -> int:
+        """Records matching FACETS filters (one value or a collection each), without scanning them."""
+        fields = FACETS[kind]
+        wanted = {}
+        for field, value in filters.items():
+            if value is not None:
+                normalize = fields[field]
+                values = [value] if isinstance(value, str) else value
+                wanted[list(fields).index(field)] = {normalize(item) for item in values}
+        return sum(count for combination, count in self._facet_counts[kind].items()
+                   if all(combination[position] in values for position, values in wanted.items()))
+
+    def ordered(self, kind: str, field: str, descending: bool = False) -> Tuple[FrozenDict, ...]:
+        """'stations' or 'trains' sorted by field (missing values last); cached per snapshot."""
+        cache_key = (kind, field, descending)
+        order = self._orders.get(cache_key)
+        if order is None:
+            key = sort_key(field)
+            present = [record for record in getattr(self, kind) if not key(record)[0]]
+            missing = [record for record in getattr(self, kind) if key(record)[0]]
+            # Stable both ways: ties keep load order
+            order = tuple(sorted(present, key=key, reverse=descending) + missing)
+            with self._frame_lock:
+                order = self._orders.setdefault(cache_key, order)
+        return order
+
+    def _build_indexes(self):
+        """Freeze every row once and index it by normalised station code, train number, route, zone and state."""
+        self.stations = _records(self.stations_df)
+        self.stations_by_code: Dict[str, FrozenDict] = {}
+        for station in self.stations:
+            self.stations_by_code.setdefault(normalize_upper(station.get('station_code')), station)
+        self.stations_by_state = _group(self.stations, lambda station: normalize_lower(station.get('state')))
+        self.stations_by_zone = _group(self.stations, lambda station: normalize_upper(station.get('zone')))
+
+        self.trains = _records(self.trains_df)
+        # Train details carry a coach breakdown; list queries keep returning plain rows
+        self.trains_by_no: Dict[str, FrozenDict] = {}
+        for train in self.trains:
+            key = train_key(train.get('train_no'))
+            if key not in self.trains_by_no:
+                self.trains_by_no[key] = _train_record(dict(train))
+        self.trains_by_zone = _group(self.trains, lambda train: normalize_upper(train.get('zone')))
+        self.trains_from = _group(self.trains, lambda train: normalize_upper(train.get('from_code')))
+        self.trains_to = _group(self.trains, lambda train: normalize_upper(train.get('to_code')))
+        self.trains_by_route = _group(
+            self.trains,
+            lambda train: (normalize_upper(train.get('from_code')), normalize_upper(train.get('to_code')))
+        )
+
+        # Record count per combination of facet values, and the first spelling seen of each value
+        self._facet_counts: Dict[str, Counter] = {}
+        self._facet_labels: Dict[str, Dict[str, Dict[str, str]]] = {}
+        for kind, fields in FACETS.items():
+            combinations = Counter()
+            labels = {field: {} for field in fields}
+            for record in getattr(self, kind):
+                combination = []
+                for field, normalize in fields.items():
+                    value = normalize(record.get(field))
+                    if value:
+                        labels[field].setdefault(value, record[field].strip())
+                    combination.append(value)
+                combinations[tuple(combination)] += 1
+            self._facet_counts[kind] = combinations
+            self._facet_labels[kind] = labels
+
+    @classmethod
+    def load(cls, data_path: Union[str, Path] = DATA_DIR, version: int = 0) -> 'RailwayData':
+        """Read the CSVs under data_path; missing or unreadable files load as empty."""
+        data_path = Path(data_path)
+        stations_df = trains_df = schedule_df = routes = None
+        try:
+            stations_file = data_path / "indian_stations.csv"
+            trains_file = data_path / "trains_with_coaches.csv"
+            schedule_file = data_path / "Train_details_22122017.csv"
+
+            if stations_file.exists():
+                stations_df = pd.read_csv(stations_file)
+
+            if trains_file.exists():
+                trains_df = pd.read_csv(trains_file)
+
+            # Load detailed schedule data
+            if schedule_file.exists():
+                try:
+                    # Shared read-only mapping; built from the CSV only when it changed
+                    routes = open_mapped_schedule(schedule_file)
+                    print(f"✓ Mapped {len(routes.rows)} schedule entries from Train_details_22122017.csv")
+                except OSError as e:
+                    # e.g. a read-only data directory: fall back to a private in-memory copy
+                    print(f"Schedule mapping unavailable ({e}); loading into memory")
+                    schedule_df = read_schedule_csv(schedule_file)
+                    print(f"✓ Loaded {len(schedule_df)} schedule entries from Train_details_22122017.csv")
+
+        except Exception as e:
+            print(f"Error loading data: {e}")
+            stations_df = trains_df = schedule_df = routes = None
+
+        return cls(stations_df, trains_df, schedule_df, data_path, version, routes)
+
+
+class RailwayDataStore:
+    """Holder of the current RailwayData, loaded on first use and swapped atomically on reload."""
+
+    def __init__(self, data_path: Union[str, Path] = DATA_DIR):
+        self.data_path = Path(data_path)
+        self._current: Optional[RailwayData] = None
+        self._reload_lock = threading.Lock()
+        self.stats = {'loads': 0, 'last_load_s': 0.0}
+
+    @property
+    def current(self) -> RailwayData:
+        """The live snapshot; hold on to it for the duration of one query."""
+        if self._current is None:
+            with self._reload_lock:
+                if self._current is None:
+                    self._current = self._load()
+        return self._current
+
+    def _load(self) -> RailwayData:
+        start = time.perf_counter()
+        previous = self._current
+        data = RailwayData.load(self.data_path, version=previous.version + 1 if previous else 1)
+        self.stats['loads'] += 1
+        self.stats['last_load_s'] = round(time.perf_counter() - start, 3)
+        return data
+
+    def reload(self) -> RailwayData:
+        """Build a new snapshot from disk and swap it in; readers never block on the load."""
+        with self._reload_lock:
+            data = self._load()
+            self._current = data  # single reference assignment: the swap is atomic
+        return data
+
+    def swap(self, data: RailwayData):
+        """Install an already built snapshot (e.g. from another source)."""
+        with self._reload_lock:
+            self._current = data
+
+    def get_stats(self) -> Dict:
+        data = self._current
+        return {
+            **self.stats,
+            'version': data.version if data else 0,
+            'stations': len(data.stations) if data else 0,
+            'trains': len(data.trains) if data else 0,
+            'scheduled_trains': len(data.routes) if data else 0,
+        }
+
+
+_shared_store: Optional[RailwayDataStore] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_data_store() -> RailwayDataStore:
+    """Process-wide store every TrainRepository borrows from."""
+    global _shared_store
+    if _shared_store is None:
+        with _shared_lock:
+            if _shared_store is None:
+                _shared_store = RailwayDataStore()
+    return _shared_store
@@ -0,0 +1,119 @@
+"""
+Filtered, sorted and paginated scans over the shared record tuples.
+
+A listing is a lazy scan of one base sequence (the records in load order,
+a per-station or per-zone index group, or a cached sorted order) that
+yields (position, record) for the records matching every filter. Pages
+take limit + 1 matches from the scan and stop there. The cursor they hand
+back is the snapshot version plus the base position to resume from, so the
+next page starts where the last one ended instead of re-filtering from the
+top. A cursor only makes sense with the same filters and sort; one from an
+older snapshot is rejected rather than silently skipping or repeating rows.
+"""
+
+import math
+import numbers
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+
+Predicate = Callable[[Dict], bool]
+
+# Checked in order, so the more specific names come first
+TRAIN_TYPES = (
+    'Vande Bharat', 'Rajdhani', 'Jan Shatabdi', 'Shatabdi', 'Duronto', 'Garib Rath',
+    'Humsafar', 'Sampark Kranti', 'Intercity', 'Superfast', 'Mail', 'Express', 'Passenger',
+)
+
+
+def train_type(name) -> str:
+    """Service type from a train name ('Howrah Rajdhani' -> 'Rajdhani'); 'Other' if none matches."""
+    if isinstance(name, str):
+        lowered = name.lower()
+        for kind in TRAIN_TYPES:
+            if kind.lower() in lowered:
+                return kind
+    return 'Other'
+
+
+def sort_key(field: str) -> Callable[[Dict], Tuple]:
+    """Key for sorting records by field with missing (None/NaN) values last.
+
+    A column mixing types (platform '2' and 2, a stray 'NA') still sorts:
+    numbers come before everything else, which compares as text.
+    """
+    def key(record: Dict) -> Tuple:
+        value = record.get(field)
+        if value is None or (isinstance(value, numbers.Real) and math.isnan(value)):
+            return (True, 0, 0)
+        if isinstance(value, numbers.Real):
+            return (False, 0, value)
+        return (False, 1, value if isinstance(value, str) else str(value))
+    return key
+
+
+def value_filter(field: str, wanted, normalize: Callable) -> Optional[Predicate]:
+    """Records whose normalised field is wanted (one value or a collection); None if not filtering."""
+    if wanted is None:
+        return None
+    values = {normalize(wanted)} if isinstance(wanted, str) else {normalize(value) for value in wanted}
+    return lambda record: normalize(record.get(field)) in values
+
+
+def train_type_filter(wanted) -> Optional[Predicate]:
+    """Trains whose type (see train_type) is wanted, one type or a collection; None if not filtering."""
+    if wanted is None:
+        return None
+    types = {wanted.lower()} if isinstance(wanted, str) else {kind.lower() for kind in wanted}
+    return lambda record: train_type(record.get('train_name')).lower() in types
+
+
+def range_filter(field: str, low=None, high=None) -> Optional[Predicate]:
+    """Records whose numeric field lies in [low, high]; None if not filtering."""
+    if low is None and high is None:
+        return None
+
+    def predicate(record: Dict) -> bool:
+        try:
+            value = float(record.get(field))
+        except (TypeError, ValueError):
+            return False
+        return (low is None or value >= low) and (high is None or value <= high)
+    return predicate
+
+
+def scan(base: Sequence[Dict], predicates: Iterable[Optional[Predicate]],
+         start: int = 0) -> Iterator[Tuple[int, Dict]]:
+    """(position, record) for each record of base from start on that passes every predicate."""
+    checks = [predicate for predicate in predicates if predicate is not None]
+    for position in range(start, len(base)):
+        record = base[position]
+        if all(check(record) for check in checks):
+            yield position, record
+
+
+def encode_cursor(version: int, position: int) -> str:
+    return f"{version}:{position}"
+
+
+def decode_cursor(cursor: str, version: int) -> int:
+    """Resume position of a cursor; ValueError if malformed or from another snapshot."""
+    try:
+        cursor_version, position = (int(part) for part in str(cursor).split(':'))
+    except ValueError:
+        raise ValueError(f"Malformed cursor: {cursor!r}")
+    if cursor_version != version or position < 0:
+        raise ValueError("Cursor is from an older data snapshot; restart the listing")
+    return position
+
+
+def page(matches: Iterator[Tuple[int, Dict]], limit: int, version: int) -> Dict:
+    """One page from a scan: up to limit items, and a cursor when more remain."""
+    items: List[Dict] = []
+    next_cursor = None
+    for position, record in matches:
+        if len(items) >= limit:
+            next_cursor = encode_cursor(version, position)
+            break
+        items.append(record)
+    return {'items': items, 'count': len(items), 'has_more': next_cursor is not None,
+            'next_cursor': next_cursor}
@@ -0,0 +1,168 @@
+"""
+Per-train route index over the station-by-station schedule.
+
+The schedule frame is sorted once by (train, SEQ) into shared column
+arrays; every train owns a contiguous [start, end) slice of them, found
+through a dict of offsets. A route is therefore a set of array views
+(codes, times, distances) rather than a filter over ~186k rows, and the
+record lists handed to callers are built from those views the first time a
+train is asked for and shared (read-only) afterwards.
+"""
+
+import threading
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from src.repositories.stop_index import StopIndex
+from src.utils.frozen import FrozenDict, FrozenList
+
+
+TRAIN_COLUMN = 'Train No'
+SEQ_COLUMN = 'SEQ'
+
+
+def _route_key(train_no) -> Optional[int]:
+    try:
+        return int(str(train_no).strip())
+    except ValueError:
+        return None
+
+
+class RouteIndex:
+    """SEQ-ordered route slices per train, with offsets into shared columns."""
+
+    def __init__(self, schedule_df: Optional[pd.DataFrame] = None):
+        self.columns: Dict[str, np.ndarray] = {}
+        self.categories: Dict[str, np.ndarray] = {}
+        self.offsets: Dict[int, Tuple[int, int]] = {}
+        self._records: Dict[int, FrozenList] = {}
+        self._stops: Dict[int, FrozenList] = {}
+        self._stop_index: Optional[StopIndex] = None
+        self._lock = threading.Lock()
+        if schedule_df is not None and not schedule_df.empty and TRAIN_COLUMN in schedule_df.columns:
+            self._build(schedule_df)
+
+    def _build(self, df: pd.DataFrame):
+        trains = pd.to_numeric(df[TRAIN_COLUMN], errors='coerce').fillna(-1).to_numpy(dtype=np.int64)
+        if SEQ_COLUMN in df.columns:
+            seq = pd.to_numeric(df[SEQ_COLUMN], errors='coerce').fillna(0).to_numpy()
+            order = np.lexsort((seq, trains))  # stable: file order breaks SEQ ties
+        else:
+            order = np.argsort(trains, kind='stable')
+
+        for name in df.columns:
+            series = df[name]
+            if isinstance(series.dtype, pd.CategoricalDtype):
+                # Codes stay compact; -1 (missing) is looked up as NaN like to_dict() gives
+                self.columns[name] = series.cat.codes.to_numpy()[order]
+                self.categories[name] = np.append(series.cat.categories.to_numpy(dtype=object), np.nan)
+            else:
+                self.columns[name] = series.to_numpy()[order]
+
+        sorted_trains = trains[order]
+        starts = np.flatnonzero(np.r_[True, sorted_trains[1:] != sorted_trains[:-1]])
+        ends = np.r_[starts[1:], len(sorted_trains)]
+        self.offsets = {int(sorted_trains[start]): (int(start), int(end))
+                        for start, end in zip(starts, ends)}
+
+    def __contains__(self, train_no) -> bool:
+        return _route_key(train_no) in self.offsets
+
+    def __len__(self) -> int:
+        return len(self.offsets)
+
+    def route_arrays(self, train_no) -> Dict[str, np.ndarray]:
+        """Column views (categoricals decoded) for one train's stops in SEQ order; empty if unknown."""
+        span = self.offsets.get(_route_key(train_no))
+        if span is None:
+            return {}
+        start, end = span
+        return {name: self._column_slice(name, start, end) for name in self.columns}
+
+    def _column_slice(self, name: str, start: int, end: int) -> np.ndarray:
+        values = self.columns[name][start:end]
+        categories = self.categories.get(name)
+        return categories[values] if categories is not None else values
+
+    def records(self, train_no) -> List[Dict]:
+        """One record per stop in SEQ order; built on first request, then shared read-only."""
+        key = _route_key(train_no)
+        cached = self._records.get(key)
+        if cached is not None:
+            return cached
+        span = self.offsets.get(key)
+        if span is None:
+            return FrozenList()
+
+        start, end = span
+        names = list(self.columns)
+        values = [self._column_slice(name, start, end).tolist() for name in names]
+        records = FrozenList(FrozenDict(zip(names, row)) for row in zip(*values))
+        with self._lock:
+            return self._records.setdefault(key, records)
+
+    def stops(self, train_no) -> List[str]:
+        """'Name (CODE)' for each distinct station, in route order."""
+        key = _route_key(train_no)
+        cached = self._stops.get(key)
+        if cached is not None:
+            return cached
+        arrays = self.route_arrays(key)
+        if not arrays:
+            return FrozenList()
+
+        seen = set()
+        stops = []
+        for code, name in zip(arrays['Station Code'].tolist(), arrays['Station Name'].tolist()):
+            if code not in seen:
+                seen.add(code)
+                stops.append(f"{name} ({code})")
+        with self._lock:
+            return self._stops.setdefault(key, FrozenList(stops))
+
+    def cell(self, row: int, column: str):
+        """Value of one column at a row of the sorted columns (NaN if missing)."""
+        values = self.columns.get(column)
+        if values is None:
+            return np.nan
+        value = values[row]
+        categories = self.categories.get(column)
+        if categories is not None:
+            return categories[value]
+        return value.item() if isinstance(value, np.generic) else value
+
+    def distinct(self, key_column: str, name_column: str) -> List[Tuple]:
+        """(key, name) at the first row of each distinct key, e.g. station code and name."""
+        keys = self.columns.get(key_column)
+        if keys is None or name_column not in self.columns:
+            return []
+        if keys.dtype.kind not in 'iu':
+            keys = pd.factorize(keys)[0]
+        _, first = np.unique(keys, return_index=True)
+        return [(self.cell(row, key_column), self.cell(row, name_column)) for row in first.tolist()]
+
+    def stop_index(self) -> StopIndex:
+        """Station -> trains postings over these routes; built on first use."""
+        if self._stop_index is None:
+            with self._lock:
+                if self._stop_index is None:
+                    self._stop_index = self._build_stop_index()
+        return self._stop_index
+
+    def _build_stop_index(self) -> StopIndex:
+        size = len(self.columns.get(TRAIN_COLUMN, ()))
+        codes = self.columns.get('Station Code', np.full(size, -1))
+        if 'Station Code' in self.categories:
+            labels = self.categories['Station Code'][:-1]
+        else:
+            codes, labels = pd.factorize(pd.Series(codes, dtype=object).astype(str))
+        return StopIndex(
+            self.columns.get(TRAIN_COLUMN, np.zeros(size, dtype=np.int64)),
+            self.columns.get(SEQ_COLUMN, np.zeros(size, dtype=np.int64)),
+            codes, labels,
+            arrival_min=self.columns.get('arrival_min'),
+            departure_min=self.columns.get('departure_min'),
+            distance=self.columns.get('Distance'),
+        )
@@ -0,0 +1,349 @@
+"""
+Memory-mapped, fixed-width schedule store shared by every worker process.
+
+The station-by-station schedule is written once as plain ``.npy`` files:
+
+    stops.npy           structured array, one fixed-width row per stop,
+                        sorted by (train, SEQ)
+    trains.npy          (train_no, start, end) per train, sorted by train_no
+    strings.npy         UTF-8 bytes of every distinct name/code/time string
+    string_offsets.npy  start of string i in strings.npy (plus the end)
+    meta.json           source CSV stamp and checksum, columns present
+
+Every process opens them with ``np.load(mmap_mode='r')``, so the OS page
+cache holds the only copy and a new worker starts without parsing. A train
+is found by binary search over trains.npy and its stops are one contiguous
+slice of stops.npy. Strings are decoded on demand and memoised per process.
+
+Builds go into a directory named after the CSV's SHA-256 and are published
+through current.json, so a rebuild never touches files another process
+still has mapped. Publishing removes builds older than the previous one;
+staging left by a worker that died mid-build is removed before the next build.
+"""
+
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from src.repositories.schedule_snapshot import _file_stamp, _sha256, read_schedule_csv
+from src.repositories.stop_index import StopIndex
+from src.utils.frozen import FrozenDict, FrozenList
+
+
+LAYOUT_VERSION = 1
+
+# Staging untouched this long belongs to a dead worker; a live build takes seconds
+STALE_STAGING_S = 3600
+
+# CSV column -> (field in stops.npy, kind); 'str' fields hold string table indexes (-1 = missing)
+SCHEDULE_FIELDS = {
+    'Train No': ('train_no', 'i4'),
+    'Train Name': ('train_name', 'str'),
+    'SEQ': ('seq', 'i2'),
+    'Station Code': ('station_code', 'str'),
+    'Station Name': ('station_name', 'str'),
+    'Arrival time': ('arrival', 'str'),
+    'Departure Time': ('departure', 'str'),
+    'Distance': ('distance', 'f4'),
+    'Source Station': ('source_code', 'str'),
+    'Source Station Name': ('source_name', 'str'),
+    'Destination Station': ('destination_code', 'str'),
+    'Destination Station Name': ('destination_name', 'str'),
+    'arrival_min': ('arrival_min', 'i2'),
+    'departure_min': ('departure_min', 'i2'),
+}
+
+STOP_DTYPE = np.dtype([(field, 'i4' if kind == 'str' else kind) for field, kind in SCHEDULE_FIELDS.values()])
+TRAIN_DTYPE = np.dtype([('train_no', 'i4'), ('start', 'i4'), ('end', 'i4')])
+
+_COMPLETE_MARKER = 'complete'
+
+
+def default_root(csv_path: Path) -> Path:
+    return csv_path.with_name(f"{csv_path.stem}.mmap")
+
+
+def build_mapped_schedule(df: pd.DataFrame, directory: Path, source: Dict):
+    """Write the typed schedule frame in the fixed-width layout (complete marker last)."""
+    directory.mkdir(parents=True, exist_ok=True)
+    trains = pd.to_numeric(df['Train No'], errors='coerce').fillna(-1).to_numpy(dtype=np.int64)
+    seq = pd.to_numeric(df['SEQ'], errors='coerce').fillna(0).to_numpy() if 'SEQ' in df.columns else np.zeros(len(df))
+    order = np.lexsort((seq, trains))
+
+    # One string table for every text column; each column's codes are remapped into it
+    table: Dict[str, int] = {}
+    stops = np.zeros(len(df), dtype=STOP_DTYPE)
+    present = []
+    for column, (field, kind) in SCHEDULE_FIELDS.items():
+        if column not in df.columns:
+            stops[field] = -1 if kind == 'str' else 0
+            continue
+        present.append(column)
+        series = df[column]
+        if kind == 'str':
+            categorical = series if isinstance(series.dtype, pd.CategoricalDtype) else series.astype('category')
+            categories = [str(value) for value in categorical.cat.categories]
+            remap = np.array([table.setdefault(value, len(table)) for value in categories] + [-1], dtype=np.int32)
+            stops[field] = remap[categorical.cat.codes.to_numpy()[order]]
+        else:
+            stops[field] = pd.to_numeric(series, errors='coerce').fillna(-1).to_numpy()[order]
+
+    sorted_trains = stops['train_no']
+    starts = np.flatnonzero(np.r_[True, sorted_trains[1:] != sorted_trains[:-1]]) if len(stops) else np.array([], int)
+    ends = np.r_[starts[1:], len(stops)]
+    train_index = np.zeros(len(starts), dtype=TRAIN_DTYPE)
+    train_index['train_no'] = sorted_trains[starts]
+    train_index['start'] = starts
+    train_index['end'] = ends
+
+    encoded = [value.encode('utf-8') for value in table]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(value) for value in encoded])
+
+    np.save(directory / 'stops.npy', stops)
+    np.save(directory / 'trains.npy', train_index)
+    np.save(directory / 'strings.npy', np.frombuffer(b''.join(encoded), dtype=np.uint8))
+    np.save(directory / 'string_offsets.npy', offsets)
+    meta = {'version': LAYOUT_VERSION, 'source': source, 'columns': present}
+    (directory / 'meta.json').write_text(json.dumps(meta), encoding='utf-8')
+    (directory / _COMPLETE_MARKER).write_text('', encoding='utf-8')
+
+
+class MappedSchedule:
+    """Read-only view over a mapped schedule directory; same queries as RouteIndex."""
+
+    def __init__(self, directory: Union[str, Path]):
+        self.directory = Path(directory)
+        self.meta = json.loads((self.directory / 'meta.json').read_text(encoding='utf-8'))
+        self.rows = np.load(self.directory / 'stops.npy', mmap_mode='r')
+        self.trains = np.load(self.directory / 'trains.npy', mmap_mode='r')
+        self._strings = np.load(self.directory / 'strings.npy', mmap_mode='r')
+        self._offsets = np.load(self.directory / 'string_offsets.npy', mmap_mode='r')
+        self.columns: List[Tuple[str, str, str]] = [
+            (column, *SCHEDULE_FIELDS[column]) for column in self.meta['columns'] if column in SCHEDULE_FIELDS
+        ]
+        self._decoded: Dict[int, str] = {}
+        self._records: Dict[int, FrozenList] = {}
+        self._stop_names: Dict[int, FrozenList] = {}
+        self._stop_index: Optional[StopIndex] = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.trains)
+
+    def __contains__(self, train_no) -> bool:
+        return self._span(train_no) is not None
+
+    def string(self, index: int):
+        """String table entry; NaN for a missing value (as pandas reports it)."""
+        if index < 0:
+            return np.nan
+        value = self._decoded.get(index)
+        if value is None:
+            start, end = int(self._offsets[index]), int(self._offsets[index + 1])
+            value = self._decoded[index] = bytes(self._strings[start:end]).decode('utf-8')
+        return value
+
+    def _span(self, train_no) -> Optional[Tuple[int, int]]:
+        try:
+            key = int(str(train_no).strip())
+        except ValueError:
+            return None
+        position = int(np.searchsorted(self.trains['train_no'], key))
+        if position < len(self.trains) and self.trains['train_no'][position] == key:
+            return int(self.trains['start'][position]), int(self.trains['end'][position])
+        return None
+
+    def route(self, train_no) -> np.ndarray:
+        """One train's stops as a slice of the mapped structured array (SEQ order)."""
+        span = self._span(train_no)
+        if span is None:
+            return self.rows[:0]
+        return self.rows[span[0]:span[1]]
+
+    def route_arrays(self, train_no) -> Dict[str, np.ndarray]:
+        """Column arrays (strings decoded) for one train's stops, keyed by CSV column name."""
+        stops = self.route(train_no)
+        if not len(stops):
+            return {}
+        return {column: (np.array([self.string(i) for i in stops[field].tolist()], dtype=object)
+                         if kind == 'str' else stops[field])
+                for column, field, kind in self.columns}
+
+    def records(self, train_no) -> List[Dict]:
+        """One record per stop, keyed like the CSV; built on first request, then shared read-only."""
+        span = self._span(train_no)
+        if span is None:
+            return FrozenList()
+        cached = self._records.get(span[0])
+        if cached is not None:
+            return cached
+
+        positions = [(column, STOP_DTYPE.names.index(field), kind == 'str') for column, field, kind in self.columns]
+        string = self.string
+        records = FrozenList(
+            FrozenDict((column, string(row[position]) if is_str else row[position])
+                       for column, position, is_str in positions)
+            for row in self.rows[span[0]:span[1]].tolist()
+        )
+        with self._lock:
+            return self._records.setdefault(span[0], records)
+
+    def stops(self, train_no) -> List[str]:
+        """'Name (CODE)' for each distinct station, in route order."""
+        span = self._span(train_no)
+        if span is None:
+            return FrozenList()
+        cached = self._stop_names.get(span[0])
+        if cached is not None:
+            return cached
+
+        stops = self.rows[span[0]:span[1]]
+        seen = set()
+        names = []
+        for code, name in zip(stops['station_code'].tolist(), stops['station_name'].tolist()):
+            if code not in seen:
+                seen.add(code)
+                names.append(f"{self.string(name)} ({self.string(code)})")
+        with self._lock:
+            return self._stop_names.setdefault(span[0], FrozenList(names))
+
+    def cell(self, row: int, column: str):
+        """Value of one column at a row of stops.npy (NaN if missing)."""
+        field_kind = SCHEDULE_FIELDS.get(column)
+        if field_kind is None or column not in self.meta['columns']:
+            return np.nan
+        field, kind = field_kind
+        value = self.rows[row][field].item()
+        return self.string(value) if kind == 'str' else value
+
+    def distinct(self, key_column: str, name_column: str) -> List[Tuple]:
+        """(key, name) at the first row of each distinct key, e.g. station code and name."""
+        if key_column not in self.meta['columns'] or name_column not in self.meta['columns']:
+            return []
+        _, first = np.unique(np.asarray(self.rows[SCHEDULE_FIELDS[key_column][0]]), return_index=True)
+        return [(self.cell(row, key_column), self.cell(row, name_column)) for row in first.tolist()]
+
+    def stop_index(self) -> StopIndex:
+        """Station -> trains postings over the mapped stops; built on first use per process."""
+        if self._stop_index is None:
+            with self._lock:
+                if self._stop_index is None:
+                    # Station codes are string table indexes; only the ones in use are decoded
+                    stations = np.asarray(self.rows['station_code'])
+                    used, codes = np.unique(stations, return_inverse=True)
+                    labels = [self.string(int(index)) for index in used]
+                    if len(used) and used[0] < 0:
+                        codes = np.where(stations < 0, -1, codes - 1)
+                        labels = labels[1:]
+                    self._stop_index = StopIndex(
+                        np.asarray(self.rows['train_no']), np.asarray(self.rows['seq']), codes, labels,
+                        arrival_min=np.asarray(self.rows['arrival_min']),
+                        departure_min=np.asarray(self.rows['departure_min']),
+                        distance=np.asarray(self.rows['distance']),
+                    )
+        return self._stop_index
+
+    def to_frame(self) -> pd.DataFrame:
+        """Full schedule as a DataFrame (categoricals over the string table); built on demand."""
+        categories = [self.string(i) for i in range(len(self._offsets) - 1)]
+        columns = {}
+        for column, field, kind in self.columns:
+            values = np.asarray(self.rows[field])
+            if kind == 'str':
+                columns[column] = pd.Categorical.from_codes(values, categories)
+            else:
+                columns[column] = values.copy()
+        return pd.DataFrame(columns)
+
+
+def _read_pointer(root: Path) -> Optional[Dict]:
+    try:
+        return json.loads((root / 'current.json').read_text(encoding='utf-8'))
+    except (OSError, ValueError):
+        return None
+
+
+def _write_pointer(root: Path, pointer: Dict):
+    tmp_path = root / f"current.json.{os.getpid()}.tmp"
+    tmp_path.write_text(json.dumps(pointer), encoding='utf-8')
+    os.replace(tmp_path, root / 'current.json')
+
+
+def open_mapped_schedule(csv_path: Union[str, Path], root: Optional[Union[str, Path]] = None) -> MappedSchedule:
+    """Map the schedule built from csv_path, building (and publishing) it first if needed.
+
+    A size/mtime match with the published build is trusted; otherwise the
+    CSV is hashed and an existing build with that checksum is reused.
+    """
+    csv_path = Path(csv_path)
+    root = Path(root) if root else default_root(csv_path)
+    stamp = _file_stamp(csv_path)
+
+    pointer = _read_pointer(root)
+    if pointer and pointer.get('version') == LAYOUT_VERSION and \
+            pointer.get('size') == stamp['size'] and pointer.get('mtime_ns') == stamp['mtime_ns']:
+        directory = root / pointer['build']
+        if (directory / _COMPLETE_MARKER).exists():
+            return MappedSchedule(directory)
+
+    checksum = _sha256(csv_path)
+    build = checksum[:16]
+    directory = root / build
+    if not (directory / _COMPLETE_MARKER).exists():
+        shutil.rmtree(directory, ignore_errors=True)  # left behind by an interrupted build
+        _remove_stale_staging(root)
+        # Build beside the target and rename, so concurrent workers never see a partial build
+        staging = root / f"{build}.{os.getpid()}.tmp"
+        shutil.rmtree(staging, ignore_errors=True)
+        try:
+            build_mapped_schedule(read_schedule_csv(csv_path), staging, {**stamp, 'sha256': checksum})
+            try:
+                os.replace(staging, directory)
+            except OSError:
+                pass  # another worker published the same build first
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+
+    previous = pointer.get('build') if pointer else None
+    _write_pointer(root, {'version': LAYOUT_VERSION, 'build': build, **stamp})
+    _prune(root, keep={build, previous})
+    return MappedSchedule(directory)
+
+
+def _prune(root: Path, keep: Set[Optional[str]]):
+    """Remove builds older than the current and the previously published one.
+
+    Workers that started before this publish still map the previous build
+    (and on Windows its files cannot be deleted while mapped), so it stays
+    until the next rebuild. A build that cannot be removed yet is logged and
+    retried on the next publish.
+    """
+    for path in root.iterdir():
+        if path.is_dir() and path.name not in keep and not path.name.endswith('.tmp'):
+            try:
+                shutil.rmtree(path)
+            except OSError as e:
+                print(f"Could not remove old schedule build {path.name}: {e}")
+
+
+def _remove_stale_staging(root: Path):
+    """Remove *.tmp staging that a worker killed mid-build could not clean up itself."""
+    cutoff = time.time() - STALE_STAGING_S
+    for path in root.glob('*.tmp'):
+        try:
+            if path.stat().st_mtime > cutoff:
+                continue  # possibly another worker's build in progress
+            if path.is_dir():
+                shutil.rmtree(path)
+            else:
+                path.unlink()
+        except OSError as e:
+            print(f"Could not remove stale schedule staging {path.name}: {e}")
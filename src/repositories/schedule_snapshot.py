@@ -0,0 +1,87 @@
+"""
+Typed parsing of the station-by-station schedule CSV.
+
+Train_details_22122017.csv has ~186k rows but only a few thousand distinct
+trains and stations, so it is read with explicit dtypes: integer train
+numbers and stop sequences, float32 distances, and categorical codes and
+names. Arrival and departure times are also parsed into minute-of-day
+columns (-1 when missing).
+
+The parsed frame feeds the memory-mapped build (see schedule_mmap.py),
+which is also the on-disk cache that later starts load instead of the CSV,
+and the in-memory fallback when the mapping cannot be written.
+"""
+
+import hashlib
+from pathlib import Path
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+
+SCHEDULE_DTYPES = {
+    'Train No': 'int32',
+    'SEQ': 'int16',
+    'Distance': 'float32',
+}
+
+CATEGORICAL_COLUMNS = (
+    'Train Name', 'Station Code', 'Station Name', 'Arrival time', 'Departure Time',
+    'Source Station', 'Source Station Name', 'Destination Station', 'Destination Station Name',
+)
+
+# Source time column -> parsed minute-of-day column
+TIME_COLUMNS = {
+    'Arrival time': 'arrival_min',
+    'Departure Time': 'departure_min',
+}
+
+
+def _sha256(path: Path) -> str:
+    digest = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for block in iter(lambda: handle.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _file_stamp(path: Path) -> Dict:
+    stat = path.stat()
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def _minutes_of_day(times: pd.Series) -> np.ndarray:
+    """'HH:MM[:SS]' -> minute of day as int16, -1 when unparseable; parsed once per distinct value."""
+    if isinstance(times.dtype, pd.CategoricalDtype):
+        categories = times.cat.categories.astype(str)
+        parsed = _minutes_of_day(pd.Series(categories))
+        codes = times.cat.codes.to_numpy()
+        return np.where(codes >= 0, parsed[codes], -1).astype(np.int16)
+
+    parts = times.astype(str).str.extract(r'^\s*(\d{1,2}):(\d{2})')
+    hours = pd.to_numeric(parts[0], errors='coerce')
+    minutes = pd.to_numeric(parts[1], errors='coerce')
+    return (hours * 60 + minutes).fillna(-1).astype(np.int16).to_numpy()
+
+
+def read_schedule_csv(csv_path: Path) -> pd.DataFrame:
+    """Parse the CSV with explicit dtypes and add the parsed time columns."""
+    header = pd.read_csv(csv_path, nrows=0).columns
+    dtypes = {column: dtype for column, dtype in SCHEDULE_DTYPES.items() if column in header}
+    dtypes.update({column: 'category' for column in CATEGORICAL_COLUMNS if column in header})
+    try:
+        df = pd.read_csv(csv_path, dtype=dtypes, skipinitialspace=True)
+    except (ValueError, TypeError) as e:
+        # A malformed numeric cell: keep the explicit categoricals, coerce the numbers
+        print(f"Schedule CSV has non-numeric values ({e}); coercing")
+        df = pd.read_csv(csv_path, dtype={c: d for c, d in dtypes.items() if d == 'category'},
+                         skipinitialspace=True)
+        for column, dtype in SCHEDULE_DTYPES.items():
+            if column in df.columns:
+                df[column] = pd.to_numeric(df[column], errors='coerce').fillna(-1).astype(dtype)
+
+    for source, target in TIME_COLUMNS.items():
+        if source in df.columns:
+            df[target] = _minutes_of_day(df[source])
+    return df
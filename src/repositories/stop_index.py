@@ -0,0 +1,94 @@
+"""
+Inverted index from station to the trains that call there.
+
+For every station the schedule's stops are kept as postings sorted by
+(train, SEQ): parallel arrays of train number, stop sequence, arrival and
+departure minute, distance and the row in the route store. Trains running
+from A to B are the intersection of A's and B's postings on train number
+where B's SEQ is after A's, done as one vectorised sorted merge
+(``searchsorted``) instead of a scan over the schedule.
+"""
+
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class StopIndex:
+    """Per-station postings over the schedule's stops."""
+
+    def __init__(self, train_no: np.ndarray, seq: np.ndarray, station: np.ndarray,
+                 labels: Sequence, arrival_min: Optional[np.ndarray] = None,
+                 departure_min: Optional[np.ndarray] = None, distance: Optional[np.ndarray] = None):
+        """``station`` holds integer codes into ``labels`` (the station code strings); -1 is missing."""
+        # Codes differing only in case or padding are one station
+        normalized = [str(label).strip().upper() for label in labels]
+        ids: Dict[str, int] = {}
+        remap = np.array([ids.setdefault(code, len(ids)) for code in normalized] + [-1], dtype=np.int64)
+        self.station_ids = ids
+        self.codes = list(ids)
+        station = remap[np.asarray(station, dtype=np.int64)]
+
+        # Row-order columns (as in the route store), kept for the journey planner
+        total = len(train_no)
+        self.row_station = station
+        self.row_train = np.asarray(train_no)
+        self.row_seq = np.asarray(seq)
+        self.row_arrival_min = np.asarray(arrival_min) if arrival_min is not None else np.full(total, -1)
+        self.row_departure_min = np.asarray(departure_min) if departure_min is not None else np.full(total, -1)
+        self.row_distance = np.asarray(distance) if distance is not None else np.zeros(total)
+
+        order = np.lexsort((seq, train_no, station))
+        order = order[station[order] >= 0]
+        size = len(order)
+        self.row = order.astype(np.int64)
+        self.train = self.row_train[order]
+        self.seq = self.row_seq[order]
+        self.arrival_min = self.row_arrival_min[order]
+        self.departure_min = self.row_departure_min[order]
+        self.distance = self.row_distance[order]
+
+        stations = station[order]
+        starts = np.flatnonzero(np.r_[True, stations[1:] != stations[:-1]]) if size else np.array([], int)
+        ends = np.r_[starts[1:], size]
+        self.postings: Dict[int, Tuple[int, int]] = {
+            int(stations[start]): (int(start), int(end)) for start, end in zip(starts, ends)
+        }
+
+    def __len__(self) -> int:
+        return len(self.postings)
+
+    def trains_at(self, code: str) -> np.ndarray:
+        """Distinct train numbers calling at a station."""
+        span = self._span(code)
+        return np.unique(self.train[span[0]:span[1]]) if span else np.array([], dtype=self.train.dtype)
+
+    def station_id(self, code: str) -> Optional[int]:
+        return self.station_ids.get(str(code).strip().upper())
+
+    def _span(self, code: str) -> Optional[Tuple[int, int]]:
+        station_id = self.station_id(code)
+        return self.postings.get(station_id) if station_id is not None else None
+
+    def between(self, from_code: str, to_code: str) -> Tuple[np.ndarray, np.ndarray]:
+        """Positions (into the posting arrays) of the boarding and alighting stop for every
+        train that calls at from_code and later at to_code, one pair per train."""
+        span_a, span_b = self._span(from_code), self._span(to_code)
+        empty = np.array([], dtype=np.int64)
+        if not span_a or not span_b or span_a == span_b:
+            return empty, empty
+
+        trains_a = self.train[span_a[0]:span_a[1]]
+        trains_b = self.train[span_b[0]:span_b[1]]
+        # Last B stop of the same train (so a loop that passes B twice still matches)
+        match = np.searchsorted(trains_b, trains_a, side='right') - 1
+        valid = match >= 0
+        match = np.where(valid, match, 0)
+        positions_a = np.arange(span_a[0], span_a[1])
+        positions_b = match + span_b[0]
+        keep = valid & (trains_b[match] == trains_a) & (self.seq[positions_b] > self.seq[positions_a])
+
+        positions_a, positions_b = positions_a[keep], positions_b[keep]
+        # One segment per train: its first boarding stop
+        _, first = np.unique(self.train[positions_a], return_index=True)
+        return positions_a[first], positions_b[first]
@@ -0,0 +1,195 @@
+"""
+Prefix index for search-box autocomplete over stations and trains.
+
+Every station and train contributes normalised keys: its full name, each
+word-suffix of the name (so "central" and "shivaji mah" find Chhatrapati
+Shivaji Maharaj Terminus), and its code or number. The keys are kept in one
+sorted array per kind, which is a flattened trie: the completions of a
+prefix are the contiguous range found by two bisections, and a query that
+extends the previous one only bisects inside the previous range.
+
+Each key carries a static rank (full names and codes before word matches,
+then the entity's importance). The best completions of a range come from a
+sparse table of range-minimum positions: the top k are taken with a small
+heap in O(k log k), however many keys share the prefix. A name or code
+equal to the query always comes first. Completions the caller rejects (no
+record, filtered out) are skipped inside the heap walk, so the limit is
+still filled with accepted ones.
+"""
+
+import heapq
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from src.scheduling.station_index import normalize
+
+
+# Key priorities, best first
+FULL, WORD = 0, 1
+
+KINDS = ('station', 'train')
+
+# Above every normalised key that starts with a given prefix
+_PREFIX_END = '\uffff'
+
+
+class PrefixIndex:
+    """Sorted keys with range-minimum ranks for top-k prefix completion."""
+
+    def __init__(self, entries: Iterable[Tuple[str, int, int]]):
+        """``entries`` are (normalised key, target id, rank) triples; lower rank is better."""
+        entries = sorted(set(entries))
+        self.keys = [key for key, _, _ in entries]
+        self.targets = np.array([target for _, target, _ in entries], dtype=np.int64)
+        self.ranks = np.array([rank for _, _, rank in entries], dtype=np.int64)
+        self._last: Tuple[str, int, int] = ('', 0, len(self.keys))
+
+        # table[j][i]: position of the best rank in keys[i:i + 2**j]
+        self._table = [np.arange(len(self.keys))]
+        width = 1
+        while width * 2 <= len(self.keys):
+            previous = self._table[-1]
+            left, right = previous[:-width], previous[width:]
+            self._table.append(np.where(self.ranks[left] <= self.ranks[right], left, right))
+            width *= 2
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def prefix_range(self, prefix: str) -> Tuple[int, int]:
+        """[lo, hi) of the keys starting with prefix."""
+        last_prefix, lo, hi = self._last
+        if not prefix.startswith(last_prefix):
+            lo, hi = 0, len(self.keys)
+        lo = bisect_left(self.keys, prefix, lo, hi)
+        hi = bisect_left(self.keys, prefix + _PREFIX_END, lo, hi)
+        self._last = (prefix, lo, hi)  # one tuple assignment: safe to share across threads
+        return lo, hi
+
+    def _best(self, lo: int, hi: int) -> int:
+        level = (hi - lo).bit_length() - 1
+        table = self._table[level]
+        left, right = table[lo], table[hi - (1 << level)]
+        return int(left if self.ranks[left] <= self.ranks[right] else right)
+
+    def complete(self, prefix: str, limit: Optional[int],
+                 accept: Optional[Callable[[int], bool]] = None) -> List[Tuple[int, int, bool]]:
+        """Up to limit (all if None) distinct accepted (target, rank, exact) triples for the prefix, best first."""
+        lo, hi = self.prefix_range(prefix)
+        results: List[Tuple[int, int, bool]] = []
+        seen = set()
+
+        def take(target: int) -> bool:
+            if target in seen:
+                return False
+            seen.add(target)
+            return accept is None or accept(target)
+
+        # Exact keys sort first within the range and are offered first
+        exact = lo
+        while exact < hi and self.keys[exact] == prefix:
+            target = int(self.targets[exact])
+            if take(target):
+                results.append((target, int(self.ranks[exact]), True))
+            exact += 1
+
+        heap = [(int(self.ranks[best]), best, exact, hi)
+                for best in ([self._best(exact, hi)] if exact < hi else [])]
+        while heap and (limit is None or len(results) < limit):
+            rank, position, start, end = heapq.heappop(heap)
+            target = int(self.targets[position])
+            if take(target):
+                results.append((target, rank, False))
+            for sub_start, sub_end in ((start, position), (position + 1, end)):
+                if sub_start < sub_end:
+                    best = self._best(sub_start, sub_end)
+                    heapq.heappush(heap, (int(self.ranks[best]), best, sub_start, sub_end))
+        return results[:limit]
+
+
+def _name_keys(name: str) -> List[Tuple[str, int]]:
+    """The full normalised name, then each later word-suffix of it."""
+    words = normalize(name).split()
+    return [(" ".join(words[start:]), FULL if start == 0 else WORD) for start in range(len(words))]
+
+
+class SuggestIndex:
+    """Ranked completions of station names/codes and train names/numbers."""
+
+    def __init__(self, stations: Iterable[Tuple[str, str, int]] = (),
+                 trains: Iterable[Tuple[str, str, int]] = ()):
+        """``stations`` and ``trains`` are (code or number, name, importance) triples; repeats keep the first."""
+        self._items: Dict[str, List[Dict]] = {}
+        self._indexes: Dict[str, PrefixIndex] = {}
+        for kind, rows, code_field, name_field in (('station', stations, 'code', 'name'),
+                                                   ('train', trains, 'train_no', 'train_name')):
+            items: List[Dict] = []
+            importance: List[int] = []
+            known = set()
+            for code, name, weight in rows:
+                code = str(code).strip().upper()
+                if not code or code in known:
+                    continue
+                known.add(code)
+                items.append({code_field: code, name_field: name if isinstance(name, str) else '', 'kind': kind})
+                importance.append(weight)
+
+            # Entity order: most important first, then alphabetical by name
+            order = sorted(range(len(items)), key=lambda i: (-importance[i], items[i][name_field]))
+            entity_rank = {item: rank for rank, item in enumerate(order)}
+            entries = []
+            for target, item in enumerate(items):
+                rank = entity_rank[target]
+                entries.append((normalize(item[code_field]), target, FULL * len(items) + rank))
+                for key, priority in _name_keys(item[name_field]):
+                    entries.append((key, target, priority * len(items) + rank))
+            self._items[kind] = items
+            self._indexes[kind] = PrefixIndex(entry for entry in entries if entry[0])
+
+    def __len__(self) -> int:
+        return sum(len(items) for items in self._items.values())
+
+    def suggest(self, query: str, kind: str = 'all', limit: Optional[int] = 10,
+                accept: Optional[Callable[[Dict], bool]] = None) -> List[Dict]:
+        """Top completions of query for 'station', 'train' or 'all' kinds, best first.
+
+        ``accept`` is called with each candidate item; rejected ones do not
+        count towards limit (None returns every completion).
+        """
+        prefix = normalize(query)
+        kinds = KINDS if kind == 'all' else (kind,)
+        if not prefix or (limit is not None and limit <= 0) or any(k not in self._indexes for k in kinds):
+            return []
+
+        ranked = []
+        for k in kinds:
+            items = self._items[k]
+            check = None if accept is None else (lambda target, items=items: accept(items[target]))
+            for order, (target, rank, exact) in enumerate(self._indexes[k].complete(prefix, limit, check)):
+                # Across kinds: exact names/codes, then name/code prefixes, then word matches
+                priority = rank // max(len(items), 1)
+                priority = -1 if exact and priority == FULL else priority
+                ranked.append((priority, order, k, target))
+        ranked.sort()
+        return [dict(self._items[k][target]) for _, _, k, target in ranked[:limit]]
+
+
+def build_suggest_index(stations: Iterable[Dict], trains: Iterable[Dict],
+                        schedule_stations: Iterable[Tuple[str, str]] = (),
+                        schedule_trains: Iterable[Tuple[str, str]] = ()) -> SuggestIndex:
+    """Index the station/train records first (ranked by platforms/coaches), then the schedule's."""
+    def weight(record: Dict, field: str) -> int:
+        try:
+            return int(record.get(field) or 0)
+        except (TypeError, ValueError):
+            return 0
+
+    station_rows = [(s.get('station_code'), s.get('station_name'), weight(s, 'platform_count') + 1)
+                    for s in stations if s.get('station_code')]
+    station_rows += [(code, name, 0) for code, name in schedule_stations if isinstance(code, str)]
+    train_rows = [(t.get('train_no'), t.get('train_name'), weight(t, 'coach_count') + 1)
+                  for t in trains if t.get('train_no') is not None]
+    train_rows += [(number, name, 0) for number, name in schedule_trains]
+    return SuggestIndex(station_rows, train_rows)
@@ -0,0 +1,196 @@
+"""
+Timetable arrays and a round-based (RAPTOR) journey planner over them.
+
+The schedule gives each stop a minute-of-day time only; walking a train's
+stops in SEQ order, a time lower than the one before means the train ran
+past midnight, so every stop gets an absolute time since the train's day of
+departure. Trains are taken to run daily: the instance of a train that can
+be caught at a stop is the one whose departure, shifted by whole days, is
+the first at or after the passenger is ready there.
+
+Planning is a range query (rRAPTOR): one RAPTOR run per departure from the
+origin inside the window, latest first, keeping the per-round arrival
+labels between runs. Round k finds the earliest arrival at every station
+using k trains; each round boards every train at the stations improved in
+the previous round and rides it to the end, all as NumPy array operations
+over the precomputed postings. The journeys returned are the Pareto set
+over later departure, earlier arrival and fewer transfers.
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.repositories.stop_index import StopIndex
+
+
+DAY = 1440
+_UNREACHED = np.iinfo(np.int64).max // 4
+# Separates trips when taking a running minimum over (trip, day) keys
+_TRIP_STRIDE = 1 << 20
+
+
+def _ranges(starts: np.ndarray, ends: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Concatenated [start, end) ranges, and for each element the range it came from."""
+    lengths = np.maximum(ends - starts, 0)
+    owner = np.repeat(np.arange(len(starts)), lengths)
+    first = np.cumsum(lengths) - lengths
+    return starts[owner] + np.arange(lengths.sum()) - first[owner], owner
+
+
+class Timetable:
+    """Absolute stop times and trip boundaries in route-store row order."""
+
+    def __init__(self, index: StopIndex):
+        self.index = index
+        trains = index.row_train
+        size = len(trains)
+        self.station = index.row_station
+
+        starts = np.flatnonzero(np.r_[True, trains[1:] != trains[:-1]]) if size else np.array([], int)
+        self.trip = np.zeros(size, dtype=np.int64)
+        self.trip[starts] = 1
+        self.trip = np.cumsum(self.trip) - 1
+        self.trip_last_row = np.r_[starts[1:], size] - 1
+
+        arrival = index.row_arrival_min.astype(np.int64)
+        departure = index.row_departure_min.astype(np.int64)
+        # The origin's arrival and the terminus' departure are placeholders in the CSV
+        first = np.zeros(size, dtype=bool)
+        first[starts] = True
+        last = np.zeros(size, dtype=bool)
+        last[self.trip_last_row] = True
+        arrival = np.where(first, departure, arrival)
+        departure = np.where(last, arrival, departure)
+        self.usable = (self.station >= 0) & (arrival >= 0) & (departure >= 0)
+        self.boardable = self.usable & ~last
+
+        # Interleave arrival/departure per stop, carry missing times forward and
+        # count midnights crossed since the trip started
+        times = np.column_stack((arrival, departure)).ravel()
+        carried = np.maximum.accumulate(np.where(times >= 0, np.arange(len(times)), 0))
+        times = times[carried]
+        wrapped = np.r_[False, times[1:] < times[:-1]]
+        wrapped[starts * 2] = False
+        days = np.cumsum(wrapped)
+        days -= np.repeat(days[starts * 2], np.diff(np.r_[starts * 2, len(times)]))
+        absolute = times + DAY * days
+        self.arrival = absolute[0::2]
+        self.departure = absolute[1::2]
+
+        stations = len(index.codes)
+        self.posting_start = np.zeros(stations, dtype=np.int64)
+        self.posting_end = np.zeros(stations, dtype=np.int64)
+        for station_id, (start, end) in index.postings.items():
+            self.posting_start[station_id] = start
+            self.posting_end[station_id] = end
+
+    def plan(self, from_code: str, to_code: str, depart_after: int = 0, depart_before: int = DAY - 1,
+             max_transfers: int = 1, min_transfer: int = 30, horizon: int = 2 * DAY) -> List[Dict]:
+        """Pareto-optimal journeys leaving from_code between the two minutes of day.
+
+        Each journey has absolute ``departure``/``arrival`` minutes (day 0 is
+        the departure day), ``transfers`` and ``legs``: (board row, alight
+        row, day shift) triples into the route store.
+        """
+        origin, target = self.index.station_id(from_code), self.index.station_id(to_code)
+        if origin is None or target is None or origin == target:
+            return []
+
+        start, end = self.posting_start[origin], self.posting_end[origin]
+        rows = self.index.row[start:end]
+        rows = rows[self.boardable[rows]]
+        minutes = self.departure[rows] % DAY
+        departures = np.unique(minutes[(minutes >= depart_after) & (minutes <= depart_before)])[::-1]
+
+        rounds = max(max_transfers, 0) + 1
+        stations = len(self.index.codes)
+        arrival = np.full((rounds + 1, stations), _UNREACHED, dtype=np.int64)
+        board_row = np.full((rounds + 1, stations), -1, dtype=np.int64)
+        alight_row = np.full((rounds + 1, stations), -1, dtype=np.int64)
+        shift = np.zeros((rounds + 1, stations), dtype=np.int64)
+
+        journeys = []
+        for depart in departures.tolist():
+            arrival[0, origin] = depart
+            marked = np.array([origin])
+            improved_target = []
+            for k in range(1, rounds + 1):
+                np.minimum(arrival[k], arrival[k - 1], out=arrival[k])
+                if not len(marked):
+                    break
+                marked = self._round(k, marked, arrival, board_row, alight_row, shift,
+                                     target, min_transfer if k > 1 else 0,
+                                     depart_before if k == 1 else None, depart + horizon)
+                if target in marked:
+                    improved_target.append(k)
+                    marked = marked[marked != target]
+            journeys.extend(self._journey(k, target, board_row, alight_row, shift) for k in improved_target)
+        return sorted(journeys, key=lambda journey: (journey['departure'], journey['transfers']))
+
+    def _round(self, k: int, marked: np.ndarray, arrival: np.ndarray, board_row: np.ndarray,
+               alight_row: np.ndarray, shift: np.ndarray, target: int, transfer: int,
+               latest_boarding: Optional[int], latest_arrival: int) -> np.ndarray:
+        """Ride every train boardable at the marked stations; returns the stations improved."""
+        positions, owner = _ranges(self.posting_start[marked], self.posting_end[marked])
+        rows = self.index.row[positions]
+        ready = arrival[k - 1, marked[owner]] + transfer
+        keep = self.boardable[rows]
+        rows, ready = rows[keep], ready[keep]
+
+        # Whole days to wait for the first instance of the train leaving at or after `ready`
+        days = -((self.departure[rows] - ready) // DAY)
+        boarding = self.departure[rows] + DAY * days
+        keep = boarding < arrival[k, target]
+        if latest_boarding is not None:
+            keep &= boarding <= latest_boarding
+        rows, days = rows[keep], days[keep]
+        if not len(rows):
+            return np.array([], dtype=np.int64)
+
+        # Per trip, a later boarding only matters if it catches an earlier instance
+        trips = self.trip[rows]
+        order = np.lexsort((rows, trips))
+        rows, days, trips = rows[order], days[order], trips[order]
+        keys = days - trips * _TRIP_STRIDE
+        previous = np.r_[_UNREACHED, np.minimum.accumulate(keys)[:-1]]
+        keep = keys < previous
+        rows, days, trips = rows[keep], days[keep], trips[keep]
+
+        # Each boarding covers the stops up to the next kept boarding on the same trip
+        same_trip = np.r_[trips[1:] == trips[:-1], False]
+        until = np.where(same_trip, np.r_[rows[1:], 0], self.trip_last_row[trips])
+        stops, source = _ranges(rows + 1, until + 1)
+        times = self.arrival[stops] + DAY * days[source]
+        stations = self.station[stops]
+        keep = self.usable[stops] & (times <= latest_arrival)
+        keep &= (times < arrival[k, np.maximum(stations, 0)]) & (times < arrival[k, target])
+        stops, source, times, stations = stops[keep], source[keep], times[keep], stations[keep]
+        if not len(stops):
+            return np.array([], dtype=np.int64)
+
+        order = np.lexsort((times, stations))
+        stations, first = np.unique(stations[order], return_index=True)
+        best = order[first]
+        arrival[k, stations] = times[best]
+        board_row[k, stations] = rows[source[best]]
+        alight_row[k, stations] = stops[best]
+        shift[k, stations] = DAY * days[source[best]]
+        return stations
+
+    def _journey(self, k: int, target: int, board_row: np.ndarray, alight_row: np.ndarray,
+                 shift: np.ndarray) -> Dict:
+        legs = []
+        station = target
+        for round_k in range(k, 0, -1):
+            board = int(board_row[round_k, station])
+            legs.append((board, int(alight_row[round_k, station]), int(shift[round_k, station])))
+            station = self.station[board]
+        legs.reverse()
+        first, last = legs[0], legs[-1]
+        return {
+            'departure': int(self.departure[first[0]] + first[2]),
+            'arrival': int(self.arrival[last[1]] + last[2]),
+            'transfers': k - 1,
+            'legs': legs,
+        }
@@ -1,146 +1,215 @@
-import pandas as pd
 import os
-from typing import List, Dict, Optional
-from pathlib import Path
+import threading
+from itertools import islice
+from typing import Callable, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from src.repositories.data_store import (
+    FACETS, RailwayData, RailwayDataStore, get_shared_data_store, normalize_lower, normalize_upper, train_key
+)
+from src.repositories.record_query import (
+    Predicate, decode_cursor, page, range_filter, scan, train_type_filter, value_filter
+)
 from src.scheduling.indian_railways_api import IndianRailwaysAPI
+from src.scheduling.prefetch import start_shared_prefetcher
+
+
+def _clock(minutes: Optional[int]) -> str:
+    """Minute of day (or a duration) as 'HH:MM'; 'N/A' when unknown."""
+    if minutes is None or minutes < 0:
+        return 'N/A'
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def _minutes(clock, default: int) -> int:
+    """'HH:MM' (or a minute count) as minute of day; default when empty or malformed."""
+    if isinstance(clock, int):
+        return clock
+    try:
+        hours, minutes = str(clock).strip().split(':')[:2]
+        return int(hours) * 60 + int(minutes)
+    except (TypeError, ValueError):
+        return default
+
+
+def _hours_to_minutes(hours) -> Optional[int]:
+    """Duration in hours (as the train table stores it) as whole minutes; None when unknown."""
+    try:
+        return int(round(float(hours) * 60))
+    except (TypeError, ValueError):
+        return None
+
+
+def _live_keys(train_no: str, name, departure, arrival, duration: Optional[int]) -> Dict:
+    """The keys the live trains-between-stations search returns, for offline results."""
+    return {
+        'number': train_no,
+        'name': name if isinstance(name, str) else '',
+        'src_departure_time': departure,
+        'dest_arrival_time': arrival,
+        'travel_time': _clock(duration) if duration is not None else 'N/A',
+    }
+
+
+def _train_filters(zone=None, from_code=None, to_code=None, train_type=None,
+                   min_distance: Optional[float] = None,
+                   max_distance: Optional[float] = None) -> List[Optional[Predicate]]:
+    return [
+        value_filter('zone', zone, normalize_upper),
+        value_filter('from_code', from_code, normalize_upper),
+        value_filter('to_code', to_code, normalize_upper),
+        train_type_filter(train_type),
+        range_filter('distance_km', min_distance, max_distance),
+    ]
+
+
+def _station_filters(state=None, zone=None, station_type=None) -> List[Optional[Predicate]]:
+    return [
+        value_filter('state', state, normalize_lower),
+        value_filter('zone', zone, normalize_upper),
+        value_filter('station_type', station_type, normalize_lower),
+    ]
+
 
 class TrainRepository:
-    """Repository for managing train and station data from CSV files + Live API."""
-    
-    def __init__(self):
-        self.data_path = Path(__file__).parent.parent.parent / "data"
-        self.stations_df = None
-        self.trains_df = None
-        self.schedule_df = None
-        self.api = IndianRailwaysAPI()  # Initialize live API
-        self._load_data()
-    
-    def _load_data(self):
-        """Load data from CSV files."""
-        try:
-            stations_file = self.data_path / "indian_stations.csv"
-            trains_file = self.data_path / "trains_with_coaches.csv"
-            schedule_file = self.data_path / "Train_details_22122017.csv"
-            
-            if stations_file.exists():
-                self.stations_df = pd.read_csv(stations_file)
-            
-            if trains_file.exists():
-                self.trains_df = pd.read_csv(trains_file)
-            
-            # Load detailed schedule data
-            if schedule_file.exists():
-                self.schedule_df = pd.read_csv(schedule_file)
-                print(f"✓ Loaded {len(self.schedule_df)} schedule entries from Train_details_22122017.csv")
-            else:
-                self.schedule_df = pd.DataFrame()
-                
-        except Exception as e:
-            print(f"Error loading data: {e}")
-            self.stations_df = pd.DataFrame()
-            self.trains_df = pd.DataFrame()
-            self.schedule_df = pd.DataFrame()
+    """Repository for managing train and station data from CSV files + Live API.
+
+    The data itself lives in the process-wide RailwayDataStore: rows are
+    frozen into shared read-only records and hash-indexed once per load, so
+    constructing a repository is cheap and lookups are dict hits rather than
+    DataFrame scans. Callers must ``.copy()`` a record before modifying it.
+    """
     
+    def __init__(self, store: Optional[RailwayDataStore] = None, api: Optional[IndianRailwaysAPI] = None):
+        self.store = store or get_shared_data_store()
+        self.api = api or IndianRailwaysAPI()  # Initialize live API
+
+        # Opt-in background cache warming for upcoming and popular trains
+        if os.getenv('RAILWAY_PREFETCH', '').lower() in ('1', 'true', 'yes'):
+            start_shared_prefetcher(self.api)
+
+    @property
+    def data(self) -> RailwayData:
+        """Current data snapshot; each query reads it once so a reload never mixes versions."""
+        return self.store.current
+
+    @property
+    def data_path(self):
+        return self.data.data_path
+
+    @property
+    def stations_df(self):
+        return self.data.stations_df
+
+    @property
+    def trains_df(self):
+        return self.data.trains_df
+
+    @property
+    def schedule_df(self):
+        return self.data.schedule_df
+
+    def reload(self):
+        """Re-read the CSVs for every repository in the process (atomic swap)."""
+        self.store.reload()
+
     def get_all_stations(self) -> List[Dict]:
         """Get all stations."""
-        if self.stations_df is None or self.stations_df.empty:
-            return []
-        return self.stations_df.to_dict('records')
+        return list(self.data.stations)
     
-    def search_stations(self, query: str) -> List[Dict]:
-        """Search stations by name or code."""
-        if self.stations_df is None or self.stations_df.empty:
-            return []
-        
-        query_lower = query.lower()
-        results = self.stations_df[
-            (self.stations_df['station_name'].str.lower().str.contains(query_lower, na=False)) |
-            (self.stations_df['station_code'].str.lower().str.contains(query_lower, na=False))
-        ]
-        return results.to_dict('records')
+    def search_stations(self, query: str, limit: Optional[int] = None) -> List[Dict]:
+        """Search stations by name, code or city alias (tolerates typos).
+
+        Stations whose name or code contains the query come first, as a plain
+        substring search would list them: word-prefix matches from the
+        autocomplete index in its ranking, then mid-word matches. Alias, word
+        and typo matches follow. Schedule-only stations are included with
+        just their code and name. A blank query lists every station.
+        """
+        data = self.data
+        needle = query.strip().lower()
+        if not needle:
+            return list(data.stations[:limit] if limit is not None else data.stations)
+        results = self.suggest(query, 'station', limit=limit)
+        if limit is not None and len(results) >= limit:
+            return results
+
+        # Short prefixes typed into a search box should not pull in typo matches
+        max_distance = min(2, len(needle) // 4)
+        seen = {station['station_code'] for station in results}
+        other = []
+        for candidate in data.station_index.search(query, limit=None, max_distance=max_distance):
+            station = data.station(candidate['code'])
+            if station is None or station['station_code'] in seen:
+                continue
+            seen.add(station['station_code'])
+            name = station.get('station_name')
+            if needle in candidate['code'].lower() or (isinstance(name, str) and needle in name.lower()):
+                results.append(station)
+                if limit is not None and len(results) >= limit:
+                    return results
+            else:
+                other.append(station)
+        results += other
+        return results[:limit] if limit is not None else results
     
     def get_station_by_code(self, code: str) -> Optional[Dict]:
         """Get station by code."""
-        if self.stations_df is None or self.stations_df.empty:
-            return None
-        
-        result = self.stations_df[self.stations_df['station_code'].str.upper() == code.upper()]
-        if result.empty:
-            return None
-        return result.iloc[0].to_dict()
+        return self.data.stations_by_code.get(normalize_upper(code))
     
     def get_stations_by_state(self, state: str) -> List[Dict]:
         """Get all stations in a state."""
-        if self.stations_df is None or self.stations_df.empty:
-            return []
-        
-        results = self.stations_df[self.stations_df['state'].str.lower() == state.lower()]
-        return results.to_dict('records')
+        return list(self.data.stations_by_state.get(normalize_lower(state), ()))
     
-    def get_trains_between_stations(self, from_code: str, to_code: str) -> List[Dict]:
-        """Get trains between two stations."""
-        if self.trains_df is None or self.trains_df.empty:
-            return []
-        
-        from_code_upper = from_code.upper()
-        to_code_upper = to_code.upper()
-        
-        results = self.trains_df[
-            (self.trains_df['from_code'].str.upper() == from_code_upper) &
-            (self.trains_df['to_code'].str.upper() == to_code_upper)
+    def get_trains_between_stations(self, from_code: str, to_code: str, limit: Optional[int] = None) -> List[Dict]:
+        """Every train calling at from_code and later at to_code, ordered by departure, offline.
+
+        Trains that serve the pair at intermediate stops come from the
+        schedule's stop index: times, distance and station names are those of
+        the from_code -> to_code segment, laid over the train's details when
+        the train table has it. Table trains running end to end between the
+        pair that the schedule lacks are included as they are. Every result
+        also carries the keys the live search returns (number, name,
+        src_departure_time, dest_arrival_time, travel_time).
+        """
+        data = self.data
+        results = []
+        for segment in self._schedule_segments(data, from_code, to_code, limit):
+            train = data.trains_by_no.get(segment['train_no'])
+            results.append({**train, **segment, 'train_no': train['train_no']} if train else segment)
+
+        scheduled = {train_key(train['train_no']) for train in results}
+        through = [
+            {**train, **_live_keys(str(train['train_no']), train.get('train_name'), train.get('departure_time'),
+                                   train.get('arrival_time'), _hours_to_minutes(train.get('duration_hrs')))}
+            for train in data.trains_by_route.get((normalize_upper(from_code), normalize_upper(to_code)), ())
+            if train_key(train['train_no']) not in scheduled
         ]
-        return results.to_dict('records')
+        if through:
+            # Stable: the schedule's own order is kept among equal departures
+            results = sorted(results + through, key=lambda train: _minutes(train.get('departure_time'), 1440))
+        return results[:limit] if limit is not None else results
     
     def get_train_details(self, train_no: str) -> Optional[Dict]:
-        """Get train details by train number."""
-        if self.trains_df is None or self.trains_df.empty:
-            return None
-        
-        result = self.trains_df[self.trains_df['train_no'] == int(train_no)]
-        if result.empty:
-            return None
-        
-        train = result.iloc[0].to_dict()
-        # Add coach breakdown
-        train['coach_breakdown'] = {
-            'SL': int(train.get('sl_coaches', 0)),
-            'AC2': int(train.get('ac2_coaches', 0)),
-            'AC3': int(train.get('ac3_coaches', 0)),
-            'FC': int(train.get('fc_coaches', 0))
-        }
-        return train
+        """Get train details (with coach breakdown) by train number."""
+        return self.data.trains_by_no.get(train_key(train_no))
     
     def get_trains_from_station(self, station_code: str) -> List[Dict]:
         """Get all trains departing from a station."""
-        if self.trains_df is None or self.trains_df.empty:
-            return []
-        
-        station_code_upper = station_code.upper()
-        results = self.trains_df[self.trains_df['from_code'].str.upper() == station_code_upper]
-        return results.to_dict('records')
+        return list(self.data.trains_from.get(normalize_upper(station_code), ()))
     
     def get_trains_to_station(self, station_code: str) -> List[Dict]:
         """Get all trains arriving at a station."""
-        if self.trains_df is None or self.trains_df.empty:
-            return []
-        
-        station_code_upper = station_code.upper()
-        results = self.trains_df[self.trains_df['to_code'].str.upper() == station_code_upper]
-        return results.to_dict('records')
+        return list(self.data.trains_to.get(normalize_upper(station_code), ()))
     
     def get_all_trains(self) -> List[Dict]:
         """Get all trains."""
-        if self.trains_df is None or self.trains_df.empty:
-            return []
-        return self.trains_df.to_dict('records')
+        return list(self.data.trains)
     
     def get_stations_by_zone(self, zone: str) -> List[Dict]:
         """Get stations by railway zone."""
-        if self.stations_df is None or self.stations_df.empty:
-            return []
-        
-        results = self.stations_df[self.stations_df['zone'].str.upper() == zone.upper()]
-        return results.to_dict('records')
+        return list(self.data.stations_by_zone.get(normalize_upper(zone), ()))
     
     def get_coach_details(self, train_no: str) -> Optional[Dict]:
         """Get detailed coach information for a train."""
@@ -165,41 +234,238 @@ class TrainRepository:
         }    
     def get_train_schedule(self, train_no: int) -> List[Dict]:
         """Get complete schedule for a train with all stops."""
-        if self.schedule_df is None or self.schedule_df.empty:
-            return []
-        
-        schedule = self.schedule_df[self.schedule_df['Train No'] == train_no]
-        if schedule.empty:
-            return []
-        
-        return schedule.to_dict('records')
+        return self.data.routes.records(train_no)
     
     def get_train_route_stops(self, train_no: int) -> List[str]:
         """Get all stops for a train in order."""
-        schedule = self.get_train_schedule(train_no)
-        if not schedule:
-            return []
-        
-        stops = []
-        for stop in schedule:
-            code = stop['Station Code']
-            name = stop['Station Name']
-            if code not in [s.split('(')[1].strip(')') if '(' in s else s for s in stops]:
-                stops.append(f"{name} ({code})")
-        
-        return stops
+        return self.data.routes.stops(train_no)
     
     def search_trains_by_name(self, train_name: str) -> List[Dict]:
-        """Search trains by name pattern."""
-        if self.trains_df is None or self.trains_df.empty:
-            return []
-        
-        query_lower = train_name.lower()
-        results = self.trains_df[
-            self.trains_df['train_name'].str.lower().str.contains(query_lower, na=False)
-        ]
-        return results.to_dict('records')
-    
+        """Listed trains whose name contains train_name; every train for a blank query.
+
+        Trains with a name word (or number) starting with train_name come
+        first in the autocomplete ranking, then mid-word matches in table order.
+        """
+        data = self.data
+        needle = train_name.strip().lower()
+        if not needle:
+            return list(data.trains)
+        trains_by_no = data.trains_by_no
+        results = self.suggest(train_name, 'train', limit=None,
+                               accept=lambda train: train_key(train['train_no']) in trains_by_no)
+        seen = {train_key(train['train_no']) for train in results}
+        for train in data.trains:
+            key = train_key(train['train_no'])
+            name = train.get('train_name')
+            if key not in seen and isinstance(name, str) and needle in name.lower():
+                seen.add(key)
+                results.append(train)
+        return results
+
+    def suggest(self, query: str, kind: str = 'all', limit: Optional[int] = 10,
+                accept: Optional[Callable[[Dict], bool]] = None, **filters) -> List[Dict]:
+        """Autocomplete: the station and/or train records best completing a typed prefix.
+
+        kind is 'station', 'train' or 'all'. Stations come back as station
+        records and trains as train details; schedule-only ones carry just
+        their code or number and name. With a single kind, the iter_stations /
+        iter_trains filters (and an accept predicate on the record) are
+        applied before the limit, so a filtered search still returns up to
+        limit records.
+        """
+        data = self.data
+        if filters and kind not in ('station', 'train'):
+            raise ValueError("Filters need kind='station' or kind='train'")
+        checks = [check for check in (_station_filters(**filters) if kind == 'station' else
+                                      _train_filters(**filters) if kind == 'train' else [])
+                  if check is not None]
+        if accept is not None:
+            checks.append(accept)
+
+        def resolve(item: Dict) -> Optional[Dict]:
+            return data.station(item['code']) if item['kind'] == 'station' else data.train(item['train_no'])
+
+        def wanted(item: Dict) -> bool:
+            record = resolve(item)
+            return record is not None and all(check(record) for check in checks)
+
+        return [resolve(item) for item in data.suggest_index.suggest(query, kind, limit, wanted)]
+
+    def _schedule_segments(self, data: RailwayData, from_code: str, to_code: str,
+                           limit: Optional[int]) -> List[Dict]:
+        """from_code -> to_code segments of every scheduled train calling at both in order, by departure."""
+        routes = data.routes
+        index = routes.stop_index()
+        boarding, alighting = index.between(from_code, to_code)
+        order = np.lexsort((index.train[boarding], index.departure_min[boarding]))
+        if limit is not None:
+            order = order[:max(limit, 0)]
+
+        from_station = data.station(from_code) or {}
+        to_station = data.station(to_code) or {}
+        segments = []
+        for a, b in zip(boarding[order].tolist(), alighting[order].tolist()):
+            departure, arrival = int(index.departure_min[a]), int(index.arrival_min[b])
+            duration = (arrival - departure) % 1440 if departure >= 0 and arrival >= 0 else None
+            row = int(index.row[a])
+            train_no = str(int(index.train[a]))
+            name = routes.cell(row, 'Train Name')
+            name = name if isinstance(name, str) else ''
+            segment = {
+                'train_no': train_no,
+                'train_name': name,
+                'from_code': normalize_upper(from_code),
+                'to_code': normalize_upper(to_code),
+                'from_station': from_station.get('station_name', normalize_upper(from_code)),
+                'to_station': to_station.get('station_name', normalize_upper(to_code)),
+                'departure_min': departure,
+                'arrival_min': arrival,
+                'departure_time': _clock(departure),
+                'arrival_time': _clock(arrival),
+                'duration_min': duration,
+                'duration_hrs': round(duration / 60, 2) if duration is not None else None,
+                'distance_km': round(float(index.distance[b] - index.distance[a]), 1),
+                'stops': int(index.seq[b] - index.seq[a]),
+            }
+            segment.update(_live_keys(train_no, name, segment['departure_time'], segment['arrival_time'], duration))
+            segments.append(segment)
+        return segments
+
+    def plan_journeys(self, from_code: str, to_code: str, depart_after: str = "00:00",
+                      depart_before: str = "23:59", max_transfers: int = 1,
+                      min_transfer_minutes: int = 30, limit: Optional[int] = None) -> List[Dict]:
+        """Journeys from the local timetable, changing trains at most max_transfers times.
+
+        Departure window bounds are 'HH:MM' on the day of travel; every change
+        leaves at least min_transfer_minutes at the junction. Returns the
+        Pareto-best journeys (later departure, earlier arrival, fewer changes),
+        ordered by departure, each with its legs.
+        """
+        data = self.data
+        routes = data.routes
+        journeys = data.timetable.plan(
+            from_code, to_code, _minutes(depart_after, 0), _minutes(depart_before, 1439),
+            max_transfers=max_transfers, min_transfer=min_transfer_minutes
+        )
+        if limit is not None:
+            journeys = journeys[:max(limit, 0)]
+
+        index = data.timetable.index
+        results = []
+        for journey in journeys:
+            legs = []
+            for board, alight, shift in journey['legs']:
+                departure = int(data.timetable.departure[board]) + shift
+                arrival = int(data.timetable.arrival[alight]) + shift
+                name = routes.cell(board, 'Train Name')
+                legs.append({
+                    'train_no': str(int(index.row_train[board])),
+                    'train_name': name if isinstance(name, str) else '',
+                    'from_code': index.codes[index.row_station[board]],
+                    'to_code': index.codes[index.row_station[alight]],
+                    'departure_time': _clock(departure % 1440),
+                    'arrival_time': _clock(arrival % 1440),
+                    'departure_day': departure // 1440,
+                    'arrival_day': arrival // 1440,
+                    'duration_min': arrival - departure,
+                    'distance_km': round(float(index.row_distance[alight] - index.row_distance[board]), 1),
+                })
+            results.append({
+                'from_code': normalize_upper(from_code),
+                'to_code': normalize_upper(to_code),
+                'departure_time': legs[0]['departure_time'],
+                'arrival_time': legs[-1]['arrival_time'],
+                'arrival_day': legs[-1]['arrival_day'],
+                'duration_min': journey['arrival'] - journey['departure'],
+                'transfers': journey['transfers'],
+                'distance_km': round(sum(leg['distance_km'] for leg in legs), 1),
+                'legs': legs,
+            })
+        return results
+
+    # ========== PAGINATED / STREAMING LISTINGS ==========
+
+    def _train_scan(self, data: RailwayData, sort_by: Optional[str], descending: bool, start: int,
+                    zone=None, from_code=None, to_code=None, train_type=None,
+                    min_distance: Optional[float] = None, max_distance: Optional[float] = None):
+        # Unsorted listings start from the narrowest index group instead of every train
+        if sort_by:
+            base = data.ordered('trains', sort_by, descending)
+        elif isinstance(from_code, str):
+            base = data.trains_from.get(normalize_upper(from_code), ())
+        elif isinstance(to_code, str):
+            base = data.trains_to.get(normalize_upper(to_code), ())
+        elif isinstance(zone, str):
+            base = data.trains_by_zone.get(normalize_upper(zone), ())
+        else:
+            base = data.trains
+        return scan(base, _train_filters(zone, from_code, to_code, train_type, min_distance, max_distance), start)
+
+    def _station_scan(self, data: RailwayData, sort_by: Optional[str], descending: bool, start: int,
+                      state=None, zone=None, station_type=None):
+        if sort_by:
+            base = data.ordered('stations', sort_by, descending)
+        elif isinstance(state, str):
+            base = data.stations_by_state.get(normalize_lower(state), ())
+        elif isinstance(zone, str):
+            base = data.stations_by_zone.get(normalize_upper(zone), ())
+        else:
+            base = data.stations
+        return scan(base, _station_filters(state, zone, station_type), start)
+
+    def iter_trains(self, sort_by: Optional[str] = None, descending: bool = False, **filters) -> Iterator[Dict]:
+        """Yield matching trains one at a time (shared read-only records).
+
+        Filters: zone, from_code, to_code, train_type (one value or a list of
+        them), min_distance / max_distance in km.
+        """
+        for _, train in self._train_scan(self.data, sort_by, descending, 0, **filters):
+            yield train
+
+    def iter_stations(self, sort_by: Optional[str] = None, descending: bool = False, **filters) -> Iterator[Dict]:
+        """Yield matching stations one at a time. Filters: state, zone, station_type."""
+        for _, station in self._station_scan(self.data, sort_by, descending, 0, **filters):
+            yield station
+
+    def query_trains(self, limit: int = 20, offset: int = 0, cursor: Optional[str] = None,
+                     sort_by: Optional[str] = None, descending: bool = False, **filters) -> Dict:
+        """One page of trains: {'items', 'count', 'has_more', 'next_cursor'}.
+
+        Pass the previous page's next_cursor (with the same filters and sort)
+        to continue; otherwise offset skips that many matches.
+        """
+        data = self.data
+        start = decode_cursor(cursor, data.version) if cursor else 0
+        matches = self._train_scan(data, sort_by, descending, start, **filters)
+        return page(islice(matches, 0 if cursor else max(offset, 0), None), max(limit, 0), data.version)
+
+    def query_stations(self, limit: int = 20, offset: int = 0, cursor: Optional[str] = None,
+                       sort_by: Optional[str] = None, descending: bool = False, **filters) -> Dict:
+        """One page of stations; same paging as query_trains."""
+        data = self.data
+        start = decode_cursor(cursor, data.version) if cursor else 0
+        matches = self._station_scan(data, sort_by, descending, start, **filters)
+        return page(islice(matches, 0 if cursor else max(offset, 0), None), max(limit, 0), data.version)
+
+    def count_trains(self, **filters) -> int:
+        """Number of trains iter_trains(**filters) yields; zone filters are counted without a scan."""
+        return self._count('trains', self._train_scan, filters)
+
+    def count_stations(self, **filters) -> int:
+        """Number of stations iter_stations(**filters) yields, counted without a scan."""
+        return self._count('stations', self._station_scan, filters)
+
+    def _count(self, kind: str, scanner, filters: Dict) -> int:
+        data = self.data
+        filters = {field: value for field, value in filters.items() if value is not None}
+        if all(field in FACETS[kind] for field in filters):
+            return data.count(kind, **filters)
+        return sum(1 for _ in scanner(data, None, False, 0, **filters))
+
+    def get_filter_values(self, kind: str, field: str) -> Dict[str, int]:
+        """Distinct values of a 'trains' or 'stations' filter field, with how many records have each."""
+        return self.data.facet_counts(kind, field)
+
     # ========== LIVE API METHODS ==========
     
     def get_live_train_status(self, train_no: str) -> Optional[Dict]:
@@ -210,10 +476,11 @@ class TrainRepository:
             print(f"Error fetching live status: {e}")
             return None
     
-    def search_trains_api(self, from_station: str, to_station: str, date: str = None) -> List[Dict]:
+    def search_trains_api(self, from_station: str, to_station: str, date: str = None,
+                          limit: Optional[int] = None) -> List[Dict]:
         """Search trains between two stations using live API."""
         try:
-            return self.api.get_all_trains_between_stations(from_station, to_station, date)
+            return self.api.get_all_trains_between_stations(from_station, to_station, date, limit)
         except Exception as e:
             print(f"Error searching trains: {e}")
             return []
@@ -252,4 +519,18 @@ class TrainRepository:
             return self.api.get_train_journey_schedule(str(train_no), journey_date)
         except Exception as e:
             print(f"Error fetching journey schedule: {e}")
-            return None
\ No newline at end of file
+            return None
+
+
+_shared_repository: Optional[TrainRepository] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_repository() -> TrainRepository:
+    """Process-wide repository (one data store, one API client) for services and views."""
+    global _shared_repository
+    if _shared_repository is None:
+        with _shared_lock:
+            if _shared_repository is None:
+                _shared_repository = TrainRepository()
+    return _shared_repository
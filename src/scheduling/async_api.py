@@ -0,0 +1,129 @@
+"""
+Asyncio front-end for IndianRailwaysAPI with bounded fan-out.
+
+Calls run the blocking client on a worker pool (sharing its keep-alive
+transport and NTES session). Two limits apply. On the event loop, one
+semaphore per endpoint family bounds how many calls of a board are in the
+pool at once: 'ntes' for live and running status (served by NTES first)
+and 'rest' for the REST-only endpoints. The per-provider caps are the
+client's ProviderSlots, taken inside the provider loop around the request
+to the provider that was actually chosen, so a fallback to another REST
+provider counts against that provider and not against a fixed name.
+"""
+
+import asyncio
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional
+
+from src.scheduling.indian_railways_api import IndianRailwaysAPI
+from src.scheduling.single_flight import SingleFlight, get_shared_single_flight
+
+
+# Calls in the worker pool at once per endpoint family
+DEFAULT_CONCURRENCY = {
+    'ntes': 8,
+    'rest': 10,
+}
+
+
+class AsyncIndianRailwaysAPI:
+    """Async wrapper around IndianRailwaysAPI with per-family fan-out limits."""
+
+    def __init__(self, api: Optional[IndianRailwaysAPI] = None,
+                 concurrency: Optional[Dict[str, int]] = None,
+                 default_limit: int = 5, single_flight: Optional[SingleFlight] = None):
+        self.api = api or IndianRailwaysAPI()
+        self.single_flight = (single_flight or getattr(self.api, 'single_flight', None)
+                              or get_shared_single_flight())
+        self.concurrency = {**DEFAULT_CONCURRENCY, **(concurrency or {})}
+        self.default_limit = default_limit
+        # asyncio semaphores belong to one loop; keep a set per loop, dropped with it
+        self._semaphores: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(sum(self.concurrency.values()), default_limit),
+            thread_name_prefix="railways-async"
+        )
+
+    def _semaphore(self, family: str) -> asyncio.Semaphore:
+        semaphores = self._semaphores.setdefault(asyncio.get_running_loop(), {})
+        semaphore = semaphores.get(family)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.concurrency.get(family, self.default_limit))
+            semaphores[family] = semaphore
+        return semaphore
+
+    async def _call(self, family: str, func: Callable, *args):
+        """Run a blocking client call under its endpoint family's fan-out limit.
+
+        Identical concurrent calls are coalesced before they take a semaphore
+        slot or a worker thread.
+        """
+        async def run():
+            async with self._semaphore(family):
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self._executor, func, *args)
+
+        return await self.single_flight.do_async((func.__name__,) + args, run)
+
+    async def get_live_train_status(self, train_no: str, date: str = None) -> Optional[Dict]:
+        """Live status (NTES first, REST providers as fallback)."""
+        return await self._call('ntes', self.api.get_live_train_status, str(train_no), date)
+
+    async def get_realtime_train_status(self, train_number: int) -> Optional[Dict]:
+        """NTES running status with parsed events."""
+        return await self._call('ntes', self.api.get_realtime_train_status, int(train_number))
+
+    async def get_train_journey_schedule(self, train_no: str, journey_date: str = None) -> Optional[Dict]:
+        """Station-by-station journey schedule."""
+        return await self._call('rest', self.api.get_train_journey_schedule,
+                                str(train_no), journey_date)
+
+    async def get_all_trains_between_stations(self, from_station: str, to_station: str,
+                                              date: str = None, limit: Optional[int] = None) -> List[Dict]:
+        """All trains between two stations (the first `limit` when given)."""
+        return await self._call('rest', self.api.get_all_trains_between_stations,
+                                from_station, to_station, date, limit)
+
+    async def get_pnr_status(self, pnr_number: str) -> Optional[Dict]:
+        """PNR status."""
+        return await self._call('rest', self.api.get_pnr_status, pnr_number)
+
+    async def get_train_fare(self, train_no: str, from_station: str, to_station: str,
+                             train_class: str = "SL", age: int = 25) -> Optional[Dict]:
+        """Fare between two stations."""
+        return await self._call('rest', self.api.get_train_fare,
+                                train_no, from_station, to_station, train_class, age)
+
+    async def gather_live_status(self, train_nos: Iterable[str],
+                                 date: str = None) -> Dict[str, Optional[Dict]]:
+        """Fetch live status for many trains concurrently; failures map to None."""
+        train_nos = [str(train_no) for train_no in train_nos]
+        results = await asyncio.gather(
+            *(self.get_live_train_status(train_no, date) for train_no in train_nos),
+            return_exceptions=True
+        )
+        return {
+            train_no: (None if isinstance(result, BaseException) else result)
+            for train_no, result in zip(train_nos, results)
+        }
+
+    def close(self):
+        """Shut down the worker pool."""
+        self._executor.shutdown(wait=False)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def gather_live_status(train_nos: Iterable[str], api: Optional[IndianRailwaysAPI] = None,
+                       concurrency: Optional[Dict[str, int]] = None) -> Dict[str, Optional[Dict]]:
+    """Blocking helper for sync callers (Streamlit, TrainStatusMonitor)."""
+    async def _run():
+        async with AsyncIndianRailwaysAPI(api, concurrency) as client:
+            return await client.gather_live_status(train_nos)
+
+    return asyncio.run(_run())
@@ -0,0 +1,105 @@
+"""
+Hedged requests across railway data providers.
+
+If the primary provider has not answered within its observed p90 latency,
+a second request goes to the next-best provider and the first valid
+response wins. Hedges draw from a token budget that refills by a fixed
+fraction of each call, so extra quota usage stays bounded.
+"""
+
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, TimeoutError, wait
+from typing import Any, Callable, Dict, Optional
+
+
+DEFAULT_HEDGE_AFTER_S = 2.0
+
+
+class HedgeBudget:
+    """Token bucket: every call earns `ratio` tokens (capped at `burst`), a hedge spends one."""
+
+    def __init__(self, ratio: float = 0.1, burst: float = 5.0):
+        self.ratio = ratio
+        self.burst = burst
+        self._tokens = burst
+        self._lock = threading.Lock()
+
+    def record_call(self):
+        with self._lock:
+            self._tokens = min(self.burst, self._tokens + self.ratio)
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            if self._tokens >= 1.0:
+                self._tokens -= 1.0
+                return True
+            return False
+
+    @property
+    def tokens(self) -> float:
+        return self._tokens
+
+
+class Hedger:
+    """Runs a primary call and, if it is slow, a budgeted backup call; first valid result wins."""
+
+    def __init__(self, budget: Optional[HedgeBudget] = None, max_workers: int = 16):
+        self.budget = budget or HedgeBudget()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="railways-hedge")
+        self._lock = threading.Lock()
+        self.stats = {'calls': 0, 'hedges_sent': 0, 'hedge_wins': 0, 'budget_denied': 0}
+
+    def _count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+
+    def call(self, primary: Callable[[], Any], secondary: Callable[[], Any],
+             hedge_after: Optional[float]) -> Any:
+        """Return the first non-None result of primary/secondary."""
+        self._count('calls')
+        self.budget.record_call()
+        first = self._executor.submit(primary)
+
+        try:
+            result = first.result(timeout=hedge_after or DEFAULT_HEDGE_AFTER_S)
+        except TimeoutError:
+            pass
+        else:
+            # Primary answered in time; a fast failure falls over without hedging
+            return result if result is not None else secondary()
+
+        if not self.budget.try_acquire():
+            self._count('budget_denied')
+            result = first.result()
+            return result if result is not None else secondary()
+
+        self._count('hedges_sent')
+        second = self._executor.submit(secondary)
+        pending = {first, second}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                if result is not None:
+                    if future is second:
+                        self._count('hedge_wins')
+                    return result
+        return None
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {**self.stats, 'budget_tokens': round(self.budget.tokens, 2)}
+
+
+_shared_hedger: Optional[Hedger] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_hedger() -> Hedger:
+    """Process-wide hedger so the hedge budget is shared by every client."""
+    global _shared_hedger
+    if _shared_hedger is None:
+        with _shared_lock:
+            if _shared_hedger is None:
+                _shared_hedger = Hedger()
+    return _shared_hedger
@@ -0,0 +1,193 @@
+"""
+Pooled HTTP transport for the railway data providers.
+
+Keeps one keep-alive ``requests.Session`` per provider so repeated lookups
+reuse TCP/TLS connections instead of paying a fresh handshake each time.
+Every exchange on those sessions is timed into the metrics registry.
+"""
+
+import os
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.scheduling.metrics import MetricsRegistry, endpoint_label, get_shared_metrics
+
+
+DEFAULT_POOL_SIZE = int(os.getenv('RAILWAY_HTTP_POOL_SIZE', '10'))
+DEFAULT_CONNECT_TIMEOUT = float(os.getenv('RAILWAY_HTTP_CONNECT_TIMEOUT', '3.05'))
+DEFAULT_READ_TIMEOUT = float(os.getenv('RAILWAY_HTTP_READ_TIMEOUT', '10'))
+
+
+class InstrumentedSession(requests.Session):
+    """Session that records latency, errors and bytes of every request it sends."""
+
+    def __init__(self, provider: str, metrics: MetricsRegistry):
+        super().__init__()
+        self.provider = provider
+        self.metrics = metrics
+
+    def send(self, request, **kwargs):
+        start = time.perf_counter()
+        endpoint = endpoint_label(request.url)
+        try:
+            response = super().send(request, **kwargs)
+        except Exception as e:
+            self.metrics.observe(self.provider, endpoint, time.perf_counter() - start, type(e).__name__)
+            raise
+        if kwargs.get('stream'):
+            # Body not read yet: latency is time to headers, size is what the server announced
+            size = int(response.headers.get('Content-Length') or 0)
+        else:
+            size = len(response.content or b'')
+        error = f"HTTP {response.status_code}" if response.status_code >= 400 else None
+        self.metrics.observe(self.provider, endpoint, time.perf_counter() - start, error, size)
+        return response
+
+
+class PooledTransport:
+    """Per-provider pool of keep-alive sessions with split connect/read timeouts."""
+
+    def __init__(self, pool_size: int = DEFAULT_POOL_SIZE,
+                 connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+                 read_timeout: float = DEFAULT_READ_TIMEOUT,
+                 verify: bool = False,
+                 adapter_factory: Optional[Callable[[str, int], requests.adapters.BaseAdapter]] = None,
+                 metrics: Optional[MetricsRegistry] = None):
+        self.pool_size = pool_size
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.verify = verify
+        # (provider, pool_size) -> adapter; lets the record/replay harness swap the network out
+        self.adapter_factory = adapter_factory or self._pooled_adapter
+        self.metrics = metrics or get_shared_metrics()
+        self._sessions: Dict[str, requests.Session] = {}
+        self._adapters: Dict[str, HTTPAdapter] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def timeout(self) -> Tuple[float, float]:
+        """(connect, read) timeout tuple passed to requests."""
+        return (self.connect_timeout, self.read_timeout)
+
+    def session(self, provider: str) -> requests.Session:
+        """Get (or lazily create) the keep-alive session for a provider."""
+        session = self._sessions.get(provider)
+        if session is not None:
+            return session
+
+        with self._lock:
+            session = self._sessions.get(provider)
+            if session is None:
+                adapter = self.adapter_factory(provider, self.pool_size)
+                session = InstrumentedSession(provider, self.metrics)
+                session.verify = self.verify
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                self._adapters[provider] = adapter
+                self._sessions[provider] = session
+            return session
+
+    @staticmethod
+    def _pooled_adapter(provider: str, pool_size: int) -> HTTPAdapter:
+        return HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, pool_block=False)
+
+    def request(self, provider: str, method: str, url: str,
+                timeout: Optional[Tuple[float, float]] = None, **kwargs) -> requests.Response:
+        """Send a request through the provider's pooled session."""
+        return self.session(provider).request(method, url, timeout=timeout or self.timeout, **kwargs)
+
+    def get(self, provider: str, url: str, **kwargs) -> requests.Response:
+        """Send a GET through the provider's pooled session."""
+        return self.request(provider, 'GET', url, **kwargs)
+
+    def post(self, provider: str, url: str, **kwargs) -> requests.Response:
+        """Send a POST through the provider's pooled session."""
+        return self.request(provider, 'POST', url, **kwargs)
+
+    def get_stats(self) -> Dict:
+        """Pool hit rate per provider: share of requests served on a reused connection."""
+        providers = {}
+        total_requests = 0
+        total_connections = 0
+
+        with self._lock:
+            adapters = dict(self._adapters)
+
+        for provider, adapter in adapters.items():
+            requests_sent = 0
+            connections_opened = 0
+            if not hasattr(adapter, 'poolmanager'):
+                continue  # replayed traffic opens no connections
+            pools = adapter.poolmanager.pools
+            for key in pools.keys():
+                pool = pools.get(key)
+                if pool is None:
+                    continue
+                requests_sent += pool.num_requests
+                connections_opened += pool.num_connections
+
+            total_requests += requests_sent
+            total_connections += connections_opened
+            providers[provider] = {
+                'requests': requests_sent,
+                'connections_opened': connections_opened,
+                'hit_rate': self._hit_rate(requests_sent, connections_opened)
+            }
+
+        return {
+            'pool_size': self.pool_size,
+            'timeout': {'connect': self.connect_timeout, 'read': self.read_timeout},
+            'requests': total_requests,
+            'connections_opened': total_connections,
+            'hit_rate': self._hit_rate(total_requests, total_connections),
+            'providers': providers
+        }
+
+    def close(self):
+        """Close every pooled session."""
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+            self._adapters.clear()
+
+    @staticmethod
+    def _hit_rate(requests_sent: int, connections_opened: int) -> float:
+        if requests_sent == 0:
+            return 0.0
+        return max(0.0, 1.0 - connections_opened / requests_sent)
+
+
+_shared_transport: Optional[PooledTransport] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_transport() -> PooledTransport:
+    """Process-wide transport shared by every IndianRailwaysAPI instance.
+
+    RAILWAY_HTTP_MODE=record|replay swaps in the offline harness (see replay.py).
+    """
+    global _shared_transport
+    if _shared_transport is None:
+        with _shared_lock:
+            if _shared_transport is None:
+                from src.scheduling.replay import transport_from_env
+                _shared_transport = transport_from_env() or PooledTransport()
+    return _shared_transport
+
+
+def configure_shared_transport(pool_size: int = DEFAULT_POOL_SIZE,
+                               connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+                               read_timeout: float = DEFAULT_READ_TIMEOUT) -> PooledTransport:
+    """Replace the shared transport with one using the given pool size and timeouts."""
+    global _shared_transport
+    with _shared_lock:
+        previous = _shared_transport
+        _shared_transport = PooledTransport(pool_size, connect_timeout, read_timeout)
+    if previous is not None:
+        previous.close()
+    return _shared_transport
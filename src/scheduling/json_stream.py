@@ -0,0 +1,151 @@
+"""
+Incremental JSON decoding for large provider payloads.
+
+Between-stations and journey-schedule responses are one object holding a
+long array (``trains``, ``stations`` ...) plus a few scalar fields. Instead
+of buffering and decoding the whole body, ``iter_json_events`` reads the
+response in chunks and yields each array element as soon as it is complete,
+so a caller that only needs the first N trains stops reading (and closes
+the response) after N. Only the current element is ever held as text.
+"""
+
+import codecs
+import json
+from typing import Any, Iterable, Iterator, Optional, Tuple
+
+import requests
+
+
+CHUNK_SIZE = 16 * 1024
+
+_WHITESPACE = " \t\r\n"
+_decoder = json.JSONDecoder()
+
+
+class _Reader:
+    """Text buffer over an iterator of byte chunks, trimmed as values are consumed."""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self._utf8 = codecs.getincrementaldecoder('utf-8')('replace')
+        self.buf = ""
+        self.pos = 0
+        self.exhausted = False
+
+    def fill(self) -> bool:
+        """Append the next chunk; False once the stream is exhausted."""
+        if self.exhausted:
+            return False
+        for chunk in self._chunks:
+            if chunk:
+                # Drop consumed text so the buffer never grows with the payload
+                self.buf = self.buf[self.pos:] + self._utf8.decode(chunk)
+                self.pos = 0
+                return True
+        self.buf = self.buf[self.pos:] + self._utf8.decode(b"", final=True)
+        self.pos = 0
+        self.exhausted = True
+        return False
+
+    def peek(self) -> Optional[str]:
+        """Next non-whitespace character (not consumed), or None at end of stream."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self.fill():
+                return None
+
+    def expect(self, char: str):
+        if self.peek() != char:
+            raise ValueError(f"expected {char!r} at offset {self.pos} in streamed JSON")
+        self.pos += 1
+
+    def value(self) -> Any:
+        """Decode one complete JSON value, reading more chunks until it is whole."""
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if not self.fill():
+                    raise
+                continue
+            # A number (or literal) ending exactly at the buffer edge may continue in the next chunk
+            if end == len(self.buf) and not self.exhausted and self.fill():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_json_events(chunks: Iterable[bytes], array_keys: Tuple[str, ...] = ()) -> Iterator[Tuple[str, Optional[str], Any]]:
+    """Yield ('item', key, element) for elements of the named top-level arrays, as they complete,
+    and ('field', key, value) for every other top-level field. A named array that turns out
+    empty is reported as ('field', key, []). A top-level array yields ('item', None, element)."""
+    reader = _Reader(chunks)
+    first = reader.peek()
+
+    if first == '[':
+        yield from _iter_array(reader, None)
+        return
+    reader.expect('{')
+
+    if reader.peek() == '}':
+        return
+    while True:
+        key = reader.value()
+        reader.expect(':')
+        if key in array_keys and reader.peek() == '[':
+            items = 0
+            for event in _iter_array(reader, key):
+                items += 1
+                yield event
+            if not items:
+                yield ('field', key, [])
+        else:
+            yield ('field', key, reader.value())
+
+        separator = reader.peek()
+        if separator == ',':
+            reader.pos += 1
+            continue
+        reader.expect('}')
+        return
+
+
+def _iter_array(reader: _Reader, key: Optional[str]):
+    reader.expect('[')
+    if reader.peek() == ']':
+        reader.pos += 1
+        return
+    while True:
+        yield ('item', key, reader.value())
+        if reader.peek() == ',':
+            reader.pos += 1
+            continue
+        reader.expect(']')
+        return
+
+
+def iter_json_array(chunks: Iterable[bytes], keys: Tuple[str, ...],
+                    limit: Optional[int] = None) -> Iterator[Any]:
+    """Elements of the first matching top-level array, stopping after `limit`."""
+    if limit is not None and limit <= 0:
+        return
+    count = 0
+    for kind, key, value in iter_json_events(chunks, keys):
+        if kind != 'item':
+            continue
+        yield value
+        count += 1
+        if limit is not None and count >= limit:
+            return
+
+
+def response_chunks(response: requests.Response, chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """Body chunks of a streamed response; the response is closed when iteration stops early."""
+    try:
+        yield from response.iter_content(chunk_size=chunk_size)
+    finally:
+        response.close()
@@ -0,0 +1,246 @@
+"""
+Latency and error instrumentation for every outbound call.
+
+MetricsRegistry keeps, per (provider, endpoint), a fixed-bucket latency
+histogram (p50/p95/p99 are interpolated from it, so memory stays constant
+however many calls are made), error counts by class, retries and bytes
+received. PooledTransport records every HTTP exchange automatically; other
+outbound calls (cloud services) use ``registry.timed()``.
+
+Query it in-process with ``query()``/``get_stats()``, or scrape the
+Prometheus-style text from ``export_text()`` / ``start_metrics_server()``.
+"""
+
+import bisect
+import os
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+
+# Upper bounds of the latency buckets in seconds (last bucket is open-ended)
+LATENCY_BUCKETS_S = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.15, 0.2, 0.3, 0.5, 0.75,
+                     1.0, 1.5, 2.0, 3.0, 5.0, 7.5, 10.0, 15.0, 30.0)
+
+# Leading path segments that never identify the endpoint
+_PATH_PREFIXES = {'api', 'v1', 'v2', 'v3', 'mntes'}
+
+
+def endpoint_label(url: str) -> str:
+    """Low-cardinality endpoint name for a URL: its first meaningful path segment."""
+    for segment in urlsplit(url).path.split('/'):
+        if not segment or segment.lower() in _PATH_PREFIXES:
+            continue
+        return ':id' if any(char.isdigit() for char in segment) else segment
+    return '/'
+
+
+class LatencyHistogram:
+    """Counts per fixed latency bucket, plus sum and max."""
+
+    def __init__(self, bounds: Tuple[float, ...] = LATENCY_BUCKETS_S):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float):
+        self.counts[bisect.bisect_left(self.bounds, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def percentile(self, pct: float) -> float:
+        """Latency at the given percentile, interpolated linearly inside its bucket."""
+        if not self.count:
+            return 0.0
+        rank = pct / 100.0 * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            if bucket_count and seen + bucket_count >= rank:
+                low = self.bounds[index - 1] if index else 0.0
+                high = self.bounds[index] if index < len(self.bounds) else self.max
+                return min(low + (high - low) * (rank - seen) / bucket_count, self.max)
+            seen += bucket_count
+        return self.max
+
+
+class _CallStats:
+    """Everything recorded for one (provider, endpoint)."""
+
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.errors: Dict[str, int] = {}
+        self.retries = 0
+        self.bytes_received = 0
+
+    def summary(self) -> Dict:
+        latency = self.latency
+        return {
+            'calls': latency.count,
+            'errors': sum(self.errors.values()),
+            'errors_by_class': dict(self.errors),
+            'error_rate': sum(self.errors.values()) / latency.count if latency.count else 0.0,
+            'retries': self.retries,
+            'bytes_received': self.bytes_received,
+            'p50_ms': round(latency.percentile(50) * 1000, 1),
+            'p95_ms': round(latency.percentile(95) * 1000, 1),
+            'p99_ms': round(latency.percentile(99) * 1000, 1),
+            'max_ms': round(latency.max * 1000, 1),
+            'mean_ms': round(latency.total / latency.count * 1000, 1) if latency.count else 0.0,
+        }
+
+
+class _Timing:
+    """Handle yielded by MetricsRegistry.timed(); set ``error`` or ``bytes_received`` on it."""
+
+    def __init__(self):
+        self.error: Optional[str] = None
+        self.bytes_received = 0
+
+
+class MetricsRegistry:
+    """Thread-safe per-provider, per-endpoint call metrics."""
+
+    def __init__(self):
+        self._calls: Dict[Tuple[str, str], _CallStats] = {}
+        self._lock = threading.Lock()
+
+    def _stats(self, provider: str, endpoint: str) -> _CallStats:
+        key = (provider, endpoint)
+        stats = self._calls.get(key)
+        if stats is None:
+            stats = self._calls[key] = _CallStats()
+        return stats
+
+    def observe(self, provider: str, endpoint: str, seconds: float,
+                error: Optional[str] = None, bytes_received: int = 0):
+        """Record one completed (or failed) call."""
+        with self._lock:
+            stats = self._stats(provider, endpoint)
+            stats.latency.observe(seconds)
+            stats.bytes_received += bytes_received
+            if error:
+                stats.errors[error] = stats.errors.get(error, 0) + 1
+
+    def error(self, provider: str, endpoint: str, error: str):
+        """Count an error found after the call itself succeeded (e.g. an unparseable body)."""
+        with self._lock:
+            errors = self._stats(provider, endpoint).errors
+            errors[error] = errors.get(error, 0) + 1
+
+    def retry(self, provider: str, endpoint: str):
+        """Count a call that is a retry (or hedge) of an earlier attempt."""
+        with self._lock:
+            self._stats(provider, endpoint).retries += 1
+
+    @contextmanager
+    def timed(self, provider: str, endpoint: str):
+        """Time the block; an exception is recorded by class name and re-raised."""
+        timing = _Timing()
+        start = time.perf_counter()
+        try:
+            yield timing
+        except Exception as e:
+            timing.error = type(e).__name__
+            raise
+        finally:
+            self.observe(provider, endpoint, time.perf_counter() - start,
+                         timing.error, timing.bytes_received)
+
+    def query(self, provider: Optional[str] = None, endpoint: Optional[str] = None) -> List[Dict]:
+        """Summaries for the matching (provider, endpoint) pairs, slowest p95 first."""
+        with self._lock:
+            rows = [{'provider': p, 'endpoint': e, **stats.summary()}
+                    for (p, e), stats in self._calls.items()
+                    if (provider is None or p == provider) and (endpoint is None or e == endpoint)]
+        return sorted(rows, key=lambda row: -row['p95_ms'])
+
+    def get_stats(self) -> Dict[str, Dict[str, Dict]]:
+        """Nested {provider: {endpoint: summary}}."""
+        stats: Dict[str, Dict[str, Dict]] = {}
+        for row in self.query():
+            provider, endpoint = row.pop('provider'), row.pop('endpoint')
+            stats.setdefault(provider, {})[endpoint] = row
+        return stats
+
+    def reset(self):
+        with self._lock:
+            self._calls.clear()
+
+    def export_text(self) -> str:
+        """Prometheus text exposition of every series."""
+        lines = [
+            "# TYPE railway_call_duration_seconds histogram",
+            "# TYPE railway_call_latency_seconds gauge",
+            "# TYPE railway_call_errors_total counter",
+            "# TYPE railway_call_retries_total counter",
+            "# TYPE railway_call_bytes_received_total counter",
+        ]
+        with self._lock:
+            for (provider, endpoint), stats in sorted(self._calls.items()):
+                labels = f'provider="{_escape(provider)}",endpoint="{_escape(endpoint)}"'
+                latency = stats.latency
+                cumulative = 0
+                for bound, bucket_count in zip(latency.bounds, latency.counts):
+                    cumulative += bucket_count
+                    lines.append(f'railway_call_duration_seconds_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'railway_call_duration_seconds_bucket{{{labels},le="+Inf"}} {latency.count}')
+                lines.append(f'railway_call_duration_seconds_sum{{{labels}}} {latency.total:.6f}')
+                lines.append(f'railway_call_duration_seconds_count{{{labels}}} {latency.count}')
+                for quantile in (50, 95, 99):
+                    lines.append(f'railway_call_latency_seconds{{{labels},quantile="0.{quantile}"}} '
+                                 f'{latency.percentile(quantile):.6f}')
+                for error, count in sorted(stats.errors.items()):
+                    lines.append(f'railway_call_errors_total{{{labels},error="{_escape(error)}"}} {count}')
+                lines.append(f'railway_call_retries_total{{{labels}}} {stats.retries}')
+                lines.append(f'railway_call_bytes_received_total{{{labels}}} {stats.bytes_received}')
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def start_metrics_server(port: int = int(os.getenv('RAILWAY_METRICS_PORT', '9108')),
+                         registry: Optional[MetricsRegistry] = None,
+                         host: str = '127.0.0.1') -> ThreadingHTTPServer:
+    """Serve ``export_text()`` at /metrics on a daemon thread; ``server.shutdown()`` stops it."""
+    registry = registry or get_shared_metrics()
+
+    class _MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = registry.export_text().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="railways-metrics", daemon=True).start()
+    return server
+
+
+_shared_registry: Optional[MetricsRegistry] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_metrics() -> MetricsRegistry:
+    """Process-wide registry every instrumented client records into."""
+    global _shared_registry
+    if _shared_registry is None:
+        with _shared_lock:
+            if _shared_registry is None:
+                _shared_registry = MetricsRegistry()
+    return _shared_registry
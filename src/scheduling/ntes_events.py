@@ -0,0 +1,123 @@
+"""
+Incremental NTES event diffing.
+
+NTES returns the full event history of a run on every poll. The cursor store
+remembers, per (consumer, train, start_date), how far each consumer has read
+and the current position derived so far, so a poll hands back only the new
+events plus a compact position summary updated from those events alone.
+"""
+
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+
+def parse_delay_minutes(delay_str: Optional[str]) -> int:
+    """Convert an NTES delay string ("01:05" or "12") to minutes."""
+    if not delay_str:
+        return 0
+    try:
+        if ':' in delay_str:
+            h, m = map(int, delay_str.split(':'))
+            return h * 60 + m
+        return int(delay_str)
+    except ValueError:
+        return 0
+
+
+def _event_key(event: Dict) -> Tuple:
+    return (event.get('type'), event.get('station'), event.get('datetime'))
+
+
+def _sort_time(event: Dict) -> datetime:
+    return event.get('datetime') or datetime.min
+
+
+def summarize_event(event: Dict, last_update: Optional[datetime]) -> Dict:
+    """Compact current-position summary built from a single (latest) event."""
+    return {
+        'current_station': event.get('station'),
+        'station_code': event.get('code'),
+        'last_event': event.get('type'),
+        'event_time': event.get('datetime'),
+        'delay_minutes': parse_delay_minutes(event.get('delay')),
+        'last_update': last_update,
+        'raw_status': event.get('raw')
+    }
+
+
+class _Cursor:
+    __slots__ = ('seen', 'last_key', 'latest')
+
+    def __init__(self):
+        self.seen = 0
+        self.last_key: Optional[Tuple] = None
+        self.latest: Optional[Dict] = None
+
+
+class EventCursorStore:
+    """Last-seen event cursor per (consumer, train, start_date), bounded in size."""
+
+    def __init__(self, max_cursors: int = 2000):
+        self.max_cursors = max_cursors
+        self._cursors: "OrderedDict[Tuple, _Cursor]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def advance(self, train_no: str, start_date: Optional[str], events: List[Dict],
+                last_update: Optional[datetime] = None, consumer: str = 'default') -> Dict:
+        """Return the events after this consumer's cursor and move the cursor to the end."""
+        key = (consumer, str(train_no), start_date)
+        with self._lock:
+            cursor = self._cursors.get(key)
+            if cursor is None:
+                cursor = _Cursor()
+                self._cursors[key] = cursor
+                while len(self._cursors) > self.max_cursors:
+                    self._cursors.popitem(last=False)
+            self._cursors.move_to_end(key)
+
+            start = self._resume_index(cursor, events)
+            is_reset = start is None
+            if is_reset:
+                start = 0
+                cursor.latest = None
+            new_events = events[start:]
+
+            if new_events:
+                newest = max(new_events, key=_sort_time)
+                if cursor.latest is None or _sort_time(newest) >= _sort_time(cursor.latest):
+                    cursor.latest = newest
+                cursor.last_key = _event_key(events[-1])
+            cursor.seen = len(events)
+
+            return {
+                'train_no': str(train_no),
+                'start_date': start_date,
+                'last_update': last_update,
+                'new_events': new_events,
+                'is_reset': is_reset,
+                'events_seen': cursor.seen,
+                'current_position': summarize_event(cursor.latest, last_update) if cursor.latest else None
+            }
+
+    @staticmethod
+    def _resume_index(cursor: _Cursor, events: List[Dict]) -> Optional[int]:
+        """Index of the first unseen event, or None if the history no longer lines up."""
+        if cursor.last_key is None:
+            return 0
+        # Fast path: history only grew, the old last event sits where we left it
+        if 0 < cursor.seen <= len(events) and _event_key(events[cursor.seen - 1]) == cursor.last_key:
+            return cursor.seen
+        # NTES occasionally trims or reorders; look for the old last event from the end
+        for index in range(len(events) - 1, -1, -1):
+            if _event_key(events[index]) == cursor.last_key:
+                return index + 1
+        return None
+
+    def reset(self, train_no: Optional[str] = None, consumer: Optional[str] = None):
+        """Forget cursors for one train/consumer, or all of them."""
+        with self._lock:
+            for key in list(self._cursors):
+                if (train_no is None or key[1] == str(train_no)) and (consumer is None or key[0] == consumer):
+                    del self._cursors[key]
@@ -0,0 +1,188 @@
+"""
+Single-pass parser for the NTES running-status response.
+
+All patterns are compiled once at import. The page is stripped of markup in
+one substitution, lower-cased once, and a single keyword scan jumps straight
+to the status lines; every other line is never touched from Python. Each
+status line is de-duplicated and classified (last update, start date or
+arrival/departure event) as it is found, and events are emitted as dicts in
+the shape IndianRailwaysAPI has always returned.
+"""
+
+import re
+from datetime import datetime as dt
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+
+# Scripts, styles and tags removed in a single substitution. Case-insensitivity is
+# spelled out per letter because re.I disables sre's literal-prefix fast path.
+_SCRIPT = r"[sS][cC][rR][iI][pP][tT]"
+_STYLE = r"[sS][tT][yY][lL][eE]"
+_MARKUP_RE = re.compile(
+    rf"<(?:{_SCRIPT}[^>]*>.*?</{_SCRIPT}>|{_STYLE}[^>]*>.*?</{_STYLE}>|[^>]+>)", re.S
+)
+
+# Same keyword set the status filter has always used, matched against lower-cased text
+_KEYWORD_RE = re.compile(
+    r"arrive|arriving|depart|on time|yet to start|reached destination|"
+    r"current position|last updates on|start date"
+)
+
+_LAST_UPDATE_RE = re.compile(
+    r"Last Updates On\s*(?P<date>\d{1,2}-[A-Za-z]{3}-\d{4})(?:\s+(?P<time>\d{1,2}:\d{2}))?", re.I
+)
+_START_DATE_RE = re.compile(r"Start Date\s*:\s*(?P<date>\d{1,2}-[A-Za-z]{3}-\d{4})", re.I)
+_STATION_RE = re.compile(
+    r"\b(Departed|Arrived)\b\s+(?:from|at)\s+(?P<station>[^()]+?)\s*\(\s*(?P<code>[A-Z0-9]{1,6})\s*\)", re.I
+)
+_DELAY_RE = re.compile(r"Delay[:\-\s]*\(?\s*(?:Delay\s*)?([0-9:]{1,5})\)?", re.I)
+_TIME_RE = re.compile(r"(\d{1,2}:\d{2})")
+_DATE_RE = re.compile(r"(\d{1,2}-[A-Za-z]{3}(?:-\d{4})?)")
+_FULL_DATE_RE = re.compile(r"\d{1,2}-[A-Za-z]{3}-\d{4}$")
+
+_MONTHS = {name: index for index, name in enumerate(
+    ('jan', 'feb', 'mar', 'apr', 'may', 'jun', 'jul', 'aug', 'sep', 'oct', 'nov', 'dec'), start=1
+)}
+
+
+@lru_cache(maxsize=4096)
+def _to_datetime(date_str: str, time_str: str) -> dt:
+    """Equivalent of strptime(f"{date_str} {time_str}", "%d-%b-%Y %H:%M") without its overhead.
+
+    Inputs come from the regexes above, so only the values need checking;
+    datetime() raises ValueError for out-of-range fields just like strptime.
+    """
+    day, month_name, year = date_str.split('-')
+    hour, minute = time_str.split(':')
+    month = _MONTHS.get(month_name.lower())
+    if month is None or len(minute) != 2:
+        raise ValueError(f"unparseable NTES timestamp: {date_str} {time_str}")
+    return dt(int(year), month, int(day), int(hour), int(minute))
+
+
+def build_event_datetime(date_part: Optional[str], time_part: Optional[str],
+                         last_update: Optional[dt]) -> Optional[dt]:
+    """Build datetime object for train event."""
+    time_part = time_part or "00:00"
+
+    if date_part:
+        if _FULL_DATE_RE.match(date_part):
+            date_str = date_part
+        else:
+            year = last_update.year if last_update else dt.now().year
+            date_str = f"{date_part}-{year}"
+
+        try:
+            return _to_datetime(date_str, time_part)
+        except ValueError:
+            pass
+
+    if last_update:
+        try:
+            hour, minute = time_part.split(':')
+            return dt(last_update.year, last_update.month, last_update.day, int(hour), int(minute))
+        except ValueError:
+            pass
+
+    return None
+
+
+def parse_ntes_running_status(html_text: str) -> Dict:
+    """Parse NTES HTML into structured train status data in one pass over the page."""
+    text = _MARKUP_RE.sub("", html_text)
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+
+    seen_lines = set()
+    status_lines: List[str] = []
+    event_matches = []
+    last_update: Optional[dt] = None
+    start_date: Optional[str] = None
+
+    for line in _iter_status_lines(text):
+        if line in seen_lines:
+            continue
+        seen_lines.add(line)
+        status_lines.append(line)
+
+        if last_update is None:
+            match = _LAST_UPDATE_RE.search(line)
+            if match:
+                try:
+                    last_update = _to_datetime(match.group('date'), match.group('time') or '00:00')
+                except ValueError:
+                    pass
+
+        if start_date is None:
+            match = _START_DATE_RE.search(line)
+            if match:
+                start_date = match.group("date")
+
+        match = _STATION_RE.search(line)
+        if match:
+            event_matches.append((line, match))
+
+    return {
+        'train_number': None,  # Will be set by caller
+        'start_date': start_date,
+        'last_update': last_update,
+        'events': _build_events(event_matches, last_update),
+        'raw_status': status_lines[:5]  # First 5 status lines
+    }
+
+
+def _iter_status_lines(text: str):
+    """Yield stripped lines containing a status keyword, in page order."""
+    lowered = text.lower()
+    if len(lowered) != len(text):
+        # Rare Unicode case changes length; fall back to a per-line scan
+        for raw_line in text.splitlines():
+            line = raw_line.strip()
+            if line and _KEYWORD_RE.search(line.lower()):
+                yield line
+        return
+
+    line_end = -1
+    for match in _KEYWORD_RE.finditer(lowered):
+        start = match.start()
+        if start < line_end:
+            continue
+        line_start = text.rfind("\n", 0, start) + 1
+        line_end = text.find("\n", start)
+        if line_end < 0:
+            line_end = len(text)
+        yield text[line_start:line_end].strip()
+
+
+def _build_events(event_matches, last_update: Optional[dt]) -> List[Dict]:
+    """Turn matched event lines into de-duplicated event dicts (needs last_update for dates)."""
+    events = []
+    seen = set()
+
+    for line, match in event_matches:
+        delay_match = _DELAY_RE.search(line)
+        time_match = _TIME_RE.search(line)
+        date_match = _DATE_RE.search(line)
+
+        event = {
+            'raw': line,
+            'type': match.group(1).title(),
+            'station': match.group("station").strip(),
+            'code': match.group("code").strip(),
+            'datetime': build_event_datetime(
+                date_part=date_match.group(1) if date_match else None,
+                time_part=time_match.group(1) if time_match else None,
+                last_update=last_update
+            ),
+            'delay': delay_match.group(1) if delay_match else None
+        }
+
+        if not event['station']:
+            continue
+        key = (event['type'], event['station'], event['datetime'])
+        if key not in seen:
+            seen.add(key)
+            events.append(event)
+
+    return events
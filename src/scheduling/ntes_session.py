@@ -0,0 +1,172 @@
+"""
+Long-lived NTES session with a cached CSRF token.
+
+NTES needs a bootstrapped cookie jar and a CSRF key/value pair before the
+running-status POST is accepted. Both are kept here and reused across
+trains, so the common case costs a single POST; the token (and, if that
+is not enough, the whole session) is refreshed transparently when the
+server rejects it.
+"""
+
+import re
+import threading
+from datetime import datetime as dt
+from typing import Dict, Optional, Tuple
+
+import requests
+
+from src.scheduling.http_transport import PooledTransport, get_shared_transport
+
+
+NTES_BASE_URL = "https://enquiry.indianrail.gov.in/mntes"
+
+NTES_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/143.0.0.0 Safari/537.36 Edg/143.0.0.0"
+    ),
+    "Accept": "*/*",
+    "Accept-Language": "en-US,en;q=0.9",
+    "Accept-Encoding": "gzip, deflate, br, zstd",
+    "Cache-Control": "no-cache",
+    "Pragma": "no-cache",
+    "Referer": "https://enquiry.indianrail.gov.in/mntes/",
+    "Origin": "https://enquiry.indianrail.gov.in",
+    "X-Requested-With": "XMLHttpRequest",
+}
+
+_CSRF_RE = re.compile(r"name='([^']+)' value='([^']+)'")
+
+# Markers NTES puts in the body when the token or session is no longer valid
+_REJECTION_MARKERS = ("csrf", "session expired", "session has expired", "invalid request")
+_REJECTION_STATUS = (401, 403, 419)
+
+
+class NTESTokenRejected(Exception):
+    """Raised when NTES refuses the cached CSRF token or session."""
+
+
+class NTESSession:
+    """Cookie-keeping NTES client that reuses its CSRF token until rejected."""
+
+    def __init__(self, transport: Optional[PooledTransport] = None,
+                 headers: Optional[Dict[str, str]] = None,
+                 base_url: str = NTES_BASE_URL, provider: str = 'ntes'):
+        self.base_url = base_url
+        self.provider = provider
+        self.headers = dict(headers or NTES_HEADERS)
+        self._transport = transport or get_shared_transport()
+        self._session: Optional[requests.Session] = None
+        self._csrf: Optional[Tuple[str, str]] = None
+        self._lock = threading.Lock()
+        self.stats = {'posts': 0, 'bootstraps': 0, 'token_refreshes': 0, 'rejections': 0}
+
+    @property
+    def session(self) -> requests.Session:
+        """The underlying keep-alive session holding the NTES cookies."""
+        if self._session is None:
+            session = self._transport.session(self.provider)
+            session.headers.update(self.headers)
+            self._session = session
+        return self._session
+
+    def invalidate(self):
+        """Drop the cached CSRF token and cookies so the next call re-bootstraps."""
+        with self._lock:
+            self._csrf = None
+            self.session.cookies.clear()
+
+    def fetch_running_status(self, train_number: int, timeout_s: float = 8.0,
+                             journey_date: Optional[str] = None) -> str:
+        """POST the running-status query, recovering from a rejection in two steps.
+
+        The first rejection fetches a new token on the same session; a second
+        one means the session itself (JSESSIONID) has expired, so cookies and
+        token are dropped and the session is bootstrapped again.
+        """
+        for attempt in range(3):
+            if attempt == 2:
+                self.invalidate()
+            csrf_key, csrf_val = self._get_token(timeout_s, force_refresh=attempt > 0)
+            try:
+                return self._post_running_status(train_number, csrf_key, csrf_val,
+                                                 timeout_s, journey_date)
+            except NTESTokenRejected:
+                with self._lock:
+                    self.stats['rejections'] += 1
+                if attempt == 2:
+                    raise
+        raise NTESTokenRejected("NTES rejected a freshly bootstrapped session")
+
+    def _get_token(self, timeout_s: float, force_refresh: bool = False) -> Tuple[str, str]:
+        """Return the cached CSRF pair, bootstrapping the session if needed."""
+        with self._lock:
+            if self._csrf is not None and not force_refresh:
+                return self._csrf
+
+            if self._csrf is None and not self.session.cookies:
+                r = self.session.get(f"{self.base_url}/", timeout=timeout_s)
+                r.raise_for_status()
+                self.stats['bootstraps'] += 1
+
+            params = {"t": int(dt.now().timestamp() * 1000)}
+            r = self.session.get(f"{self.base_url}/GetCSRFToken", params=params, timeout=timeout_s)
+            r.raise_for_status()
+
+            csrf_match = _CSRF_RE.search(r.text)
+            if not csrf_match:
+                raise Exception("CSRF token not found")
+
+            self._csrf = (csrf_match.group(1), csrf_match.group(2))
+            self.stats['token_refreshes'] += 1
+            return self._csrf
+
+    def _post_running_status(self, train_number: int, csrf_key: str, csrf_val: str,
+                             timeout_s: float, journey_date: Optional[str]) -> str:
+        today_str = journey_date or dt.now().strftime("%d-%b-%Y")
+        params = {
+            "opt": "TrainRunning",
+            "subOpt": "FindRunningInstance",
+            "refDate": today_str,
+        }
+        data = {
+            "lan": "en",
+            "jDate": today_str,
+            "trainNo": str(train_number),
+            csrf_key: csrf_val,
+        }
+
+        with self._lock:
+            self.stats['posts'] += 1
+        r = self.session.post(f"{self.base_url}/tr", params=params, data=data, timeout=timeout_s)
+        if self._is_rejected(r):
+            with self._lock:
+                if self._csrf == (csrf_key, csrf_val):
+                    self._csrf = None
+            raise NTESTokenRejected(f"NTES rejected token (HTTP {r.status_code})")
+        r.raise_for_status()
+        return r.text
+
+    @staticmethod
+    def _is_rejected(response: requests.Response) -> bool:
+        if response.status_code in _REJECTION_STATUS:
+            return True
+        if response.status_code != 200:
+            return False
+        head = response.text[:2048].lower()
+        return "running" not in head and any(marker in head for marker in _REJECTION_MARKERS)
+
+
+_shared_session: Optional[NTESSession] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_ntes_session() -> NTESSession:
+    """Process-wide NTES session shared by every IndianRailwaysAPI instance."""
+    global _shared_session
+    if _shared_session is None:
+        with _shared_lock:
+            if _shared_session is None:
+                _shared_session = NTESSession()
+    return _shared_session
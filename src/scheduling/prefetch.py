@@ -0,0 +1,244 @@
+"""
+Predictive cache warming for journey schedules and live status.
+
+DemandTracker keeps an exponentially decayed query count per train, fed by
+IndianRailwaysAPI, and remembers which cache entries the prefetcher warmed
+so it can report how many real queries they served. PrefetchScheduler wakes
+periodically, ranks trains departing within the horizon (from
+trains_with_coaches.csv) together with recently popular trains, and fetches
+the best candidates that are not already cached, spending at most its
+request budget per cycle.
+"""
+
+import csv
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+
+TRAINS_FILE = Path(__file__).parent.parent.parent / "data" / "trains_with_coaches.csv"
+
+DEFAULT_BUDGET = int(os.getenv('RAILWAY_PREFETCH_BUDGET', '10'))
+DEFAULT_INTERVAL_S = float(os.getenv('RAILWAY_PREFETCH_INTERVAL_S', '300'))
+DEFAULT_HORIZON_MIN = 120
+
+# Live status expires in under a minute, so only journey schedules are warmed by default
+DEFAULT_ENDPOINTS = ('journey_schedule',)
+
+# Weight of one (decayed) recent query relative to a train departing right now
+POPULARITY_WEIGHT = 0.5
+
+
+class DemandTracker:
+    """Decayed per-train query counts plus accounting of prefetched entries."""
+
+    def __init__(self, half_life_s: float = 3600.0, clock: Callable[[], float] = time.time):
+        self.half_life_s = half_life_s
+        self.clock = clock
+        self._scores: Dict[Tuple[str, str], Tuple[float, float]] = {}  # -> (score, updated_at)
+        self._prefetched: Dict[Tuple[str, str], float] = {}  # -> expires_at, until first use
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.stats = {'queries': 0, 'prefetch_hits': 0, 'prefetched': 0, 'prefetch_unused': 0}
+
+    def _decayed(self, score: float, updated_at: float, now: float) -> float:
+        return score * math.pow(0.5, (now - updated_at) / self.half_life_s)
+
+    @contextmanager
+    def suppressed(self):
+        """Calls made inside this block (the prefetcher's own) are not counted as demand."""
+        self._local.suppressed = True
+        try:
+            yield
+        finally:
+            self._local.suppressed = False
+
+    def record(self, endpoint: str, train_no: str):
+        """Count a user query; a first use of a still-fresh prefetched entry is a prefetch hit."""
+        if getattr(self._local, 'suppressed', False):
+            return
+        key = (endpoint, str(train_no))
+        now = self.clock()
+        with self._lock:
+            score, updated_at = self._scores.get(key, (0.0, now))
+            self._scores[key] = (self._decayed(score, updated_at, now) + 1.0, now)
+            self.stats['queries'] += 1
+            expires_at = self._prefetched.pop(key, None)
+            if expires_at is not None:
+                if expires_at > now:
+                    self.stats['prefetch_hits'] += 1
+                else:
+                    self.stats['prefetch_unused'] += 1
+
+    def mark_prefetched(self, endpoint: str, train_no: str, expires_at: float):
+        with self._lock:
+            self._prefetched[(endpoint, str(train_no))] = expires_at
+            self.stats['prefetched'] += 1
+
+    def popularity(self, endpoint: str) -> Dict[str, float]:
+        """Current decayed query count per train for one endpoint class."""
+        now = self.clock()
+        with self._lock:
+            return {train: self._decayed(score, updated_at, now)
+                    for (ep, train), (score, updated_at) in self._scores.items() if ep == endpoint}
+
+    def get_stats(self) -> Dict:
+        now = self.clock()
+        with self._lock:
+            expired = [key for key, expires_at in self._prefetched.items() if expires_at <= now]
+            for key in expired:
+                del self._prefetched[key]
+            self.stats['prefetch_unused'] += len(expired)
+            stats = dict(self.stats)
+            stats['pending'] = len(self._prefetched)
+        queries = stats['queries']
+        settled = stats['prefetch_hits'] + stats['prefetch_unused']
+        # Share of user queries answered by a prefetch, and share of prefetches that were used
+        stats['hit_rate'] = stats['prefetch_hits'] / queries if queries else 0.0
+        stats['precision'] = stats['prefetch_hits'] / settled if settled else 0.0
+        return stats
+
+
+def load_departures(path: Path = TRAINS_FILE) -> List[Tuple[str, int]]:
+    """(train_no, departure minute of day) for every train in the CSV with a valid time."""
+    if not path.exists():
+        return []
+    departures = []
+    with open(path, newline='', encoding='utf-8') as handle:
+        for row in csv.DictReader(handle):
+            try:
+                hour, minute = (int(part) for part in row['departure_time'].split(':')[:2])
+            except (KeyError, ValueError, AttributeError):
+                continue
+            departures.append((str(row['train_no']).strip(), hour * 60 + minute))
+    return departures
+
+
+class PrefetchScheduler:
+    """Background warmer for upcoming and popular trains within a request budget."""
+
+    def __init__(self, api, tracker: Optional[DemandTracker] = None,
+                 departures: Optional[Iterable[Tuple[str, int]]] = None,
+                 budget: int = DEFAULT_BUDGET, interval_s: float = DEFAULT_INTERVAL_S,
+                 horizon_min: int = DEFAULT_HORIZON_MIN,
+                 endpoints: Iterable[str] = DEFAULT_ENDPOINTS,
+                 now: Callable[[], datetime] = datetime.now):
+        self.api = api
+        self.tracker = tracker or api.demand
+        self.departures = list(departures) if departures is not None else load_departures()
+        self.budget = budget
+        self.interval_s = interval_s
+        self.horizon_min = horizon_min
+        self.endpoints = tuple(endpoints)
+        self.now = now
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.stats = {'cycles': 0, 'fetched': 0, 'skipped_cached': 0, 'errors': 0}
+
+    def candidates(self, endpoint: str) -> List[str]:
+        """Trains ranked by closeness of departure within the horizon plus recent popularity."""
+        current = self.now()
+        minute_of_day = current.hour * 60 + current.minute
+        scores: Dict[str, float] = {}
+
+        for train_no, departure in self.departures:
+            until = (departure - minute_of_day) % (24 * 60)
+            if until <= self.horizon_min:
+                scores[train_no] = max(scores.get(train_no, 0.0), 1.0 - until / (self.horizon_min + 1))
+
+        for train_no, popularity in self.tracker.popularity(endpoint).items():
+            scores[train_no] = scores.get(train_no, 0.0) + POPULARITY_WEIGHT * popularity
+
+        return [train for train, score in sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+                if score > 0]
+
+    def _cache_key(self, endpoint: str, train_no: str):
+        if endpoint == 'journey_schedule':
+            return (train_no, self.now().strftime("%Y-%m-%d"))
+        return ('ntes', train_no)
+
+    def _fetch(self, endpoint: str, train_no: str):
+        if endpoint == 'journey_schedule':
+            return self.api.get_train_journey_schedule(train_no)
+        return self.api.get_live_train_status(train_no)
+
+    def run_once(self) -> int:
+        """Warm up to `budget` uncached candidates; returns the number of fetches made."""
+        spent = 0
+        self.stats['cycles'] += 1
+        for endpoint in self.endpoints:
+            for train_no in self.candidates(endpoint):
+                if spent >= self.budget:
+                    return spent
+                if self.api.cache.contains(endpoint, self._cache_key(endpoint, train_no)):
+                    self.stats['skipped_cached'] += 1
+                    continue
+                spent += 1
+                try:
+                    with self.tracker.suppressed():
+                        self._fetch(endpoint, train_no)
+                except Exception as e:
+                    self.stats['errors'] += 1
+                    print(f"Prefetch of {endpoint} for {train_no} failed: {e}")
+                    continue
+                # Fallback (mock) answers are not cached, so only count what actually landed
+                if self.api.cache.contains(endpoint, self._cache_key(endpoint, train_no)):
+                    self.stats['fetched'] += 1
+                    self.tracker.mark_prefetched(endpoint, train_no,
+                                                 self.tracker.clock() + self.api.cache.ttls.get(endpoint, 0))
+        return spent
+
+    def start(self):
+        """Run cycles every interval_s on a daemon thread."""
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="railways-prefetch", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                print(f"Prefetch cycle failed: {e}")
+            self._stop.wait(self.interval_s)
+
+    def get_stats(self) -> Dict:
+        """Scheduler counters plus the demand tracker's hit rate and precision."""
+        return {**self.stats, 'budget': self.budget, 'demand': self.tracker.get_stats()}
+
+
+_shared_tracker: Optional[DemandTracker] = None
+_shared_prefetcher: Optional[PrefetchScheduler] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_demand_tracker() -> DemandTracker:
+    """Process-wide demand tracker shared by every IndianRailwaysAPI instance."""
+    global _shared_tracker
+    if _shared_tracker is None:
+        with _shared_lock:
+            if _shared_tracker is None:
+                _shared_tracker = DemandTracker()
+    return _shared_tracker
+
+
+def start_shared_prefetcher(api) -> PrefetchScheduler:
+    """Start (once per process) the background prefetcher for the given client."""
+    global _shared_prefetcher
+    with _shared_lock:
+        if _shared_prefetcher is None:
+            _shared_prefetcher = PrefetchScheduler(api)
+            _shared_prefetcher.start()
+    return _shared_prefetcher
@@ -0,0 +1,175 @@
+"""
+Provider health scoring and circuit breakers for the railway REST providers.
+
+Every call outcome is recorded per provider. A breaker opens after repeated
+failures so a dead provider stops costing a full timeout on every request,
+and after a cooldown lets a single half-open probe through. Routing ranks
+the usable providers by rolling error rate and latency; the ranking is
+returned to the caller rather than stored on the client, so one failing
+call never reroutes other concurrent calls.
+"""
+
+import threading
+import time
+from collections import deque
+from enum import Enum
+from typing import Dict, Iterable, List, Optional
+
+
+# Latency assumed for a provider with no successful samples yet, so a proven
+# fast provider is preferred over an untried one but an erroring one is not
+PRIOR_LATENCY_S = 1.0
+
+
+class CircuitState(Enum):
+    """Circuit breaker states."""
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+
+class ProviderHealth:
+    """Rolling outcome window plus circuit breaker for one provider."""
+
+    def __init__(self, name: str, window: int = 50, failure_threshold: int = 3,
+                 error_rate_threshold: float = 0.5, min_samples: int = 10,
+                 cooldown_s: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.error_rate_threshold = error_rate_threshold
+        self.min_samples = min_samples
+        self.cooldown_s = cooldown_s
+        self.state = CircuitState.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at: Optional[float] = None
+        self._probe_in_flight = False
+        self._samples = deque(maxlen=window)  # (ok, latency_s)
+
+    @property
+    def error_rate(self) -> float:
+        if not self._samples:
+            return 0.0
+        return sum(1 for ok, _ in self._samples if not ok) / len(self._samples)
+
+    def latency_percentile(self, pct: float) -> Optional[float]:
+        """Latency percentile (seconds) over successful calls in the window."""
+        latencies = sorted(latency for ok, latency in self._samples if ok)
+        if not latencies:
+            return None
+        index = min(len(latencies) - 1, int(round(pct / 100.0 * (len(latencies) - 1))))
+        return latencies[index]
+
+    def allow_request(self, now: float) -> bool:
+        """Whether a call may be routed here; claims the half-open probe slot."""
+        if self.state == CircuitState.OPEN:
+            if now - self.opened_at < self.cooldown_s:
+                return False
+            self.state = CircuitState.HALF_OPEN
+            self._probe_in_flight = False
+
+        if self.state == CircuitState.HALF_OPEN:
+            if self._probe_in_flight:
+                return False
+            self._probe_in_flight = True
+        return True
+
+    def record(self, ok: bool, latency_s: float, now: float):
+        self._samples.append((ok, latency_s))
+        if ok:
+            self.consecutive_failures = 0
+            self.state = CircuitState.CLOSED
+            self.opened_at = None
+            self._probe_in_flight = False
+            return
+
+        self.consecutive_failures += 1
+        tripped = (
+            self.state == CircuitState.HALF_OPEN
+            or self.consecutive_failures >= self.failure_threshold
+            or (len(self._samples) >= self.min_samples
+                and self.error_rate >= self.error_rate_threshold)
+        )
+        if tripped:
+            self.state = CircuitState.OPEN
+            self.opened_at = now
+            self._probe_in_flight = False
+
+    def score(self) -> float:
+        """Lower is better: error rate dominates, median latency breaks ties."""
+        p50 = self.latency_percentile(50)
+        return self.error_rate * 10.0 + (p50 if p50 is not None else PRIOR_LATENCY_S)
+
+    def snapshot(self) -> Dict:
+        return {
+            'state': self.state.value,
+            'error_rate': round(self.error_rate, 3),
+            'p50_ms': self._ms(self.latency_percentile(50)),
+            'p90_ms': self._ms(self.latency_percentile(90)),
+            'samples': len(self._samples),
+            'consecutive_failures': self.consecutive_failures
+        }
+
+    @staticmethod
+    def _ms(seconds: Optional[float]) -> Optional[float]:
+        return round(seconds * 1000, 1) if seconds is not None else None
+
+
+class ProviderRouter:
+    """Thread-safe registry of provider health used to rank providers per request."""
+
+    def __init__(self, **health_kwargs):
+        self._health_kwargs = health_kwargs
+        self._providers: Dict[str, ProviderHealth] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, provider: str) -> ProviderHealth:
+        health = self._providers.get(provider)
+        if health is None:
+            health = ProviderHealth(provider, **self._health_kwargs)
+            self._providers[provider] = health
+        return health
+
+    def rank(self, providers: Iterable[str]) -> List[str]:
+        """Usable providers, healthiest first; configured order breaks ties."""
+        now = time.time()
+        with self._lock:
+            ordered = list(providers)
+            usable = [p for p in ordered if self._get(p).allow_request(now)]
+            return sorted(usable, key=lambda p: (self._get(p).score(), ordered.index(p)))
+
+    def record(self, provider: str, ok: bool, latency_s: float):
+        with self._lock:
+            self._get(provider).record(ok, latency_s, time.time())
+
+    def release(self, provider: str):
+        """Give back a half-open probe slot claimed by rank() but never used."""
+        with self._lock:
+            health = self._providers.get(provider)
+            if health is not None and health.state == CircuitState.HALF_OPEN:
+                health._probe_in_flight = False
+
+    def latency_percentile(self, provider: str, pct: float) -> Optional[float]:
+        with self._lock:
+            return self._get(provider).latency_percentile(pct)
+
+    def state(self, provider: str) -> CircuitState:
+        with self._lock:
+            return self._get(provider).state
+
+    def get_stats(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {name: health.snapshot() for name, health in self._providers.items()}
+
+
+_shared_router: Optional[ProviderRouter] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_router() -> ProviderRouter:
+    """Process-wide provider health shared by every IndianRailwaysAPI instance."""
+    global _shared_router
+    if _shared_router is None:
+        with _shared_lock:
+            if _shared_router is None:
+                _shared_router = ProviderRouter()
+    return _shared_router
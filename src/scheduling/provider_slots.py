@@ -0,0 +1,97 @@
+"""
+Per-provider caps on in-flight requests.
+
+The rate limiter bounds how many calls a provider gets per second; these
+slots bound how many are open at once. A slot is taken around the actual
+HTTP exchange with the provider the router picked, so the cap holds for
+every caller (Streamlit threads, the prefetcher, the asyncio client)
+regardless of which endpoint was asked for or which fallback answered it.
+"""
+
+import os
+import threading
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+
+# Requests open at once per provider
+DEFAULT_CONCURRENCY = {
+    'ntes': 8,
+    'rapidapi_journey': 10,
+    'rapidapi': 10,
+    'railwayapi': 5,
+    'indianrail': 5,
+}
+
+
+def parse_concurrency(spec: Optional[str]) -> Dict[str, int]:
+    """Parse "ntes=4,railwayapi=2" into a limit per provider."""
+    limits = {}
+    for item in (spec or '').split(','):
+        if '=' not in item:
+            continue
+        name, _, value = item.partition('=')
+        try:
+            limits[name.strip()] = max(1, int(value))
+        except ValueError:
+            print(f"Ignoring invalid concurrency limit '{item}'")
+    return limits
+
+
+class ProviderSlots:
+    """One bounded semaphore per provider, with in-flight and wait counters."""
+
+    def __init__(self, concurrency: Optional[Dict[str, int]] = None, default_limit: int = 5):
+        self.concurrency = {**DEFAULT_CONCURRENCY, **(concurrency or {})}
+        self.default_limit = default_limit
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+        self.stats: Dict[str, Dict[str, int]] = {}
+
+    def _semaphore(self, provider: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            semaphore = self._semaphores.get(provider)
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(self.concurrency.get(provider, self.default_limit))
+                self._semaphores[provider] = semaphore
+                self.stats[provider] = {'acquired': 0, 'waited': 0, 'in_flight': 0, 'peak': 0}
+            return semaphore
+
+    @contextmanager
+    def slot(self, provider: str):
+        """Hold one of provider's slots for the duration of the block."""
+        semaphore = self._semaphore(provider)
+        waited = not semaphore.acquire(blocking=False)
+        if waited:
+            semaphore.acquire()
+        with self._lock:
+            counters = self.stats[provider]
+            counters['acquired'] += 1
+            counters['waited'] += waited
+            counters['in_flight'] += 1
+            counters['peak'] = max(counters['peak'], counters['in_flight'])
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.stats[provider]['in_flight'] -= 1
+            semaphore.release()
+
+    def get_stats(self) -> Dict[str, Dict]:
+        with self._lock:
+            return {provider: {**counters, 'limit': self.concurrency.get(provider, self.default_limit)}
+                    for provider, counters in self.stats.items()}
+
+
+_shared_slots: Optional[ProviderSlots] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_provider_slots() -> ProviderSlots:
+    """Process-wide slots; RAILWAY_CONCURRENCY overrides the per-provider limits."""
+    global _shared_slots
+    if _shared_slots is None:
+        with _shared_lock:
+            if _shared_slots is None:
+                _shared_slots = ProviderSlots(parse_concurrency(os.getenv('RAILWAY_CONCURRENCY')))
+    return _shared_slots
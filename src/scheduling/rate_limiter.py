@@ -0,0 +1,289 @@
+"""
+Per-provider token-bucket rate limiting for the railway REST providers.
+
+Each provider (or group of providers sharing one API key) has a bucket that
+refills at its configured quota. Low-priority calls (fare, PNR) may only spend
+tokens above a reserve kept for live-status traffic, and are shed instead of
+queued when the bucket is short. A 429 blocks the bucket until the provider's
+Retry-After (or an exponential backoff when the header is missing).
+
+Bucket state lives in memory by default. Set RAILWAY_RATE_LIMIT_DB to a file
+path to keep it in SQLite instead, so several dashboard processes sharing one
+RapidAPI key draw from a single budget.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from enum import Enum
+from typing import Dict, Optional, Tuple
+
+
+class Priority(Enum):
+    """Request priority; lower-priority calls are shed first under pressure."""
+    HIGH = "high"
+    NORMAL = "normal"
+    LOW = "low"
+
+
+# Priority of each endpoint class used by IndianRailwaysAPI
+ENDPOINT_PRIORITY = {
+    'live_status': Priority.HIGH,
+    'journey_schedule': Priority.HIGH,
+    'schedule': Priority.NORMAL,
+    'between_stations': Priority.NORMAL,
+    'station_code': Priority.NORMAL,
+    'fare': Priority.LOW,
+    'pnr': Priority.LOW,
+}
+
+# Fraction of the burst a priority must leave in the bucket
+RESERVE = {Priority.HIGH: 0.0, Priority.NORMAL: 0.2, Priority.LOW: 0.5}
+
+# How long a call of each priority may queue for a token before it is shed
+MAX_WAIT_S = {Priority.HIGH: 2.0, Priority.NORMAL: 0.5, Priority.LOW: 0.0}
+
+# (requests per second, burst) per bucket
+DEFAULT_QUOTAS = {
+    'rapidapi': (2.0, 10.0),
+    'railwayapi': (5.0, 10.0),
+    'indianrail': (5.0, 10.0),
+}
+
+# Providers drawing on another provider's quota (same RapidAPI key)
+BUCKET_ALIASES = {'rapidapi_journey': 'rapidapi'}
+
+BACKOFF_BASE_S = 1.0
+BACKOFF_MAX_S = 60.0
+
+
+def parse_quotas(spec: Optional[str]) -> Dict[str, Tuple[float, float]]:
+    """Parse "rapidapi=2:10,railwayapi=5" (rate[:burst]) into a quota dict."""
+    quotas = {}
+    for item in (spec or '').split(','):
+        if '=' not in item:
+            continue
+        name, _, value = item.partition('=')
+        rate, _, burst = value.partition(':')
+        try:
+            rate_f = float(rate)
+            quotas[name.strip()] = (rate_f, float(burst) if burst else max(1.0, rate_f))
+        except ValueError:
+            print(f"Ignoring invalid rate limit '{item}'")
+    return quotas
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+class MemoryBucketStore:
+    """Bucket state for a single process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, list] = {}  # name -> [tokens, updated_at, blocked_until, strikes]
+
+    def _bucket(self, name: str, burst: float, now: float) -> list:
+        bucket = self._buckets.get(name)
+        if bucket is None:
+            bucket = [burst, now, 0.0, 0]
+            self._buckets[name] = bucket
+        return bucket
+
+    def take(self, name: str, rate: float, burst: float, reserve: float, now: float) -> float:
+        """Take one token if available above the reserve; otherwise return seconds to wait."""
+        with self._lock:
+            bucket = self._bucket(name, burst, now)
+            return _take(bucket, rate, burst, reserve, now)
+
+    def block(self, name: str, burst: float, retry_after: Optional[float], now: float) -> float:
+        """Empty the bucket and block it; returns the block duration."""
+        with self._lock:
+            bucket = self._bucket(name, burst, now)
+            return _block(bucket, retry_after, now)
+
+    def succeed(self, name: str):
+        with self._lock:
+            if name in self._buckets:
+                self._buckets[name][3] = 0
+
+    def snapshot(self, name: str) -> Optional[Tuple[float, float]]:
+        with self._lock:
+            bucket = self._buckets.get(name)
+            return (bucket[0], bucket[2]) if bucket else None
+
+
+class SQLiteBucketStore:
+    """Bucket state in a SQLite file; BEGIN IMMEDIATE serialises updates across processes."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=5.0, check_same_thread=False, isolation_level=None)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS rate_buckets ("
+            " name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL,"
+            " blocked_until REAL NOT NULL, strikes INTEGER NOT NULL)"
+        )
+
+    def _update(self, name: str, burst: float, now: float, change):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    "SELECT tokens, updated_at, blocked_until, strikes FROM rate_buckets WHERE name = ?", (name,)
+                ).fetchone()
+                bucket = list(row) if row else [burst, now, 0.0, 0]
+                result = change(bucket)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO rate_buckets (name, tokens, updated_at, blocked_until, strikes)"
+                    " VALUES (?, ?, ?, ?, ?)", (name, *bucket)
+                )
+                self._conn.execute("COMMIT")
+                return result
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def take(self, name: str, rate: float, burst: float, reserve: float, now: float) -> float:
+        return self._update(name, burst, now, lambda bucket: _take(bucket, rate, burst, reserve, now))
+
+    def block(self, name: str, burst: float, retry_after: Optional[float], now: float) -> float:
+        return self._update(name, burst, now, lambda bucket: _block(bucket, retry_after, now))
+
+    def succeed(self, name: str):
+        with self._lock:
+            self._conn.execute("UPDATE rate_buckets SET strikes = 0 WHERE name = ? AND strikes > 0", (name,))
+
+    def snapshot(self, name: str) -> Optional[Tuple[float, float]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT tokens, blocked_until FROM rate_buckets WHERE name = ?", (name,)
+            ).fetchone()
+        return tuple(row) if row else None
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def _take(bucket: list, rate: float, burst: float, reserve: float, now: float) -> float:
+    tokens, updated_at, blocked_until, _ = bucket
+    tokens = min(burst, tokens + max(0.0, now - updated_at) * rate)
+    bucket[0], bucket[1] = tokens, now
+    if now < blocked_until:
+        return blocked_until - now
+    floor = reserve * burst
+    if tokens - 1.0 >= floor:
+        bucket[0] = tokens - 1.0
+        return 0.0
+    return (floor + 1.0 - tokens) / rate if rate > 0 else float('inf')
+
+
+def _block(bucket: list, retry_after: Optional[float], now: float) -> float:
+    bucket[3] += 1
+    if retry_after is None:
+        retry_after = min(BACKOFF_MAX_S, BACKOFF_BASE_S * (2 ** (bucket[3] - 1)))
+    bucket[0], bucket[1] = 0.0, now
+    bucket[2] = max(bucket[2], now + retry_after)
+    return retry_after
+
+
+class RateLimiter:
+    """Token buckets per provider with priority reserves and 429 backoff."""
+
+    def __init__(self, quotas: Optional[Dict[str, Tuple[float, float]]] = None,
+                 store=None, aliases: Optional[Dict[str, str]] = None):
+        self.quotas = {**DEFAULT_QUOTAS, **(quotas or {})}
+        self.aliases = {**BUCKET_ALIASES, **(aliases or {})}
+        self.store = store or MemoryBucketStore()
+        self._lock = threading.Lock()
+        self.stats: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, bucket: str, key: str):
+        with self._lock:
+            counters = self.stats.setdefault(bucket, {'allowed': 0, 'queued': 0, 'shed': 0, 'throttled': 0})
+            counters[key] += 1
+
+    def bucket_for(self, provider: str) -> str:
+        return self.aliases.get(provider, provider)
+
+    def acquire(self, provider: str, priority: Priority = Priority.NORMAL) -> bool:
+        """Take a token for provider, queueing up to the priority's wait budget; False means shed."""
+        bucket = self.bucket_for(provider)
+        quota = self.quotas.get(bucket)
+        if quota is None:
+            return True  # unmetered provider
+        rate, burst = quota
+
+        deadline = time.monotonic() + MAX_WAIT_S[priority]
+        queued = False
+        while True:
+            wait = self.store.take(bucket, rate, burst, RESERVE[priority], time.time())
+            if wait <= 0:
+                self._count(bucket, 'allowed')
+                if queued:
+                    self._count(bucket, 'queued')
+                return True
+            remaining = deadline - time.monotonic()
+            if wait > remaining:
+                self._count(bucket, 'shed')
+                return False
+            queued = True
+            time.sleep(wait)
+
+    def throttled(self, provider: str, retry_after: Optional[float] = None) -> float:
+        """Record a 429: drain and block the bucket; returns the block duration in seconds."""
+        bucket = self.bucket_for(provider)
+        quota = self.quotas.get(bucket)
+        self._count(bucket, 'throttled')
+        return self.store.block(bucket, quota[1] if quota else 1.0, retry_after, time.time())
+
+    def succeeded(self, provider: str):
+        """Reset the backoff streak after a successful call."""
+        bucket = self.bucket_for(provider)
+        if bucket in self.quotas:
+            self.store.succeed(bucket)
+
+    def get_stats(self) -> Dict[str, Dict]:
+        now = time.time()
+        with self._lock:
+            stats = {name: dict(counters) for name, counters in self.stats.items()}
+        for name, counters in stats.items():
+            snapshot = self.store.snapshot(name)
+            if snapshot:
+                counters['tokens'] = round(snapshot[0], 2)
+                counters['blocked_for_s'] = round(max(0.0, snapshot[1] - now), 1)
+        return stats
+
+
+_shared_limiter: Optional[RateLimiter] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_rate_limiter() -> RateLimiter:
+    """Process-wide limiter; RAILWAY_RATE_LIMITS overrides quotas, RAILWAY_RATE_LIMIT_DB shares them."""
+    global _shared_limiter
+    if _shared_limiter is None:
+        with _shared_lock:
+            if _shared_limiter is None:
+                db_path = os.getenv('RAILWAY_RATE_LIMIT_DB')
+                _shared_limiter = RateLimiter(
+                    quotas=parse_quotas(os.getenv('RAILWAY_RATE_LIMITS')),
+                    store=SQLiteBucketStore(db_path) if db_path else None
+                )
+    return _shared_limiter
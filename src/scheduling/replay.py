@@ -0,0 +1,237 @@
+"""
+Offline record/replay harness for the railway HTTP traffic.
+
+Recording wraps the real transport adapter and saves every response (NTES
+HTML, provider JSON) to a fixture store on disk. Replay serves the stored
+responses from a ``requests`` transport adapter with configurable latency,
+error injection and a throughput cap, so the whole client stack
+(IndianRailwaysAPI, NTESSession, TrainStatusMonitor) can be benchmarked and
+regression-tested on a machine with no network.
+
+Set RAILWAY_HTTP_MODE=record or replay (and RAILWAY_FIXTURES_DIR) to switch
+the shared transport; tests and scripts can build one with
+record_transport() / replay_transport().
+"""
+
+import hashlib
+import json
+import os
+import random
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple, Union
+from urllib.parse import parse_qsl, urlencode, urlsplit
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+from src.scheduling.http_transport import PooledTransport
+
+
+DEFAULT_FIXTURES_DIR = Path(__file__).parent.parent.parent / "data" / "http_fixtures"
+
+# Query/form fields that change on every call and never select a different response
+VOLATILE_PARAMS = {'t', '_'}
+
+# Form fields that identify an NTES POST; CSRF fields are random and not part of the key
+BODY_KEY_FIELDS = ('opt', 'subOpt', 'trainNo', 'jDate')
+
+# Dates in paths and params are normalised so fixtures replay on any day
+_DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}|\d{1,2}-\d{1,2}-\d{4}|\d{1,2}-[A-Za-z]{3}-\d{4}")
+
+# Response headers worth keeping in a fixture
+_KEPT_HEADERS = ('Content-Type', 'Retry-After')
+
+
+def fixture_key(method: str, url: str, body: Union[str, bytes, None] = None) -> str:
+    """Stable match key for a request: method, host, path, non-volatile params, identifying form fields."""
+    parts = urlsplit(url)
+    query = sorted((k, _DATE_RE.sub('{date}', v)) for k, v in parse_qsl(parts.query)
+                   if k not in VOLATILE_PARAMS)
+
+    form = []
+    if body:
+        text = body.decode('utf-8', 'replace') if isinstance(body, bytes) else str(body)
+        fields = dict(parse_qsl(text))
+        form = [(k, _DATE_RE.sub('{date}', fields[k])) for k in BODY_KEY_FIELDS if k in fields]
+
+    return " ".join(filter(None, [
+        method.upper(), parts.netloc.lower(), _DATE_RE.sub('{date}', parts.path),
+        urlencode(query), urlencode(form)
+    ]))
+
+
+class FixtureStore:
+    """Directory of JSON fixtures, one file per request key."""
+
+    def __init__(self, root: Union[str, Path] = DEFAULT_FIXTURES_DIR):
+        self.root = Path(root)
+        self._lock = threading.Lock()
+        self._loaded: Optional[Dict[str, Dict]] = None
+
+    def _path(self, key: str) -> Path:
+        return self.root / f"{hashlib.sha1(key.encode()).hexdigest()[:16]}.json"
+
+    def save(self, key: str, provider: str, status: int, headers: Dict[str, str],
+             body: str, elapsed_s: float):
+        fixture = {
+            'key': key,
+            'provider': provider,
+            'status': status,
+            'headers': headers,
+            'body': body,
+            'elapsed_ms': round(elapsed_s * 1000, 1),
+            'recorded_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        }
+        with self._lock:
+            self.root.mkdir(parents=True, exist_ok=True)
+            self._path(key).write_text(json.dumps(fixture, indent=1), encoding='utf-8')
+            if self._loaded is not None:
+                self._loaded[key] = fixture
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Fixture for a key; every fixture is read from disk once and then kept in memory."""
+        with self._lock:
+            if self._loaded is None:
+                self._loaded = {}
+                for path in sorted(self.root.glob("*.json")) if self.root.exists() else []:
+                    try:
+                        fixture = json.loads(path.read_text(encoding='utf-8'))
+                        self._loaded[fixture['key']] = fixture
+                    except (ValueError, KeyError) as e:
+                        print(f"Skipping unreadable fixture {path.name}: {e}")
+            return self._loaded.get(key)
+
+    def __len__(self) -> int:
+        self.get('')
+        return len(self._loaded)
+
+
+def _build_response(request: requests.PreparedRequest, status: int, headers: Dict[str, str],
+                    body: str) -> requests.Response:
+    response = requests.Response()
+    response.status_code = status
+    response.headers = CaseInsensitiveDict(headers)
+    response._content = body.encode('utf-8')
+    response.encoding = 'utf-8'
+    response.url = request.url
+    response.request = request
+    response.reason = 'OK' if status < 400 else 'Replay'
+    return response
+
+
+class RecordingAdapter(HTTPAdapter):
+    """Real HTTP adapter that also writes each response to the fixture store."""
+
+    def __init__(self, store: FixtureStore, provider: str, **kwargs):
+        super().__init__(**kwargs)
+        self.store = store
+        self.provider = provider
+
+    def send(self, request, **kwargs):
+        start = time.perf_counter()
+        response = super().send(request, **kwargs)
+        headers = {name: response.headers[name] for name in _KEPT_HEADERS if name in response.headers}
+        self.store.save(fixture_key(request.method, request.url, request.body), self.provider,
+                        response.status_code, headers, response.text, time.perf_counter() - start)
+        return response
+
+
+class ReplayAdapter(BaseAdapter):
+    """Serves recorded responses with simulated latency, injected errors and a throughput cap."""
+
+    def __init__(self, store: FixtureStore, latency_s: Union[float, Tuple[float, float]] = 0.0,
+                 error_rate: float = 0.0, error_status: Optional[int] = None,
+                 max_rps: Optional[float] = None, seed: Optional[int] = None):
+        super().__init__()
+        self.store = store
+        self.latency_s = latency_s
+        self.error_rate = error_rate
+        self.error_status = error_status  # None injects connection errors instead of a status
+        self.max_rps = max_rps
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+        self.stats = {'served': 0, 'misses': 0, 'injected_errors': 0}
+
+    def _count(self, key: str):
+        with self._lock:
+            self.stats[key] += 1
+
+    def _throttle(self):
+        """Space requests 1/max_rps apart, like a server with fixed capacity."""
+        if not self.max_rps:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + 1.0 / self.max_rps
+        if slot > now:
+            time.sleep(slot - now)
+
+    def _latency(self) -> float:
+        if isinstance(self.latency_s, tuple):
+            with self._lock:
+                return self._rng.uniform(*self.latency_s)
+        return self.latency_s
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        self._throttle()
+        delay = self._latency()
+        if delay:
+            time.sleep(delay)
+
+        with self._lock:
+            inject = self.error_rate and self._rng.random() < self.error_rate
+        if inject:
+            self._count('injected_errors')
+            if self.error_status is None:
+                raise requests.exceptions.ConnectionError(f"injected failure for {request.url}", request=request)
+            return _build_response(request, self.error_status, {}, '')
+
+        fixture = self.store.get(fixture_key(request.method, request.url, request.body))
+        if fixture is None:
+            self._count('misses')
+            return _build_response(request, 404, {'Content-Type': 'text/plain'},
+                                   f"no fixture for {request.method} {request.url}")
+
+        self._count('served')
+        return _build_response(request, fixture['status'], fixture['headers'], fixture['body'])
+
+    def close(self):
+        pass
+
+
+def record_transport(store: FixtureStore, **transport_kwargs) -> PooledTransport:
+    """Transport that talks to the real providers and records every response."""
+    return PooledTransport(
+        adapter_factory=lambda provider, pool_size: RecordingAdapter(
+            store, provider, pool_connections=1, pool_maxsize=pool_size),
+        **transport_kwargs
+    )
+
+
+def replay_transport(store: FixtureStore, **replay_kwargs) -> PooledTransport:
+    """Transport that never touches the network; every provider shares one ReplayAdapter."""
+    adapter = ReplayAdapter(store, **replay_kwargs)
+    transport = PooledTransport(adapter_factory=lambda provider, pool_size: adapter)
+    transport.replay = adapter
+    return transport
+
+
+def transport_from_env() -> Optional[PooledTransport]:
+    """Record/replay transport selected by RAILWAY_HTTP_MODE, or None for live traffic."""
+    mode = os.getenv('RAILWAY_HTTP_MODE', '').lower()
+    if mode not in ('record', 'replay'):
+        return None
+    store = FixtureStore(os.getenv('RAILWAY_FIXTURES_DIR') or DEFAULT_FIXTURES_DIR)
+    if mode == 'record':
+        return record_transport(store)
+    return replay_transport(
+        store,
+        latency_s=float(os.getenv('RAILWAY_REPLAY_LATENCY_S', '0')),
+        error_rate=float(os.getenv('RAILWAY_REPLAY_ERROR_RATE', '0')),
+    )
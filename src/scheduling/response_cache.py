@@ -0,0 +1,220 @@
+"""
+Tiered response cache for IndianRailwaysAPI.
+
+Tier 1 is an in-memory LRU with a TTL per endpoint class (schedules live for
+hours, live status for under a minute). Tier 2 is an optional SQLite file
+that survives restarts so a cold start does not re-spend paid API quota.
+
+Entries are stored frozen and served as views: each caller gets a fresh top
+level over read-only nested records, so no caller can change what later hits
+see. ``.copy()`` a nested record to modify it.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+from src.utils.frozen import freeze
+
+
+# Seconds each endpoint class stays fresh
+DEFAULT_TTLS = {
+    'schedule': 6 * 3600,
+    'journey_schedule': 3 * 3600,
+    'station_code': 24 * 3600,
+    'fare': 6 * 3600,
+    'between_stations': 10 * 60,
+    'pnr': 2 * 60,
+    'live_status': 45,
+}
+
+# Endpoint classes worth persisting to the SQLite tier (static, quota-costly data)
+DEFAULT_PERSISTENT = ('schedule', 'journey_schedule', 'station_code', 'fare', 'between_stations')
+
+DEFAULT_MAX_ENTRIES = int(os.getenv('RAILWAY_CACHE_MAX_ENTRIES', '2048'))
+
+
+def _view(value: Any) -> Any:
+    """Fresh top-level dict or list over a frozen entry's shared nested records."""
+    if isinstance(value, dict):
+        return dict(value)
+    if isinstance(value, list):
+        return list(value)
+    return value
+
+
+class SQLiteCacheTier:
+    """Persistent second tier storing JSON-encoded responses with absolute expiry."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " key TEXT PRIMARY KEY, endpoint TEXT NOT NULL,"
+            " expires_at REAL NOT NULL, payload TEXT NOT NULL)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Tuple[bool, Any, float]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT expires_at, payload FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or row[0] <= time.time():
+            return False, None, 0.0
+        return True, json.loads(row[1]), row[0]
+
+    def set(self, key: str, endpoint: str, value: Any, expires_at: float) -> bool:
+        try:
+            payload = json.dumps(value)
+        except (TypeError, ValueError):
+            return False
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, endpoint, expires_at, payload) VALUES (?, ?, ?, ?)",
+                (key, endpoint, expires_at, payload)
+            )
+            self._conn.commit()
+        return True
+
+    def purge_expired(self) -> int:
+        with self._lock:
+            cur = self._conn.execute("DELETE FROM responses WHERE expires_at <= ?", (time.time(),))
+            self._conn.commit()
+            return cur.rowcount
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class ResponseCache:
+    """Size-bounded LRU with per-endpoint TTLs and an optional SQLite tier."""
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES,
+                 ttls: Optional[Dict[str, float]] = None,
+                 sqlite_path: Optional[str] = None,
+                 persistent_endpoints=DEFAULT_PERSISTENT):
+        self.max_entries = max_entries
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.persistent_endpoints = set(persistent_endpoints)
+        self.disk = SQLiteCacheTier(sqlite_path) if sqlite_path else None
+        self._entries: "OrderedDict[Tuple[str, Hashable], Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {'hits': 0, 'disk_hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0}
+
+    @staticmethod
+    def _disk_key(endpoint: str, key: Hashable) -> str:
+        return f"{endpoint}:{json.dumps(key, default=str)}"
+
+    def get(self, endpoint: str, key: Hashable) -> Tuple[bool, Any]:
+        """Return (found, value) for a fresh entry from either tier."""
+        cache_key = (endpoint, key)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(cache_key)
+            if entry is not None:
+                if entry[0] > now:
+                    self._entries.move_to_end(cache_key)
+                    self.stats['hits'] += 1
+                    return True, _view(entry[1])
+                del self._entries[cache_key]
+                self.stats['expirations'] += 1
+
+        if self.disk is not None and endpoint in self.persistent_endpoints:
+            found, value, expires_at = self.disk.get(self._disk_key(endpoint, key))
+            if found:
+                value = freeze(value)
+                with self._lock:
+                    self._store(cache_key, value, expires_at)
+                    self.stats['disk_hits'] += 1
+                return True, _view(value)
+
+        with self._lock:
+            self.stats['misses'] += 1
+        return False, None
+
+    def contains(self, endpoint: str, key: Hashable) -> bool:
+        """Whether a fresh in-memory entry exists; does not touch LRU order or stats."""
+        with self._lock:
+            entry = self._entries.get((endpoint, key))
+            return entry is not None and entry[0] > time.time()
+
+    def set(self, endpoint: str, key: Hashable, value: Any):
+        """Store a (frozen) value under the endpoint class TTL."""
+        ttl = self.ttls.get(endpoint)
+        if not ttl:
+            return
+        value = freeze(value)
+        expires_at = time.time() + ttl
+        with self._lock:
+            self._store((endpoint, key), value, expires_at)
+        if self.disk is not None and endpoint in self.persistent_endpoints:
+            self.disk.set(self._disk_key(endpoint, key), endpoint, value, expires_at)
+
+    def get_or_fetch(self, endpoint: str, key: Hashable, fetch: Callable[[], Any]) -> Any:
+        """Return the cached value or call fetch(); None results are not cached."""
+        found, value = self.get(endpoint, key)
+        if found:
+            return value
+        value = fetch()
+        if value is None:
+            return None
+        value = freeze(value)
+        self.set(endpoint, key, value)
+        return _view(value)
+
+    def invalidate(self, endpoint: Optional[str] = None):
+        """Drop in-memory entries for one endpoint class, or everything."""
+        with self._lock:
+            if endpoint is None:
+                self._entries.clear()
+            else:
+                for cache_key in [k for k in self._entries if k[0] == endpoint]:
+                    del self._entries[cache_key]
+
+    def get_stats(self) -> Dict:
+        """Hit/miss/eviction counters and current size."""
+        with self._lock:
+            lookups = self.stats['hits'] + self.stats['disk_hits'] + self.stats['misses']
+            hits = self.stats['hits'] + self.stats['disk_hits']
+            return {
+                **self.stats,
+                'size': len(self._entries),
+                'max_entries': self.max_entries,
+                'hit_rate': hits / lookups if lookups else 0.0,
+                'persistent': self.disk is not None
+            }
+
+    def _store(self, cache_key, value, expires_at: float):
+        """Insert under the lock, evicting least-recently-used entries past the bound."""
+        self._entries[cache_key] = (expires_at, value)
+        self._entries.move_to_end(cache_key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.stats['evictions'] += 1
+
+
+_shared_cache: Optional[ResponseCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_cache() -> ResponseCache:
+    """Process-wide cache; set RAILWAY_CACHE_DB to enable the SQLite tier."""
+    global _shared_cache
+    if _shared_cache is None:
+        with _shared_lock:
+            if _shared_cache is None:
+                _shared_cache = ResponseCache(sqlite_path=os.getenv('RAILWAY_CACHE_DB') or None)
+    return _shared_cache
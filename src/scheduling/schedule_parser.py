@@ -109,19 +109,21 @@ class ScheduleParser:
 
         return current_trains
 
-    def search_trains_between_stations(self, from_station: str, to_station: str) -> List[Dict]:
-        """Search trains between two stations."""
+    def search_trains_between_stations(self, from_station: str, to_station: str,
+                                       limit: Optional[int] = None) -> List[Dict]:
+        """Search trains between two stations (at most `limit` when given)."""
         # Try with station codes first
         from_code = self.api.get_station_code(from_station)
         to_code = self.api.get_station_code(to_station)
 
         if from_code and to_code:
-            trains = self.api.get_all_trains_between_stations(from_code, to_code)
+            trains = self.api.get_all_trains_between_stations(from_code, to_code, limit=limit)
             if trains:
                 return trains
 
         # Fallback: try with station names directly
-        trains = self.api.get_all_trains_between_stations(from_station.upper(), to_station.upper())
+        trains = self.api.get_all_trains_between_stations(from_station.upper(), to_station.upper(),
+                                                          limit=limit)
         return trains or []
 
     def get_pnr_status(self, pnr_number: str) -> Optional[Dict]:
@@ -0,0 +1,104 @@
+"""
+Single-flight request coalescing.
+
+Concurrent callers asking for the same (endpoint, args) key share one
+in-flight call instead of each hitting the provider. Works for threads
+(``do``) and coroutines (``do_async``).
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+
+class SingleFlight:
+    """Deduplicates identical concurrent calls and counts how many were coalesced."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight: Dict[Hashable, Future] = {}
+        self._async_in_flight: Dict[Hashable, asyncio.Future] = {}
+        self.stats = {'calls': 0, 'executions': 0, 'coalesced': 0}
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """Run fn once for all threads concurrently asking for key."""
+        with self._lock:
+            self.stats['calls'] += 1
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._in_flight[key] = future
+                self.stats['executions'] += 1
+            else:
+                self.stats['coalesced'] += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn()
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._in_flight.pop(key, None)
+
+    async def do_async(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """Await fn once for all coroutines concurrently asking for key."""
+        loop = asyncio.get_running_loop()
+        key = (id(loop), key)
+        with self._lock:
+            self.stats['calls'] += 1
+            future = self._async_in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = loop.create_future()
+                self._async_in_flight[key] = future
+                self.stats['executions'] += 1
+            else:
+                self.stats['coalesced'] += 1
+
+        if not leader:
+            return await asyncio.shield(future)
+
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark retrieved so a leader-only failure does not log "never retrieved"
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._async_in_flight.pop(key, None)
+
+    def get_stats(self) -> Dict:
+        """Call, execution and coalesced counts."""
+        with self._lock:
+            return {**self.stats, 'in_flight': len(self._in_flight) + len(self._async_in_flight)}
+
+
+_shared_flight: Optional[SingleFlight] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_single_flight() -> SingleFlight:
+    """Process-wide coalescer so separate client instances share in-flight calls."""
+    global _shared_flight
+    if _shared_flight is None:
+        with _shared_lock:
+            if _shared_flight is None:
+                _shared_flight = SingleFlight()
+    return _shared_flight
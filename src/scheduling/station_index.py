@@ -0,0 +1,227 @@
+"""
+Prebuilt fuzzy index over station names, codes and aliases.
+
+Built once at load time: the shared index over the stations CSV backs
+IndianRailwaysAPI.get_station_code, and RailwayData.station_index builds one
+over the loaded station table (schedule stations included) for
+TrainRepository.search_stations. Exact keys are a dict lookup, substring
+matches come from a trigram inverted index, and typo matches are trigram
+candidates verified with a bounded edit distance, so lookups stay well under
+a millisecond for the full station list.
+"""
+
+import csv
+import re
+import threading
+from collections import Counter, defaultdict
+from itertools import chain
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+
+STATIONS_FILE = Path(__file__).parent.parent.parent / "data" / "indian_stations.csv"
+
+# Common city names and spellings that do not match the official station name
+STATION_ALIASES = {
+    # Major metros
+    'mumbai': 'BCT', 'delhi': 'NDLS', 'new delhi': 'NDLS', 'kolkata': 'KOAA',
+    'chennai': 'MAS', 'bangalore': 'SBC', 'bengaluru': 'SBC', 'ahmedabad': 'ADI',
+    'pune': 'PUNE', 'hyderabad': 'HYB', 'secunderabad': 'SC', 'kochi': 'ERS',
+    # Northern India
+    'jaipur': 'JP', 'jp': 'JP', 'lucknow': 'LKO', 'kanpur': 'CNB', 'jodhpur': 'JU',
+    'udaipur': 'UDZ', 'ajmer': 'AII', 'bikaner': 'BKN', 'agra': 'AGC', 'mathura': 'MTJ',
+    'meerut': 'MTJ', 'ambala': 'UMB', 'chandigarh': 'CDG', 'amritsar': 'ASR',
+    'ludhiana': 'LDH', 'jalandhar': 'JUC', 'bathinda': 'BTI', 'patiala': 'PTA',
+    # Eastern India
+    'allahabad': 'ALD', 'prayagraj': 'ALD', 'varanasi': 'BSB', 'gorakhpur': 'GKP',
+    'patna': 'PNBE', 'gaya': 'GAYA', 'darbhanga': 'DBG', 'muzaffarpur': 'MFP',
+    # Central India
+    'bhopal': 'BPL', 'indore': 'INDB', 'nagpur': 'NGP', 'jabalpur': 'JBP',
+    'satna': 'SATN', 'gwalior': 'GWL', 'ujjain': 'UJN', 'kota': 'KJ', 'kota junction': 'KJ',
+    # Western India
+    'surat': 'ST', 'vadodara': 'BRC', 'rajkot': 'RJT', 'bhavnagar': 'BH',
+    'porbandar': 'POR', 'junagadh': 'JNG',
+    # Southern India
+    'coimbatore': 'CBE', 'madurai': 'MDU', 'trichy': 'TPJ', 'salem': 'SA',
+    'trivandrum': 'TVC', 'calicut': 'CLT', 'mangalore': 'MAJN',
+    'vijayawada': 'BZA', 'visakhapatnam': 'VSKP', 'rajahmundry': 'RJY',
+    'tirupati': 'TIPT'
+}
+
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+
+# Match tiers, best first
+EXACT, PREFIX, SUBSTRING, CONTAINED, FUZZY = range(5)
+
+
+def normalize(text: str) -> str:
+    """Lower-case, drop punctuation and collapse whitespace."""
+    return _NON_ALNUM_RE.sub(" ", str(text).lower()).strip()
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _padded_trigrams(text: str) -> Set[str]:
+    return _trigrams(f"  {text}  ")
+
+
+def bounded_levenshtein(a: str, b: str, max_distance: int) -> Optional[int]:
+    """Edit distance between a and b, or None as soon as it must exceed max_distance."""
+    if abs(len(a) - len(b)) > max_distance:
+        return None
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        row_min = i
+        for j, cb in enumerate(b, 1):
+            value = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb))
+            current.append(value)
+            if value < row_min:
+                row_min = value
+        if row_min > max_distance:
+            return None
+        previous = current
+    return previous[-1] if previous[-1] <= max_distance else None
+
+
+class StationIndex:
+    """Exact, substring (trigram) and bounded-edit-distance lookup over station keys."""
+
+    def __init__(self, stations: Iterable[Tuple[str, str]] = (),
+                 aliases: Optional[Dict[str, str]] = None):
+        self._keys: List[str] = []
+        self._targets: List[Tuple[str, str, str]] = []  # (code, name, kind) per key
+        self._exact: Dict[str, List[int]] = defaultdict(list)
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+        self._padded_postings: Dict[str, List[int]] = defaultdict(list)
+        self._padded_sizes: List[int] = []
+        self._names: Dict[str, str] = {}
+
+        for code, name in stations:
+            code = str(code).upper()
+            self._names.setdefault(code, name)
+            self._add(name, code, name, 'name')
+            self._add(code, code, name, 'code')
+        for alias, code in (aliases or {}).items():
+            self._add(alias, code, self._names.get(code, alias.title()), 'alias')
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def _add(self, raw_key: str, code: str, name: str, kind: str):
+        key = normalize(raw_key)
+        if not key:
+            return
+        entry_id = len(self._keys)
+        self._keys.append(key)
+        self._targets.append((code, name, kind))
+        self._exact[key].append(entry_id)
+        for gram in _trigrams(key):
+            self._postings[gram].append(entry_id)
+        padded = _padded_trigrams(key)
+        self._padded_sizes.append(len(padded))
+        for gram in padded:
+            self._padded_postings[gram].append(entry_id)
+
+    def search(self, query: str, limit: Optional[int] = 10, max_distance: int = 2) -> List[Dict]:
+        """Ranked candidates: exact, prefix, substring, whole words of the query, then typo matches."""
+        q = normalize(query)
+        if not q:
+            return []
+
+        best: Dict[int, Tuple[int, int]] = {}  # entry -> (tier, distance)
+
+        for entry_id in self._exact.get(q, ()):
+            best[entry_id] = (EXACT, 0)
+
+        for entry_id in self._substring_candidates(q):
+            if entry_id not in best and q in self._keys[entry_id]:
+                best[entry_id] = (PREFIX if self._keys[entry_id].startswith(q) else SUBSTRING, 0)
+
+        # Whole-word keys inside the query ("jaipur" in "jaipur city"): O(words^2) exact lookups
+        words = q.split()
+        for start in range(len(words)):
+            for end in range(start + 1, len(words) + 1):
+                for entry_id in self._exact.get(" ".join(words[start:end]), ()):
+                    best.setdefault(entry_id, (CONTAINED, 0))
+
+        # Typo matches are only worth computing when the cheaper tiers left room
+        wanted = limit if limit is not None else float('inf')
+        if max_distance > 0 and len({self._targets[e][0] for e in best}) < wanted:
+            for entry_id, distance in self._fuzzy_candidates(q, max_distance):
+                if entry_id not in best:
+                    best[entry_id] = (FUZZY, distance)
+
+        ranked = sorted(
+            best.items(),
+            key=lambda item: (item[1][0], item[1][1], abs(len(self._keys[item[0]]) - len(q)), self._keys[item[0]])
+        )
+
+        results = []
+        seen_codes = set()
+        for entry_id, (tier, distance) in ranked:
+            code, name, kind = self._targets[entry_id]
+            if code in seen_codes:
+                continue
+            seen_codes.add(code)
+            results.append({'code': code, 'name': name, 'matched': self._keys[entry_id],
+                            'kind': kind, 'tier': tier, 'distance': distance})
+            if limit is not None and len(results) >= limit:
+                break
+        return results
+
+    def resolve(self, query: str, max_distance: int = 2) -> Optional[str]:
+        """Best station code for a name, code or alias; None if nothing is close enough."""
+        results = self.search(query, limit=1, max_distance=max_distance)
+        return results[0]['code'] if results else None
+
+    def _substring_candidates(self, q: str) -> Iterable[int]:
+        """Entries whose key may contain q: those holding every trigram of q."""
+        grams = _trigrams(q)
+        if not grams:
+            # Too short for trigrams: checking every key is still cheap
+            return range(len(self._keys))
+        postings = sorted((self._postings.get(gram, ()) for gram in grams), key=len)
+        if not postings[0]:
+            return ()
+        return set(postings[0]).intersection(*postings[1:])
+
+    def _fuzzy_candidates(self, q: str, max_distance: int) -> Iterable[Tuple[int, int]]:
+        grams = _padded_trigrams(q)
+        counts = Counter(chain.from_iterable(self._padded_postings.get(gram, ()) for gram in grams))
+
+        # q-gram lemma: each edit destroys at most 3 padded trigrams
+        for entry_id, shared in counts.items():
+            needed = max(len(grams), self._padded_sizes[entry_id]) - 3 * max_distance
+            if shared < needed:
+                continue
+            distance = bounded_levenshtein(q, self._keys[entry_id], max_distance)
+            if distance is not None:
+                yield entry_id, distance
+
+
+def load_stations_csv(path: Path = STATIONS_FILE) -> List[Tuple[str, str]]:
+    """(code, name) pairs from the stations CSV; empty if the file is missing."""
+    if not path.exists():
+        return []
+    with open(path, newline='', encoding='utf-8') as handle:
+        return [(row['station_code'], row['station_name']) for row in csv.DictReader(handle)
+                if row.get('station_code') and row.get('station_name')]
+
+
+_shared_index: Optional[StationIndex] = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_station_index() -> StationIndex:
+    """Process-wide index over the stations CSV plus the city alias table."""
+    global _shared_index
+    if _shared_index is None:
+        with _shared_lock:
+            if _shared_index is None:
+                _shared_index = StationIndex(load_stations_csv(), STATION_ALIASES)
+    return _shared_index
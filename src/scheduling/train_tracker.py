@@ -205,6 +205,25 @@ class AdvancedTrainTracker:
 
         return start_dt, end_dt
 
+    def get_train_updates(self, train_number: int, consumer: str = 'tracker') -> Optional[Dict]:
+        """Get only the events since this consumer's last poll plus the current position."""
+        update = self.api.poll_train_events(str(train_number), consumer=consumer)
+        if update is None:
+            return None
+
+        update['new_events'] = [
+            TrainEvent(
+                raw=event_data.get('raw', ''),
+                event_type=event_data.get('type'),
+                station=event_data.get('station'),
+                code=event_data.get('code'),
+                datetime_obj=event_data.get('datetime'),
+                delay=event_data.get('delay')
+            )
+            for event_data in update['new_events']
+        ]
+        return update
+
     def get_train_current_position(self, train_number: int) -> Optional[Dict]:
         """Get current position and status of a train."""
         status_response = self.get_train_status(train_number)
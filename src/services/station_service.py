@@ -1,14 +1,14 @@
 """Station Service - handles station operations."""
 from typing import List, Optional, Dict
 from src.models import Station
-from src.repositories.train_repository import TrainRepository
+from src.repositories.train_repository import get_shared_repository
 
 
 class StationService:
     """Business logic for station queries and operations."""
     
     def __init__(self):
-        self.repository = TrainRepository()
+        self.repository = get_shared_repository()
     
     def get_all_stations(self) -> List[Station]:
         """Get all available stations."""
@@ -1,14 +1,14 @@
 """Train Route Service - handles train route operations."""
 from typing import List, Optional, Dict
 from src.models import Train, Station, TrainRoute
-from src.repositories.train_repository import TrainRepository
+from src.repositories.train_repository import get_shared_repository
 
 
 class TrainRouteService:
     """Business logic for train routes."""
     
     def __init__(self):
-        self.repository = TrainRepository()
+        self.repository = get_shared_repository()
     
     def get_routes_between_stations(
         self,
@@ -38,7 +38,22 @@ class TrainRouteService:
                 continue
         
         return sorted(routes, key=lambda r: r.train.departure_time)
-    
+
+    def plan_journeys(
+        self,
+        from_code: str,
+        to_code: str,
+        depart_after: str = "00:00",
+        depart_before: str = "23:59",
+        max_transfers: int = 1,
+        min_transfer_minutes: int = 30
+    ) -> List[Dict]:
+        """Plan direct and connecting journeys from the local timetable (no API calls)."""
+        return self.repository.plan_journeys(
+            from_code, to_code, depart_after, depart_before,
+            max_transfers=max_transfers, min_transfer_minutes=min_transfer_minutes
+        )
+
     def get_direct_routes(
         self,
         from_code: str,
@@ -33,8 +33,9 @@ from src.detection.train_detector import TrainDetector
 from src.detection.coach_detector import CoachDetector
 from src.scheduling.schedule_parser import ScheduleParser
 from src.scheduling.status_calculator import StatusCalculator
-from src.repositories.train_repository import TrainRepository
-from src.ui.journey_tracking import display_journey_tracking, display_all_india_trains_and_stations
+from src.repositories.train_repository import get_shared_repository
+from src.ui.journey_tracking import display_journey_tracking, display_all_india_trains_and_stations, render_pager
+from src.ui import listings
 
 # Custom CSS for professional styling
 st.markdown("""
@@ -685,7 +686,7 @@ class TrainDetectionApp:
         self.coach_detector = None
         self.schedule_parser = ScheduleParser()
         self.status_calculator = StatusCalculator()
-        self.train_repository = TrainRepository()
+        self.train_repository = get_shared_repository()
     
     # ==================== ERROR HANDLING ====================
     
@@ -3219,7 +3220,16 @@ class TrainDetectionApp:
         st.markdown(f'<h4 style="color: #2c3e50;">🛤️ Routes from <span style="color: #e74c3c;">{from_station.upper()}</span> to <span style="color: #e74c3c;">{to_station.upper()}</span></h4>', unsafe_allow_html=True)
         
         try:
-            trains = self.schedule_parser.search_trains_between_stations(from_station, to_station)
+            # The local timetable answers instantly and offline; the live API is the fallback
+            trains = self.train_repository.get_trains_between_stations(from_station, to_station, limit=10)
+            if not trains:
+                from_code = self.train_repository.get_station_code(from_station)
+                to_code = self.train_repository.get_station_code(to_station)
+                if from_code and to_code:
+                    trains = self.train_repository.get_trains_between_stations(from_code, to_code, limit=10)
+            if not trains:
+                # Only the first 10 are shown, so stop decoding the response there
+                trains = self.schedule_parser.search_trains_between_stations(from_station, to_station, limit=10)
 
             if trains:
                 # Create a dataframe for better display
@@ -3276,25 +3286,35 @@ class TrainDetectionApp:
         # Tab 1: All Trains
         with view_tab1:
             st.subheader("🚂 All Indian Trains")
-            all_trains = self.train_repository.get_all_trains()
             
-            if all_trains:
+            if self.train_repository.count_trains():
                 # Create filters
                 col1, col2 = st.columns(2)
                 with col1:
                     selected_zone = st.multiselect("Filter by Zone", 
-                                                   options=sorted(list(set([t.get('zone', 'Unknown') for t in all_trains]))),
+                                                   options=listings.filter_options(self.train_repository, 'trains', 'zone'),
                                                    key="train_zone_filter")
                 
+                with col2:
+                    train_query = st.text_input("Search by name or number", key="train_search_query")
+
                 # Filter trains
-                filtered_trains = all_trains
-                if selected_zone:
-                    filtered_trains = [t for t in filtered_trains if t.get('zone', '') in selected_zone]
+                zones = selected_zone or None
+                if train_query:
+                    # Prefix index: ranked completions without rescanning every train per keystroke
+                    filtered_trains = listings.search_trains(self.train_repository, train_query, zones)
+                    total_trains = len(filtered_trains)
+                else:
+                    # Only the page on screen is materialised; the total comes from the zone counts
+                    cursor = listings.current_cursor(st.session_state, "train_directory", (tuple(selected_zone),))
+                    train_page = listings.train_page(self.train_repository, zones, cursor)
+                    filtered_trains = train_page['items']
+                    total_trains = train_page['total']
                 
-                st.markdown(f"**Total Trains: {len(filtered_trains)}**")
+                st.markdown(f"**Total Trains: {total_trains}**")
                 
                 # Display trains in a nice format
-                for train in filtered_trains[:10]:  # Display first 10
+                for train in filtered_trains[:listings.TRAIN_PAGE_SIZE]:
                     with st.container(border=True):
                         col1, col2, col3, col4 = st.columns(4)
                         
@@ -3304,14 +3324,14 @@ class TrainDetectionApp:
                         
                         with col2:
                             st.markdown("**Route**")
-                            st.write(f"{train['from_station']} → {train['to_station']}")
+                            st.write(f"{train.get('from_station', 'N/A')} → {train.get('to_station', 'N/A')}")
                         
                         with col3:
-                            st.metric("Total Coaches", train['coach_count'])
+                            st.metric("Total Coaches", train.get('coach_count', 'N/A'))
                         
                         with col4:
                             st.markdown("**Timing**")
-                            st.caption(f"⏰ {train['departure_time']} - {train['arrival_time']}")
+                            st.caption(f"⏰ {train.get('departure_time', 'N/A')} - {train.get('arrival_time', 'N/A')}")
                         
                         # Coach breakdown
                         coach_cols = st.columns(4)
@@ -3323,57 +3343,72 @@ class TrainDetectionApp:
                             st.metric("AC3", int(train.get('ac3_coaches', 0)))
                         with coach_cols[3]:
                             st.metric("FC", int(train.get('fc_coaches', 0)))
+
+                if not train_query:
+                    render_pager("train_directory", train_page)
             else:
                 st.warning("No trains found in database")
         
         # Tab 2: All Stations
         with view_tab2:
             st.subheader("📍 All Indian Railway Stations")
-            all_stations = self.train_repository.get_all_stations()
             
-            if all_stations:
+            if self.train_repository.count_stations():
                 # Create filters
                 col1, col2 = st.columns(2)
                 with col1:
                     selected_state = st.multiselect("Filter by State", 
-                                                    options=sorted(list(set([s.get('state', 'Unknown') for s in all_stations]))),
+                                                    options=listings.filter_options(self.train_repository, 'stations', 'state'),
                                                     key="station_state_filter")
                 with col2:
                     selected_type = st.multiselect("Filter by Type", 
-                                                   options=sorted(list(set([s.get('station_type', 'Unknown') for s in all_stations]))),
+                                                   options=listings.filter_options(self.train_repository, 'stations', 'station_type'),
                                                    key="station_type_filter")
                 
+                station_query = st.text_input("Search by name or code", key="station_search_query")
+
                 # Filter stations
-                filtered_stations = all_stations
-                if selected_state:
-                    filtered_stations = [s for s in filtered_stations if s.get('state', '') in selected_state]
-                if selected_type:
-                    filtered_stations = [s for s in filtered_stations if s.get('station_type', '') in selected_type]
+                if station_query:
+                    filtered_stations = listings.search_stations(self.train_repository, station_query,
+                                                                 selected_state, selected_type)
+                    total_stations = len(filtered_stations)
+                else:
+                    cursor = listings.current_cursor(st.session_state, "station_directory",
+                                                     (tuple(selected_state), tuple(selected_type)))
+                    station_page = listings.station_page(self.train_repository, selected_state,
+                                                         selected_type, cursor)
+                    filtered_stations = station_page['items']
+                    total_stations = station_page['total']
                 
-                st.markdown(f"**Total Stations: {len(filtered_stations)}**")
+                st.markdown(f"**Total Stations: {total_stations}**")
                 
                 # Display as dataframe
-                stations_df = pd.DataFrame(filtered_stations)
+                # Schedule-only stations have no type, state, platforms or zone
+                stations_df = pd.DataFrame(filtered_stations).reindex(
+                    columns=['station_code', 'station_name', 'station_type', 'state', 'platform_count', 'zone'])
                 st.dataframe(
-                    stations_df[['station_code', 'station_name', 'station_type', 'state', 'platform_count', 'zone']],
+                    stations_df,
                     use_container_width=True,
                     height=400
                 )
+
+                if not station_query:
+                    render_pager("station_directory", station_page)
             else:
                 st.warning("No stations found in database")
         
         # Tab 3: Coach Details
         with view_tab3:
             st.subheader("🚃 Train Coach Composition Details")
-            all_trains = self.train_repository.get_all_trains()
+            coach_query = st.text_input("Find a train by name or number", key="coach_detail_query")
+            train_choices = listings.train_choices(self.train_repository, coach_query)
             
-            if all_trains:
+            if train_choices:
                 selected_train = st.selectbox("Select a Train",
-                                             options=[f"{t['train_name']} ({t['train_no']})" for t in all_trains],
+                                             options=list(train_choices),
                                              key="coach_detail_select")
                 
-                # Extract train number
-                train_no = selected_train.split("(")[1].rstrip(")")
+                train_no = train_choices[selected_train]
                 coach_details = self.train_repository.get_coach_details(train_no)
                 
                 if coach_details:
@@ -5,7 +5,8 @@ Displays station-by-station train journey with live tracking data
 
 import streamlit as st
 import pandas as pd
-from src.repositories.train_repository import TrainRepository
+from src.repositories.train_repository import get_shared_repository
+from src.ui import listings
 from datetime import datetime
 
 def display_journey_tracking():
@@ -18,7 +19,7 @@ def display_journey_tracking():
     </div>
     """, unsafe_allow_html=True)
     
-    repo = TrainRepository()
+    repo = get_shared_repository()
     
     # Journey Tracking Input
     col1, col2, col3 = st.columns([2, 1, 1])
@@ -218,7 +219,7 @@ def display_all_india_trains_and_stations():
     </div>
     """, unsafe_allow_html=True)
     
-    repo = TrainRepository()
+    repo = get_shared_repository()
     
     # Tabs for different views
     view_tab1, view_tab2, view_tab3 = st.tabs(["🚆 All Trains", "📍 All Stations", "🗺️ Network Map"])
@@ -232,14 +233,25 @@ def display_all_india_trains_and_stations():
     with view_tab3:
         display_network_map(repo)
 
+def render_pager(key, page):
+    """Previous / Next buttons for a cursor-paged directory listing."""
+    col_prev, col_next = st.columns(2)
+    with col_prev:
+        st.button("◀ Previous", key=f"{key}_prev",
+                  disabled=not listings.has_previous(st.session_state, key),
+                  on_click=listings.previous_page, args=(st.session_state, key))
+    with col_next:
+        st.button("Next ▶", key=f"{key}_next", disabled=not page['has_more'],
+                  on_click=listings.next_page, args=(st.session_state, key, page['next_cursor']))
+
 def display_all_trains(repo):
     """Display list of all trains."""
     st.subheader("🚆 Complete Train Directory")
     
-    all_trains = repo.get_all_trains()
+    train_count = repo.count_trains()
     
-    if all_trains:
-        st.success(f"✅ Loaded {len(all_trains)} trains")
+    if train_count:
+        st.success(f"✅ Loaded {train_count} trains")
         
         # Search and filter
         search_col, filter_col = st.columns(2)
@@ -249,16 +261,17 @@ def display_all_trains(repo):
         
         with filter_col:
             zone_filter = st.multiselect("Filter by Zone", 
-                                       list(set(t.get('zone', 'Unknown') for t in all_trains)),
+                                       listings.filter_options(repo, 'trains', 'zone'),
                                        key="zone_filter")
         
-        # Filter trains
-        filtered_trains = all_trains
+        # Filter trains: ranked prefix completions, or one page of the zone listing when not searching
         if search_term:
-            filtered_trains = [t for t in filtered_trains if search_term.lower() in str(t.get('train_no', '')).lower() 
-                             or search_term.lower() in t.get('train_name', '').lower()]
-        if zone_filter:
-            filtered_trains = [t for t in filtered_trains if t.get('zone') in zone_filter]
+            filtered_trains = listings.search_trains(repo, search_term, zone_filter)
+        else:
+            cursor = listings.current_cursor(st.session_state, "train_list", (tuple(zone_filter),))
+            train_page = listings.train_page(repo, zone_filter, cursor, limit=listings.SEARCH_LIMIT)
+            filtered_trains = train_page['items']
+            st.caption(f"{train_page['total']} trains match")
         
         # Display trains
         if filtered_trains:
@@ -283,6 +296,9 @@ def display_all_trains(repo):
                         </div>
                     </div>
                     """, unsafe_allow_html=True)
+
+            if not search_term:
+                render_pager("train_list", train_page)
         else:
             st.warning("No trains found matching your search criteria.")
     else:
@@ -292,10 +308,10 @@ def display_all_stations(repo):
     """Display list of all stations."""
     st.subheader("📍 Complete Station Directory")
     
-    all_stations = repo.get_all_stations()
+    station_count = repo.count_stations()
     
-    if all_stations:
-        st.success(f"✅ Loaded {len(all_stations)} stations")
+    if station_count:
+        st.success(f"✅ Loaded {station_count} stations")
         
         # Search and filter
         search_col, filter_col = st.columns(2)
@@ -305,16 +321,17 @@ def display_all_stations(repo):
         
         with filter_col:
             state_filter = st.multiselect("Filter by State",
-                                        list(set(s.get('state', 'Unknown') for s in all_stations)),
+                                        listings.filter_options(repo, 'stations', 'state'),
                                         key="state_filter")
         
-        # Filter stations
-        filtered_stations = all_stations
+        # Filter stations: ranked prefix completions, or one page of the state listing when not searching
         if search_term:
-            filtered_stations = [s for s in filtered_stations if search_term.lower() in s.get('station_code', '').lower()
-                               or search_term.lower() in s.get('station_name', '').lower()]
-        if state_filter:
-            filtered_stations = [s for s in filtered_stations if s.get('state') in state_filter]
+            filtered_stations = listings.search_stations(repo, search_term, state_filter)
+        else:
+            cursor = listings.current_cursor(st.session_state, "station_list", (tuple(state_filter),))
+            station_page = listings.station_page(repo, state_filter, cursor=cursor)
+            filtered_stations = station_page['items']
+            st.caption(f"{station_page['total']} stations match")
         
         # Display stations
         if filtered_stations:
@@ -330,6 +347,9 @@ def display_all_stations(repo):
                 })
             
             st.dataframe(pd.DataFrame(station_data), width='stretch', hide_index=True)
+
+            if not search_term:
+                render_pager("station_list", station_page)
         else:
             st.warning("No stations found matching your search criteria.")
     else:
@@ -339,26 +359,27 @@ def display_network_map(repo):
     """Display network map/statistics."""
     st.subheader("🗺️ Indian Railways Network Map")
     
-    all_trains = repo.get_all_trains()
-    all_stations = repo.get_all_stations()
+    # Per-snapshot counts; no need to load every record for the totals and charts
+    zone_data = repo.get_filter_values('stations', 'zone')
+    state_data = repo.get_filter_values('stations', 'state')
     
     st.markdown(f"""
     <div style="background: #f8f9fa; padding: 1.5rem; border-radius: 10px; margin-bottom: 1rem;">
         <div style="display: grid; grid-template-columns: 1fr 1fr 1fr 1fr; gap: 1rem;">
             <div style="text-align: center;">
-                <div style="font-size: 2rem; font-weight: bold; color: #667eea;">{len(all_trains)}</div>
+                <div style="font-size: 2rem; font-weight: bold; color: #667eea;">{repo.count_trains()}</div>
                 <div style="color: #666; font-weight: 500;">Total Trains</div>
             </div>
             <div style="text-align: center;">
-                <div style="font-size: 2rem; font-weight: bold; color: #667eea;">{len(all_stations)}</div>
+                <div style="font-size: 2rem; font-weight: bold; color: #667eea;">{repo.count_stations()}</div>
                 <div style="color: #666; font-weight: 500;">Total Stations</div>
             </div>
             <div style="text-align: center;">
-                <div style="font-size: 2rem; font-weight: bold; color: #667eea;">{len(set(s.get('state') for s in all_stations))}</div>
+                <div style="font-size: 2rem; font-weight: bold; color: #667eea;">{len(state_data)}</div>
                 <div style="color: #666; font-weight: 500;">States Covered</div>
             </div>
             <div style="text-align: center;">
-                <div style="font-size: 2rem; font-weight: bold; color: #667eea;">{len(set(s.get('zone') for s in all_stations))}</div>
+                <div style="font-size: 2rem; font-weight: bold; color: #667eea;">{len(zone_data)}</div>
                 <div style="color: #666; font-weight: 500;">Railway Zones</div>
             </div>
         </div>
@@ -367,20 +388,12 @@ def display_network_map(repo):
     
     # Zone-wise distribution
     st.markdown("### Zone-wise Distribution")
-    zone_data = {}
-    for station in all_stations:
-        zone = station.get('zone', 'Unknown')
-        zone_data[zone] = zone_data.get(zone, 0) + 1
     
     if zone_data:
         st.bar_chart(zone_data)
     
     # State-wise distribution
     st.markdown("### State-wise Station Distribution")
-    state_data = {}
-    for station in all_stations:
-        state = station.get('state', 'Unknown')
-        state_data[state] = state_data.get(state, 0) + 1
     
     if state_data:
         st.bar_chart(state_data)
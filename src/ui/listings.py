@@ -0,0 +1,89 @@
+"""
+Data behind the train and station directory views.
+
+The Streamlit views rerun top to bottom on every keystroke, so each helper
+here answers from the repository's indexes (prefix completions, per-snapshot
+filter counts, cursor pages) instead of loading every record and filtering
+it in the view. The module does not import Streamlit, so the queries can be
+tested directly; page cursors live in any dict-like session state.
+"""
+
+from typing import Dict, List, MutableMapping, Optional, Sequence, Tuple
+
+# Completions shown for a search box
+SEARCH_LIMIT = 50
+
+# Records shown per directory page
+TRAIN_PAGE_SIZE = 10
+STATION_PAGE_SIZE = 100
+
+
+def search_trains(repo, query: str, zones: Optional[Sequence[str]] = None,
+                  limit: int = SEARCH_LIMIT) -> List[Dict]:
+    """Train details completing a typed name or number, in the selected zones, best first."""
+    return repo.suggest(query, 'train', limit, zone=list(zones) if zones else None)
+
+
+def search_stations(repo, query: str, states: Optional[Sequence[str]] = None,
+                    station_types: Optional[Sequence[str]] = None,
+                    limit: int = SEARCH_LIMIT) -> List[Dict]:
+    """Station records completing a typed name or code, with the selected states and types, best first."""
+    return repo.suggest(query, 'station', limit,
+                        state=list(states) if states else None,
+                        station_type=list(station_types) if station_types else None)
+
+
+def filter_options(repo, kind: str, field: str) -> List[str]:
+    """Values offered by a 'trains' or 'stations' filter, from the snapshot's counts."""
+    return list(repo.get_filter_values(kind, field))
+
+
+def _page(query, cursor: Optional[str], limit: int, filters: Dict) -> Dict:
+    try:
+        return query(limit=limit, cursor=cursor, **filters)
+    except ValueError:
+        # Cursor from before a reload: start the listing over
+        return query(limit=limit, **filters)
+
+
+def train_page(repo, zones: Optional[Sequence[str]] = None, cursor: Optional[str] = None,
+               limit: int = TRAIN_PAGE_SIZE) -> Dict:
+    """One page of the train directory for the selected zones, with the 'total' they match."""
+    filters = {'zone': list(zones) if zones else None}
+    return {**_page(repo.query_trains, cursor, limit, filters), 'total': repo.count_trains(**filters)}
+
+
+def station_page(repo, states: Optional[Sequence[str]] = None,
+                 station_types: Optional[Sequence[str]] = None, cursor: Optional[str] = None,
+                 limit: int = STATION_PAGE_SIZE) -> Dict:
+    """One page of the station directory for the selected states and types, with the 'total'."""
+    filters = {'state': list(states) if states else None,
+               'station_type': list(station_types) if station_types else None}
+    return {**_page(repo.query_stations, cursor, limit, filters), 'total': repo.count_stations(**filters)}
+
+
+def train_choices(repo, query: str = '', limit: int = SEARCH_LIMIT) -> Dict[str, str]:
+    """'Name (number)' labels to train numbers for a picker: completions of query, else the first page."""
+    trains = search_trains(repo, query, limit=limit) if query.strip() else repo.query_trains(limit=limit)['items']
+    return {f"{train['train_name']} ({train['train_no']})": str(train['train_no']) for train in trains}
+
+
+def current_cursor(state: MutableMapping, key: str, filters: Tuple) -> Optional[str]:
+    """Cursor of the page shown for listing key; back to the first page when its filters change."""
+    if state.get(f"{key}_filters") != filters:
+        state[f"{key}_filters"] = filters
+        state[f"{key}_cursors"] = [None]
+    return state[f"{key}_cursors"][-1]
+
+
+def has_previous(state: MutableMapping, key: str) -> bool:
+    return len(state.get(f"{key}_cursors", ())) > 1
+
+
+def next_page(state: MutableMapping, key: str, cursor: str):
+    state[f"{key}_cursors"] = state[f"{key}_cursors"] + [cursor]
+
+
+def previous_page(state: MutableMapping, key: str):
+    if has_previous(state, key):
+        state[f"{key}_cursors"] = state[f"{key}_cursors"][:-1]
@@ -0,0 +1,52 @@
+"""
+Read-only dict and list types for records shared between callers.
+
+Repository rows (built once per data snapshot), mock fixtures and cached API
+responses are handed out to every caller without copying. Mutating a shared
+record raises TypeError; ``.copy()`` gives a private, writable dict or list.
+"""
+
+
+class FrozenDict(dict):
+    """Shared, read-only dict; ``copy()`` returns a plain writable dict."""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("shared records are read-only; copy() them to modify")
+
+    __setitem__ = __delitem__ = _readonly
+    clear = pop = popitem = setdefault = update = _readonly
+    __ior__ = _readonly
+
+    def __hash__(self):
+        return id(self)
+
+    def __reduce__(self):
+        # copy.deepcopy / pickle produce a plain, writable dict
+        return (dict, (dict(self),))
+
+
+class FrozenList(list):
+    """Shared, read-only list; ``copy()`` returns a plain writable list."""
+
+    def _readonly(self, *args, **kwargs):
+        raise TypeError("shared records are read-only; copy() them to modify")
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _readonly
+    append = extend = insert = pop = remove = clear = sort = reverse = _readonly
+
+    def __hash__(self):
+        return id(self)
+
+    def __reduce__(self):
+        return (list, (list(self),))
+
+
+def freeze(value):
+    """Recursively convert JSON-like data into shared read-only containers."""
+    if isinstance(value, (FrozenDict, FrozenList)):
+        return value  # already frozen all the way down
+    if isinstance(value, dict):
+        return FrozenDict((key, freeze(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return FrozenList(freeze(item) for item in value)
+    return value
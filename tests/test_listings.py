@@ -0,0 +1,90 @@
+"""Unit tests for the data behind the train and station directory views."""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.repositories.data_store import RailwayDataStore
+from src.repositories.train_repository import TrainRepository
+from src.ui import listings
+
+
+SCHEDULE_HEADER = "Train No,Train Name,SEQ,Station Code,Station Name,Arrival time,Departure Time,Distance\n"
+
+
+class TestDirectorySearch:
+    """Test the search boxes of the train and station directories."""
+
+    def test_filtered_train_search_fills_limit(self):
+        """Test zone filters are applied before the limit, so a filtered box is still full."""
+        repo = TrainRepository()
+        assert {train['zone'] for train in listings.search_trains(repo, 'express', limit=3)} != {'SCR'}
+
+        trains = listings.search_trains(repo, 'express', ['SCR'], limit=3)
+        assert len(trains) == 3 and {train['zone'] for train in trains} == {'SCR'}
+        # Train details, not bare suggestions
+        assert 'coach_breakdown' in trains[0]
+
+    def test_station_search_returns_filtered_records(self):
+        """Test station completions come back as full records with the state filter applied."""
+        repo = TrainRepository()
+        stations = listings.search_stations(repo, 'j', ['Rajasthan'])
+        assert [station['station_code'] for station in stations] == ['JP', 'JU', 'KJ']
+        assert all('platform_count' in station for station in stations)
+        assert listings.search_stations(repo, 'j', ['Rajasthan'], ['Major Station']) == []
+
+    def test_schedule_only_entries_resolve(self, tmp_path):
+        """Test trains and stations known only from the schedule are offered with their name."""
+        (tmp_path / "Train_details_22122017.csv").write_text(
+            SCHEDULE_HEADER + "107,SWV-MAO-VLNK,1,SWV,SAWANTWADI R,00:00:00,10:25:00,0\n", encoding='utf-8')
+        repo = TrainRepository(store=RailwayDataStore(tmp_path))
+
+        assert listings.search_trains(repo, 'swv') == [{'train_no': '107', 'train_name': 'SWV-MAO-VLNK'}]
+        assert listings.search_trains(repo, 'swv', ['NR']) == []
+        assert listings.search_stations(repo, 'sawantwadi')[0]['station_code'] == 'SWV'
+
+
+class TestDirectoryPages:
+    """Test the paged directory listings and their filter options and totals."""
+
+    def test_options_and_totals_match_a_scan(self):
+        """Test per-snapshot filter values and counts agree with filtering every record."""
+        repo = TrainRepository()
+        stations = repo.get_all_stations()
+        assert listings.filter_options(repo, 'stations', 'state') == sorted({s['state'] for s in stations})
+        assert repo.get_filter_values('trains', 'zone')['NR'] == sum(
+            train['zone'] == 'NR' for train in repo.get_all_trains())
+
+        page = listings.station_page(repo, ['Rajasthan', 'maharashtra'], ['Major Junction'], limit=2)
+        expected = [s for s in stations if s['state'] in ('Rajasthan', 'Maharashtra')
+                    and s['station_type'] == 'Major Junction']
+        assert page['total'] == len(expected) > 2
+        assert page['items'] == expected[:2] and page['has_more']
+        # Non-indexed filters still count correctly
+        assert repo.count_trains(zone='NR', min_distance=1000) == sum(
+            1 for _ in repo.iter_trains(zone='NR', min_distance=1000))
+
+    def test_cursors_walk_every_page_and_reset_on_filter_change(self):
+        """Test Previous / Next cursor state pages through a listing and restarts for new filters."""
+        repo = TrainRepository()
+        state = {}
+        seen = []
+        while True:
+            cursor = listings.current_cursor(state, 'stations', ((), ()))
+            page = listings.station_page(repo, cursor=cursor, limit=25)
+            seen += [station['station_code'] for station in page['items']]
+            if not page['has_more']:
+                break
+            listings.next_page(state, 'stations', page['next_cursor'])
+        assert seen == [station['station_code'] for station in repo.get_all_stations()]
+
+        listings.previous_page(state, 'stations')
+        assert listings.has_previous(state, 'stations')
+        assert listings.current_cursor(state, 'stations', (('Delhi',), ())) is None
+        assert not listings.has_previous(state, 'stations')
+
+    def test_train_choices_map_labels_to_numbers(self):
+        """Test the coach picker offers completions of the typed text, or the first page."""
+        repo = TrainRepository()
+        choices = listings.train_choices(repo, '12951')
+        assert list(choices.values()) == ['12951']
+        assert len(listings.train_choices(repo, limit=5)) == 5
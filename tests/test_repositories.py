@@ -0,0 +1,426 @@
+"""Unit tests for the repository layer: data snapshots, indexes and queries."""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+import pytest
+from src.repositories.train_repository import TrainRepository
+from src.repositories.schedule_snapshot import read_schedule_csv
+from src.repositories.route_index import RouteIndex
+from src.repositories.data_store import RailwayData, RailwayDataStore
+from src.repositories import schedule_mmap
+from src.repositories.schedule_mmap import open_mapped_schedule
+from src.repositories.suggest_index import SuggestIndex
+
+
+class TestTrainRepositoryIndexes:
+    """Test the repository's load-time indexes."""
+
+    def test_lookups_match_dataframe_scans(self):
+        """Test indexed lookups return the same rows as the old DataFrame filters, any key case."""
+        repo = TrainRepository()
+        trains = repo.trains_df
+        expected = trains[(trains['from_code'] == 'NDLS') & (trains['to_code'] == 'BCT')].to_dict('records')
+        between = repo.get_trains_between_stations('ndls', 'Bct')
+        assert [{key: train[key] for key in expected[0]} for train in between] == expected
+        assert between[0]['number'] == '12301' and between[0]['travel_time'] == '16:30'
+        assert repo.get_trains_from_station('ndls') == trains[trains['from_code'] == 'NDLS'].to_dict('records')
+        assert repo.get_station_by_code('ndls')['station_name'] == 'New Delhi'
+        assert repo.get_stations_by_zone('nr') == repo.get_stations_by_zone('NR') != []
+        assert repo.get_train_details(' 12301 ')['coach_breakdown']['AC2'] == 9
+
+    def test_records_are_shared_and_read_only(self):
+        """Test lookups hand out the same preallocated record, which cannot be modified."""
+        repo = TrainRepository()
+        station = repo.get_station_by_code('NDLS')
+        assert station is repo.get_station_by_code('ndls')
+        with pytest.raises(TypeError):
+            station['station_name'] = 'Changed'
+        assert station.copy() is not station
+
+    def test_station_search_covers_schedule_and_ranks_substrings_first(self, tmp_path):
+        """Test schedule-only stations are searchable and literal matches precede alias matches."""
+        (tmp_path / "indian_stations.csv").write_text(
+            "station_code,station_name,station_type,state,platform_count,zone\n"
+            "BCT,Bombay Central,Terminal,Maharashtra,9,WR\n"
+            "CSMT,Mumbai CSMT,Terminal,Maharashtra,18,CR\n", encoding='utf-8')
+        (tmp_path / "Train_details_22122017.csv").write_text(
+            TestScheduleCSV.HEADER + "107,SWV-MAO-VLNK,1,SWV,SAWANTWADI R,00:00:00,10:25:00,0\n",
+            encoding='utf-8')
+        repo = TrainRepository(store=RailwayDataStore(tmp_path))
+
+        # 'mumbai' is an alias of BCT, whose name does not contain it
+        assert [s['station_code'] for s in repo.search_stations('mumbai')] == ['CSMT', 'BCT']
+        assert repo.search_stations('sawant') == [{'station_code': 'SWV', 'station_name': 'SAWANTWADI R'}]
+        assert repo.search_stations('mumbai', limit=1)[0]['station_code'] == 'CSMT'
+
+    def test_searches_keep_the_substring_contract(self):
+        """Test a blank query lists every record and mid-word matches follow the prefix matches."""
+        repo = TrainRepository()
+        assert repo.search_stations('') == repo.get_all_stations()
+        assert repo.search_trains_by_name('  ') == repo.get_all_trains()
+
+        trains = repo.trains_df
+        contains = set(trains[trains['train_name'].str.lower().str.contains('xpress')]['train_no'])
+        found = repo.search_trains_by_name('xpress')
+        assert {train['train_no'] for train in found} == contains and len(found) == len(contains)
+        prefixed = repo.search_trains_by_name('rajdhani')
+        assert prefixed and all('rajdhani' in train['train_name'].lower() for train in prefixed)
+        assert repo.search_stations('elhi')[0]['station_name'].lower().endswith('delhi')
+
+
+class TestScheduleCSV:
+    """Test the typed schedule CSV parse."""
+
+    HEADER = "Train No,Train Name,SEQ,Station Code,Station Name,Arrival time,Departure Time,Distance\n"
+
+    def _write(self, path, rows):
+        path.write_text(self.HEADER + "".join(rows), encoding='utf-8')
+
+    def test_typed_parse(self, tmp_path):
+        """Test the CSV is read with compact dtypes and minute-of-day time columns."""
+        csv_path = tmp_path / "Train_details_22122017.csv"
+        self._write(csv_path, ["107,SWV-MAO-VLNK,1,SWV,SAWANTWADI R,00:00:00,10:25:00,0\n",
+                               "107,SWV-MAO-VLNK,2,THVM,THIVIM,11:06:00,11:08:00,32\n"])
+
+        df = read_schedule_csv(csv_path)
+        assert str(df['Station Code'].dtype) == 'category'
+        assert str(df['Train No'].dtype) == 'int32' and str(df['Distance'].dtype) == 'float32'
+        assert list(df['departure_min']) == [625, 668]
+        assert list(df['arrival_min']) == [0, 666]
+
+
+class TestRouteIndex:
+    """Test per-train route slices over the schedule columns."""
+
+    def test_routes_are_seq_ordered_and_deduplicated(self):
+        """Test a train's stops come back in SEQ order, with repeated stations listed once."""
+        df = pd.DataFrame({
+            'Train No': [202, 101, 101, 202, 101],
+            'SEQ': [1, 3, 1, 2, 2],
+            'Station Code': pd.Categorical(['NDLS', 'BCT', 'NDLS', 'JP', 'NDLS']),
+            'Station Name': pd.Categorical(['New Delhi', 'Mumbai Central', 'New Delhi', 'Jaipur', 'New Delhi']),
+            'Distance': [0.0, 1386.0, 0.0, 262.0, 5.0],
+        })
+        routes = RouteIndex(df)
+
+        assert [stop['SEQ'] for stop in routes.records('101')] == [1, 2, 3]
+        assert list(routes.route_arrays(202)['Station Code']) == ['NDLS', 'JP']
+        assert routes.stops(101) == ['New Delhi (NDLS)', 'Mumbai Central (BCT)']
+        assert routes.records(101) is routes.records(101)
+        assert routes.records(999) == [] and 999 not in routes
+
+
+class TestRailwayDataStore:
+    """Test the shared data store and its snapshot swap."""
+
+    def test_repositories_share_one_load(self):
+        """Test every repository borrows the process-wide snapshot instead of reloading."""
+        first, second = TrainRepository(), TrainRepository()
+        assert first.data is second.data
+        assert first.get_station_by_code('NDLS') is second.get_station_by_code('NDLS')
+
+    def test_reload_swaps_atomically(self, tmp_path):
+        """Test a reload installs a new snapshot while readers of the old one keep a consistent view."""
+        stations = tmp_path / "indian_stations.csv"
+        stations.write_text("station_code,station_name,station_type,state,platform_count,zone\n"
+                            "NDLS,New Delhi,Major Junction,Delhi,16,NR\n", encoding='utf-8')
+        store = RailwayDataStore(tmp_path)
+        repo = TrainRepository(store=store)
+        before = repo.data
+
+        stations.write_text(stations.read_text(encoding='utf-8') + "JP,Jaipur,Junction,Rajasthan,8,NWR\n",
+                            encoding='utf-8')
+        repo.reload()
+
+        assert len(before.stations) == 1 and before.stations_by_code.get('JP') is None
+        assert repo.get_station_by_code('jp')['station_name'] == 'Jaipur'
+        assert store.get_stats()['version'] == before.version + 1
+
+
+def _locked_rmtree(path, ignore_errors=False):
+    if not ignore_errors:
+        raise PermissionError(f"[WinError 32] file in use: {path}")
+
+
+class TestMappedSchedule:
+    """Test the memory-mapped schedule layout."""
+
+    ROWS = ["12951,MUMBAI RAJDHANI,2,BRC,VADODARA JN,21:00:00,21:10:00,392\n",
+            "12951,MUMBAI RAJDHANI,1,BCT,MUMBAI CENTRAL,00:00:00,17:00:00,0\n",
+            "107,SWV-MAO-VLNK,1,SWV,SAWANTWADI R,00:00:00,10:25:00,0\n"]
+
+    def test_matches_in_memory_index(self, tmp_path):
+        """Test mapped routes return exactly what the in-memory route index returns."""
+        csv_path = tmp_path / "Train_details_22122017.csv"
+        csv_path.write_text(TestScheduleCSV.HEADER + "".join(self.ROWS), encoding='utf-8')
+
+        mapped = open_mapped_schedule(csv_path)
+        routes = RouteIndex(read_schedule_csv(csv_path))
+        assert isinstance(mapped.rows, np.memmap)
+        assert list(mapped.records(12951)) == list(routes.records(12951))
+        assert mapped.stops('12951') == ['MUMBAI CENTRAL (BCT)', 'VADODARA JN (BRC)']
+        assert 107 in mapped and 999 not in mapped
+
+    def test_rebuilt_when_csv_changes(self, tmp_path):
+        """Test a changed CSV publishes a new build and reopening an unchanged one reuses it."""
+        csv_path = tmp_path / "Train_details_22122017.csv"
+        csv_path.write_text(TestScheduleCSV.HEADER + "".join(self.ROWS), encoding='utf-8')
+        first = open_mapped_schedule(csv_path)
+        assert open_mapped_schedule(csv_path).directory == first.directory
+
+        csv_path.write_text(TestScheduleCSV.HEADER + self.ROWS[2], encoding='utf-8')
+        second = open_mapped_schedule(csv_path)
+        assert second.directory != first.directory
+        assert len(second) == 1
+        # The previous build stays for workers that still map it
+        assert first.directory.exists()
+
+        csv_path.write_text(TestScheduleCSV.HEADER + self.ROWS[0], encoding='utf-8')
+        third = open_mapped_schedule(csv_path)
+        assert not first.directory.exists() and second.directory.exists()
+        # Gone from disk, but the old mapping still reads
+        assert first.records(107)[0]['Station Code'] == 'SWV'
+        assert third.records(12951)[0]['Station Code'] == 'BRC'
+
+    def test_locked_build_logged_and_retried(self, tmp_path, monkeypatch, capsys):
+        """Test a build that cannot be removed yet (mapped on Windows) is reported and pruned later."""
+        csv_path = tmp_path / "Train_details_22122017.csv"
+        builds = []
+        for rows in (self.ROWS, self.ROWS[:1], self.ROWS[1:2]):
+            csv_path.write_text(TestScheduleCSV.HEADER + "".join(rows), encoding='utf-8')
+            if len(builds) == 2:
+                monkeypatch.setattr(schedule_mmap.shutil, 'rmtree', _locked_rmtree)
+            builds.append(open_mapped_schedule(csv_path).directory)
+
+        assert builds[0].exists()
+        assert "Could not remove old schedule build" in capsys.readouterr().out
+
+        monkeypatch.undo()
+        csv_path.write_text(TestScheduleCSV.HEADER + self.ROWS[2], encoding='utf-8')
+        open_mapped_schedule(csv_path)
+        assert not builds[0].exists() and not builds[1].exists()
+
+    def test_failed_and_abandoned_staging_removed(self, tmp_path, monkeypatch):
+        """Test a failed build leaves no staging and a dead worker's old staging is cleared."""
+        csv_path = tmp_path / "Train_details_22122017.csv"
+        csv_path.write_text(TestScheduleCSV.HEADER + "".join(self.ROWS), encoding='utf-8')
+        root = schedule_mmap.default_root(csv_path)
+        abandoned, in_progress = root / "0123456789abcdef.4242.tmp", root / "fedcba9876543210.4343.tmp"
+        for staging in (abandoned, in_progress):
+            staging.mkdir(parents=True)
+            (staging / "stops.npy").write_bytes(b"partial")
+        old = abandoned.stat().st_mtime - schedule_mmap.STALE_STAGING_S - 60
+        os.utime(abandoned, (old, old))
+
+        def crash(df, directory, source):
+            directory.mkdir(parents=True)
+            (directory / "stops.npy").write_bytes(b"partial")
+            raise MemoryError("killed mid-build")
+
+        monkeypatch.setattr(schedule_mmap, 'build_mapped_schedule', crash)
+        with pytest.raises(MemoryError):
+            open_mapped_schedule(csv_path)
+        assert sorted(path.name for path in root.glob('*.tmp')) == [in_progress.name]
+
+        monkeypatch.undo()
+        assert 12951 in open_mapped_schedule(csv_path)
+
+
+class TestStopIndex:
+    """Test the station -> trains postings and the A-before-B merge."""
+
+    ROWS = TestMappedSchedule.ROWS + [
+        "22209,MUMBAI DURONTO,1,NDLS,NEW DELHI,00:00:00,23:25:00,0\n",
+        "22209,MUMBAI DURONTO,2,BRC,VADODARA JN,09:30:00,09:40:00,990\n",
+        "22209,MUMBAI DURONTO,3,BCT,MUMBAI CENTRAL,15:55:00,00:00:00,1384\n",
+    ]
+
+    def test_only_trains_calling_in_order(self, tmp_path):
+        """Test only trains reaching B after A match, with the segment's times and distance."""
+        csv_path = tmp_path / "Train_details_22122017.csv"
+        csv_path.write_text(TestScheduleCSV.HEADER + "".join(self.ROWS), encoding='utf-8')
+        repo = TrainRepository(store=RailwayDataStore(tmp_path))
+
+        segments = repo.get_trains_between_stations('bct', 'BRC')
+        assert [segment['train_no'] for segment in segments] == ['12951']
+        assert segments[0]['departure_time'] == '17:00' and segments[0]['arrival_time'] == '21:00'
+        assert segments[0]['duration_min'] == 240 and segments[0]['distance_km'] == 392.0
+
+        # Overnight segment: duration wraps past midnight
+        overnight = repo.get_trains_between_stations('NDLS', 'BRC')[0]
+        assert overnight['train_name'] == 'MUMBAI DURONTO' and overnight['travel_time'] == '10:05'
+        assert repo.get_trains_between_stations('BRC', 'NDLS') == []
+        assert repo.get_trains_between_stations('SWV', 'XXX') == []
+
+    def test_between_stations_merges_schedule_and_train_table(self, tmp_path):
+        """Test intermediate-stop trains carry the table's details and end-to-end table trains are kept."""
+        csv_path = tmp_path / "Train_details_22122017.csv"
+        csv_path.write_text(TestScheduleCSV.HEADER + "".join(self.ROWS), encoding='utf-8')
+        (tmp_path / "trains_with_coaches.csv").write_text(
+            "train_no,train_name,from_station,to_station,from_code,to_code,departure_time,arrival_time,"
+            "duration_hrs,distance_km,coach_count,zone\n"
+            "22209,Mumbai Duronto,New Delhi,Mumbai Central,NDLS,BCT,23:25,15:55,16.5,1384,18,CR\n"
+            "12953,August Kranti,Mumbai Central,Vadodara,BCT,BRC,17:40,22:00,4.33,392,20,WR\n",
+            encoding='utf-8')
+        repo = TrainRepository(store=RailwayDataStore(tmp_path))
+
+        duronto = repo.get_trains_between_stations('NDLS', 'BRC')[0]
+        assert duronto['zone'] == 'CR' and duronto['coach_count'] == 18
+        assert (duronto['to_code'], duronto['arrival_time'], duronto['distance_km']) == ('BRC', '09:30', 990.0)
+
+        trains = repo.get_trains_between_stations('BCT', 'BRC')
+        assert [str(train['train_no']) for train in trains] == ['12951', '12953']
+        assert trains[1]['src_departure_time'] == '17:40' and trains[1]['travel_time'] == '04:20'
+        assert len(repo.get_trains_between_stations('BCT', 'BRC', limit=1)) == 1
+
+    def test_mapped_and_in_memory_agree(self, tmp_path):
+        """Test the mapped layout and the in-memory route index build the same postings."""
+        csv_path = tmp_path / "Train_details_22122017.csv"
+        csv_path.write_text(TestScheduleCSV.HEADER + "".join(self.ROWS), encoding='utf-8')
+        mapped = open_mapped_schedule(csv_path).stop_index()
+        in_memory = RouteIndex(read_schedule_csv(csv_path)).stop_index()
+
+        for a, b in (('BRC', 'BCT'), ('BCT', 'BRC'), ('NDLS', 'BCT')):
+            (mapped_a, mapped_b), (memory_a, memory_b) = mapped.between(a, b), in_memory.between(a, b)
+            assert mapped.train[mapped_a].tolist() == in_memory.train[memory_a].tolist()
+            assert mapped.arrival_min[mapped_b].tolist() == in_memory.arrival_min[memory_b].tolist()
+        assert sorted(mapped.trains_at('BCT').tolist()) == [12951, 22209]
+
+
+class TestJourneyPlanner:
+    """Test the round-based connection planner over the local timetable."""
+
+    # JU -> AII -> MAS with a change, or a slower overnight direct train
+    ROWS = ["101,JODHPUR EXP,1,JU,JODHPUR JN,00:00:00,08:00:00,0\n",
+            "101,JODHPUR EXP,2,AII,AJMER JN,12:00:00,12:10:00,300\n",
+            "202,AJMER MAIL,1,AII,AJMER JN,00:00:00,13:00:00,0\n",
+            "202,AJMER MAIL,2,MAS,CHENNAI CENTRAL,23:30:00,00:00:00,900\n",
+            "303,JU MAS SF,1,JU,JODHPUR JN,00:00:00,22:00:00,0\n",
+            "303,JU MAS SF,2,MAS,CHENNAI CENTRAL,09:00:00,00:00:00,50\n"]
+
+    def _repository(self, tmp_path):
+        csv_path = tmp_path / "Train_details_22122017.csv"
+        csv_path.write_text(TestScheduleCSV.HEADER + "".join(self.ROWS), encoding='utf-8')
+        return TrainRepository(store=RailwayDataStore(tmp_path))
+
+    def test_pareto_journeys_with_one_change(self, tmp_path):
+        """Test a connecting journey is offered next to a later direct train that arrives after it."""
+        journeys = self._repository(tmp_path).plan_journeys('JU', 'MAS', min_transfer_minutes=30)
+
+        assert [(j['departure_time'], j['transfers']) for j in journeys] == [('08:00', 1), ('22:00', 0)]
+        connection, direct = journeys
+        assert [leg['train_no'] for leg in connection['legs']] == ['101', '202']
+        assert connection['legs'][1]['from_code'] == 'AII' and connection['duration_min'] == 930
+        assert direct['arrival_day'] == 1 and direct['duration_min'] == 660
+
+    def test_transfer_limits(self, tmp_path):
+        """Test max transfers, the minimum change time and the departure window are honoured."""
+        repo = self._repository(tmp_path)
+        assert [j['transfers'] for j in repo.plan_journeys('JU', 'MAS', max_transfers=0)] == [0]
+        assert repo.plan_journeys('JU', 'MAS', depart_before='12:00', max_transfers=0) == []
+
+        # 70 minutes at Ajmer misses the 13:00 and waits a day for the next one
+        late = repo.plan_journeys('JU', 'MAS', depart_before='12:00', min_transfer_minutes=70)
+        assert late[0]['legs'][1]['departure_day'] == 1 and late[0]['arrival_day'] == 1
+
+
+class TestSuggestIndex:
+    """Test prefix autocomplete over stations and trains."""
+
+    def _index(self):
+        return SuggestIndex(
+            stations=[('BCT', 'Mumbai Central', 18), ('CSMT', 'Chhatrapati Shivaji Maharaj Terminus', 18),
+                      ('MAS', 'Chennai Central', 17), ('MMCT', 'Mumbai Mmct', 0)],
+            trains=[('12951', 'Mumbai Rajdhani', 21), ('12301', 'Rajdhani Express', 18),
+                    ('12302', 'New Delhi Rajdhani', 18)],
+        )
+
+    def test_ranked_completions(self):
+        """Test name prefixes rank by importance, word matches follow and exact codes come first."""
+        index = self._index()
+        assert [s['code'] for s in index.suggest('mum', 'station')] == ['BCT', 'MMCT']
+        assert [s['code'] for s in index.suggest('central', 'station')] == ['BCT', 'MAS']
+        assert [s['code'] for s in index.suggest('shivaji mah', 'station')] == ['CSMT']
+        assert index.suggest('mmct')[0] == {'code': 'MMCT', 'name': 'Mumbai Mmct', 'kind': 'station'}
+
+        trains = index.suggest('raj', 'train', limit=2)
+        assert [t['train_no'] for t in trains] == ['12301', '12951']
+        # Equally important trains fall back to name order
+        assert [t['train_no'] for t in index.suggest('1230', 'train')] == ['12302', '12301']
+
+    def test_incremental_and_mixed_kinds(self):
+        """Test narrowing and then changing a query matches fresh lookups, across both kinds."""
+        index = self._index()
+        fresh = [s['code'] for s in self._index().suggest('c', 'station')]
+        for query in ('m', 'mu', 'mumbai', 'mumbai c'):
+            index.suggest(query, 'station')
+        assert [s['code'] for s in index.suggest('c', 'station')] == fresh
+
+        mixed = index.suggest('mumbai')
+        assert {s['kind'] for s in mixed} == {'station', 'train'}
+        assert index.suggest('', limit=5) == [] and index.suggest('mum', 'bogus') == []
+
+    def test_rejected_completions_do_not_use_the_limit(self):
+        """Test completions the caller rejects are skipped and the limit filled from the rest."""
+        index = self._index()
+        accepted = index.suggest('mum', 'station', limit=1, accept=lambda item: item['code'] != 'BCT')
+        assert [s['code'] for s in accepted] == ['MMCT']
+
+        repo = TrainRepository()
+        scanned = {train['train_no'] for train in repo.get_all_trains() if 'rajdhani' in train['train_name'].lower()}
+        assert {train['train_no'] for train in repo.search_trains_by_name('rajdhani')} == scanned
+        assert repo.suggest('ndls', 'station')[0] is repo.get_station_by_code('NDLS')
+
+
+class TestPaginatedQueries:
+    """Test paginated, filtered and streaming repository listings."""
+
+    def test_cursor_pages_cover_sorted_listing(self):
+        """Test following cursors walks the sorted listing exactly once, as the generator yields it."""
+        repo = TrainRepository()
+        pages = [repo.query_trains(limit=7, sort_by='distance_km', descending=True)]
+        while pages[-1]['has_more']:
+            pages.append(repo.query_trains(limit=7, cursor=pages[-1]['next_cursor'],
+                                           sort_by='distance_km', descending=True))
+
+        walked = [train['train_no'] for p in pages for train in p['items']]
+        streamed = [train['train_no'] for train in repo.iter_trains(sort_by='distance_km', descending=True)]
+        assert walked == streamed and len(walked) == len(repo.get_all_trains())
+        distances = [train['distance_km'] for p in pages for train in p['items']]
+        assert distances == sorted(distances, reverse=True)
+        assert repo.query_trains(limit=7, offset=7, sort_by='distance_km', descending=True)['items'] == pages[1]['items']
+
+    def test_filters_and_stale_cursor(self, tmp_path):
+        """Test zone/type/distance/state filters, and that a cursor from before a reload is refused."""
+        repo = TrainRepository()
+        rajdhanis = list(repo.iter_trains(train_type='rajdhani', min_distance=1400, max_distance=1500))
+        assert rajdhanis and all('Rajdhani' in t['train_name'] and 1400 <= t['distance_km'] <= 1500
+                                 for t in rajdhanis)
+        assert all(t['zone'] == 'NR' for t in repo.iter_trains(zone=['nr']))
+        assert {s['state'] for s in repo.query_stations(limit=50, state='rajasthan')['items']} == {'Rajasthan'}
+
+        (tmp_path / "indian_stations.csv").write_text(
+            "station_code,station_name,station_type,state,platform_count,zone\n"
+            "NDLS,New Delhi,Major Junction,Delhi,16,NR\nJP,Jaipur,Junction,Rajasthan,8,NWR\n", encoding='utf-8')
+        local = TrainRepository(store=RailwayDataStore(tmp_path))
+        cursor = local.query_stations(limit=1)['next_cursor']
+        assert local.query_stations(limit=1, cursor=cursor)['items'][0]['station_code'] == 'JP'
+        local.reload()
+        with pytest.raises(ValueError):
+            local.query_stations(limit=1, cursor=cursor)
+
+    def test_sort_on_mixed_type_column(self):
+        """Test a column mixing numbers and text sorts numbers first, then text, then missing values."""
+        store = RailwayDataStore()
+        store.swap(RailwayData(stations_df=pd.DataFrame({
+            'station_code': ['A', 'B', 'C', 'D', 'E'],
+            'platform_count': [3, 'NA', None, 1.5, '10'],
+        })))
+        repo = TrainRepository(store=store)
+
+        listing = [s['station_code'] for s in repo.iter_stations(sort_by='platform_count')]
+        assert listing == ['D', 'A', 'E', 'B', 'C']
+        assert repo.query_stations(limit=2, sort_by='platform_count', descending=True)['items'][0]['station_code'] == 'B'
@@ -0,0 +1,838 @@
+"""Unit tests for the scheduling API client layer."""
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import json
+import threading
+import time
+import asyncio
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+import requests
+from src.scheduling.http_transport import PooledTransport
+from src.scheduling.ntes_session import NTESSession
+from src.scheduling.indian_railways_api import IndianRailwaysAPI
+from src.scheduling.async_api import AsyncIndianRailwaysAPI
+from src.scheduling.response_cache import ResponseCache
+from src.scheduling.single_flight import SingleFlight
+from src.scheduling.provider_slots import ProviderSlots
+from src.scheduling.provider_health import CircuitState, ProviderRouter
+from src.scheduling.hedging import HedgeBudget, Hedger
+from src.scheduling.ntes_parser import parse_ntes_running_status
+from src.scheduling.ntes_events import EventCursorStore
+from src.scheduling.station_index import StationIndex
+from src.scheduling.rate_limiter import Priority, RateLimiter, SQLiteBucketStore, parse_retry_after
+from src.scheduling.replay import FixtureStore, fixture_key, record_transport, replay_transport
+from src.scheduling.mock_data import MockDataStore
+from src.scheduling.prefetch import DemandTracker, PrefetchScheduler
+from src.scheduling.json_stream import iter_json_array, iter_json_events
+from src.scheduling.metrics import LatencyHistogram, MetricsRegistry, endpoint_label, start_metrics_server
+
+
+class _JSONHandler(BaseHTTPRequestHandler):
+    """Tiny keep-alive JSON endpoint used instead of the real providers."""
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        payload = {'status': 'success', 'path': self.path}
+        if self.path.startswith('/between/'):
+            payload['trains'] = [{'number': str(12000 + i), 'name': f'Train {i}'} for i in range(200)]
+        if self.path.startswith('/trains/12951/schedule'):
+            payload['stations'] = [{'stationCode': 'BCT'}, {'stationCode': 'NDLS'}]
+        body = json.dumps(payload).encode()
+        self.send_response(429 if self.path.startswith('/throttled') else 200)
+        if self.path.startswith('/throttled'):
+            self.send_header('Retry-After', '30')
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class _NTESHandler(BaseHTTPRequestHandler):
+    """Fake NTES: bootstrap cookie, CSRF token endpoint and the running-status POST."""
+    protocol_version = "HTTP/1.1"
+    token = "tok-1"
+    session_id = "abc"
+    hits = []
+
+    def _reply(self, status, body, cookie=None):
+        body = body.encode()
+        self.send_response(status)
+        if cookie:
+            self.send_header('Set-Cookie', cookie)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self.hits.append(self.path.split('?')[0])
+        if self.path.startswith('/mntes/GetCSRFToken'):
+            self._reply(200, f"<input name='csrfKey' value='{type(self).token}'>")
+        else:
+            self._reply(200, "<html>NTES</html>", cookie=f"JSESSIONID={type(self).session_id}; Path=/")
+
+    def do_POST(self):
+        self.hits.append(self.path.split('?')[0])
+        form = self.rfile.read(int(self.headers['Content-Length'])).decode()
+        session_cookie = f"JSESSIONID={type(self).session_id}"
+        if f"csrfKey={type(self).token}" not in form or session_cookie not in self.headers.get('Cookie', ''):
+            self._reply(403, "Invalid CSRF token")
+        else:
+            self._reply(200, "Train Running Status: Departed from Jaipur (JP)")
+
+    def log_message(self, *args):
+        pass
+
+
+def _serve(handler):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+@pytest.fixture
+def local_server():
+    server, url = _serve(_JSONHandler)
+    yield url
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def ntes_server():
+    _NTESHandler.hits = []
+    _NTESHandler.token = "tok-1"
+    _NTESHandler.session_id = "abc"
+    server, url = _serve(_NTESHandler)
+    yield url + "/mntes"
+    server.shutdown()
+    server.server_close()
+
+
+class TestPooledTransport:
+    """Test keep-alive pooled transport."""
+
+    def test_connections_are_reused(self, local_server):
+        """Test repeated requests reuse one pooled connection."""
+        transport = PooledTransport(pool_size=2, connect_timeout=1, read_timeout=2)
+        for _ in range(5):
+            response = transport.get('local', f"{local_server}/ping")
+            assert response.status_code == 200
+
+        stats = transport.get_stats()
+        assert stats['providers']['local']['requests'] == 5
+        assert stats['providers']['local']['connections_opened'] == 1
+        assert stats['hit_rate'] == pytest.approx(0.8)
+        assert stats['timeout'] == {'connect': 1, 'read': 2}
+        transport.close()
+
+    def test_api_clients_share_transport(self):
+        """Test every client uses the process-wide transport by default."""
+        assert IndianRailwaysAPI().transport is IndianRailwaysAPI().transport
+
+    def test_make_request_goes_through_transport(self, local_server):
+        """Test _make_request routes through the pooled session."""
+        transport = PooledTransport()
+        api = IndianRailwaysAPI(transport=transport)
+        api.apis[api.current_api]['base_url'] = local_server
+        data = api._make_request("/live/train/12301/")
+        assert data['path'] == "/live/train/12301/"
+        assert transport.get_stats()['providers'][api.current_api]['requests'] == 1
+        transport.close()
+
+
+class TestNTESSession:
+    """Test the long-lived NTES session."""
+
+    def test_token_reused_across_trains(self, ntes_server):
+        """Test only the first fetch pays the bootstrap and token round-trips."""
+        session = NTESSession(transport=PooledTransport(), base_url=ntes_server)
+        for train_no in (12301, 12302, 12951):
+            assert "Departed" in session.fetch_running_status(train_no)
+
+        assert _NTESHandler.hits == ['/mntes/', '/mntes/GetCSRFToken',
+                                     '/mntes/tr', '/mntes/tr', '/mntes/tr']
+        assert session.stats['posts'] == 3
+
+    def test_rejected_token_refreshed_transparently(self, ntes_server):
+        """Test a rejected token is refreshed and the POST retried once."""
+        session = NTESSession(transport=PooledTransport(), base_url=ntes_server)
+        session.fetch_running_status(12301)
+        _NTESHandler.token = "tok-2"
+
+        assert "Departed" in session.fetch_running_status(12302)
+        assert session.stats['rejections'] == 1
+        assert session.stats['token_refreshes'] == 2
+        assert session.stats['bootstraps'] == 1
+
+    def test_expired_session_bootstrapped_again(self, ntes_server):
+        """Test a session still rejected after a token refresh drops its cookies and re-bootstraps."""
+        session = NTESSession(transport=PooledTransport(), base_url=ntes_server)
+        session.fetch_running_status(12301)
+        _NTESHandler.token, _NTESHandler.session_id = "tok-2", "def"
+
+        assert "Departed" in session.fetch_running_status(12302)
+        assert session.stats['rejections'] == 2
+        assert session.stats['bootstraps'] == 2
+        assert session.session.cookies.get('JSESSIONID') == "def"
+
+
+class _SlowAPI:
+    """Stand-in client whose live-status call blocks like a network round-trip."""
+    current_api = 'rapidapi_journey'
+
+    def __init__(self):
+        self.in_flight = 0
+        self.peak = 0
+        self.lock = threading.Lock()
+
+    def get_live_train_status(self, train_no, date=None):
+        with self.lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        time.sleep(0.05)
+        with self.lock:
+            self.in_flight -= 1
+        if train_no == "00000":
+            raise RuntimeError("boom")
+        return {'train_no': train_no}
+
+
+class TestAsyncClient:
+    """Test the asyncio client fan-out."""
+
+    def test_gather_is_concurrent_and_bounded(self):
+        """Test a board of trains refreshes concurrently within the provider limit."""
+        api = _SlowAPI()
+        client = AsyncIndianRailwaysAPI(api, concurrency={'ntes': 5}, single_flight=SingleFlight())
+        train_nos = [str(12000 + i) for i in range(20)] + ["00000"]
+
+        start = time.perf_counter()
+        results = asyncio.run(client.gather_live_status(train_nos))
+        elapsed = time.perf_counter() - start
+        client.close()
+
+        assert api.peak == 5
+        assert elapsed < 0.05 * len(train_nos) / 2
+        assert results["12000"] == {'train_no': "12000"}
+        assert results["00000"] is None
+
+    def test_client_reused_across_event_loops(self):
+        """Test one client keeps working when each board refresh runs its own event loop."""
+        api = _SlowAPI()
+        client = AsyncIndianRailwaysAPI(api, concurrency={'ntes': 2}, single_flight=SingleFlight())
+        train_nos = [str(12000 + i) for i in range(6)]
+        for _ in range(2):
+            results = asyncio.run(client.gather_live_status(train_nos))
+            assert all(results[train_no] == {'train_no': train_no} for train_no in train_nos)
+        client.close()
+        assert api.peak == 2
+
+    def test_slot_taken_for_provider_that_answered(self, local_server):
+        """Test a fallback request is counted against the provider that served it."""
+        slots = ProviderSlots({'rapidapi': 1})
+        api = IndianRailwaysAPI(transport=PooledTransport(), router=ProviderRouter(),
+                                cache=ResponseCache(), rate_limiter=RateLimiter(quotas={}),
+                                provider_slots=slots)
+        api.rest_providers = ['rapidapi_journey', 'rapidapi']
+        api.apis['rapidapi_journey']['base_url'] = "http://127.0.0.1:9"
+        api.apis['rapidapi']['base_url'] = local_server
+
+        assert api._make_request("/x/")['path'] == "/x/"
+        stats = api.get_concurrency_stats()
+        assert stats['rapidapi_journey']['acquired'] == 1
+        assert stats['rapidapi'] == {'acquired': 1, 'waited': 0, 'in_flight': 0, 'peak': 1, 'limit': 1}
+
+
+class TestResponseCache:
+    """Test the tiered response cache."""
+
+    def test_lru_eviction(self):
+        """Test the size bound evicts the least recently used entry."""
+        cache = ResponseCache(max_entries=2)
+        cache.set('schedule', '1', {'n': 1})
+        cache.set('schedule', '2', {'n': 2})
+        cache.get('schedule', '1')
+        cache.set('schedule', '3', {'n': 3})
+
+        assert cache.get('schedule', '2') == (False, None)
+        assert cache.get('schedule', '1') == (True, {'n': 1})
+        assert cache.get_stats()['evictions'] == 1
+
+    def test_ttl_per_endpoint(self):
+        """Test volatile endpoints expire while static ones stay."""
+        cache = ResponseCache(ttls={'live_status': 0.01})
+        cache.set('live_status', '12301', {'delay': 5})
+        cache.set('schedule', '12301', {'route': []})
+        time.sleep(0.02)
+
+        assert cache.get('live_status', '12301')[0] is False
+        assert cache.get('schedule', '12301')[0] is True
+        assert cache.get_stats()['expirations'] == 1
+
+    def test_none_not_cached(self):
+        """Test failed fetches are retried rather than cached."""
+        cache = ResponseCache()
+        calls = []
+        fetch = lambda: calls.append(1)
+        cache.get_or_fetch('fare', 'k', fetch)
+        cache.get_or_fetch('fare', 'k', fetch)
+        assert len(calls) == 2
+
+    def test_hits_cannot_change_the_entry(self):
+        """Test callers get their own top level over read-only nested records."""
+        cache = ResponseCache()
+        first = cache.get_or_fetch('schedule', '12301', lambda: {'route': [{'code': 'NDLS'}]})
+        first['note'] = 'mine'
+        with pytest.raises(TypeError):
+            first['route'].append({'code': 'BCT'})
+        with pytest.raises(TypeError):
+            first['route'][0]['code'] = 'BCT'
+
+        assert cache.get('schedule', '12301') == (True, {'route': [{'code': 'NDLS'}]})
+        route = cache.get('schedule', '12301')[1]['route'].copy()
+        route.append({'code': 'BCT'})
+        assert len(route) == 2
+
+    def test_sqlite_tier_survives_restart(self, tmp_path):
+        """Test persistent endpoints are served from SQLite after a restart."""
+        db = str(tmp_path / "cache.db")
+        ResponseCache(sqlite_path=db).set('schedule', '12301', {'route': ['NDLS', 'BCT']})
+        ResponseCache(sqlite_path=db).set('live_status', '12301', {'delay': 5})
+
+        restarted = ResponseCache(sqlite_path=db)
+        assert restarted.get('schedule', '12301') == (True, {'route': ['NDLS', 'BCT']})
+        assert restarted.get('live_status', '12301')[0] is False
+        assert restarted.get_stats()['disk_hits'] == 1
+
+
+class TestSingleFlight:
+    """Test request coalescing."""
+
+    def test_threads_share_one_call(self):
+        """Test concurrent threads with the same key trigger one execution."""
+        flight = SingleFlight()
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            time.sleep(0.05)
+            return {'train_no': '12301'}
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(flight.do(('live', '12301'), fetch)))
+                   for _ in range(10)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        assert len(calls) == 1
+        assert results == [{'train_no': '12301'}] * 10
+        assert flight.get_stats()['coalesced'] == 9
+
+    def test_async_duplicates_coalesced(self):
+        """Test duplicate train numbers in one async board share a fetch."""
+        api = _SlowAPI()
+        flight = SingleFlight()
+        client = AsyncIndianRailwaysAPI(api, single_flight=flight)
+        asyncio.run(client.gather_live_status(["12301"] * 6 + ["12302"]))
+        client.close()
+
+        assert flight.get_stats()['executions'] == 2
+        assert flight.get_stats()['coalesced'] == 5
+
+    def test_errors_propagate_to_waiters(self):
+        """Test a failed leader raises in every coalesced caller."""
+        flight = SingleFlight()
+        with pytest.raises(RuntimeError):
+            flight.do('k', lambda: (_ for _ in ()).throw(RuntimeError("down")))
+        assert flight.get_stats()['in_flight'] == 0
+
+
+class TestProviderRouter:
+    """Test provider health scoring and circuit breakers."""
+
+    def test_breaker_opens_then_half_opens(self):
+        """Test repeated failures open the circuit until the cooldown elapses."""
+        router = ProviderRouter(failure_threshold=3, cooldown_s=0.05)
+        for _ in range(3):
+            router.record('railwayapi', False, 0.01)
+
+        assert router.state('railwayapi') == CircuitState.OPEN
+        assert router.rank(['railwayapi', 'indianrail']) == ['indianrail']
+
+        time.sleep(0.06)
+        assert router.rank(['railwayapi']) == ['railwayapi']
+        assert router.state('railwayapi') == CircuitState.HALF_OPEN
+        # Only one probe at a time while half-open
+        assert router.rank(['railwayapi']) == []
+
+        router.record('railwayapi', True, 0.01)
+        assert router.state('railwayapi') == CircuitState.CLOSED
+
+    def test_rank_prefers_healthy_fast_provider(self):
+        """Test ranking by error rate, then latency."""
+        router = ProviderRouter()
+        router.record('a', True, 0.9)
+        router.record('b', True, 0.1)
+        router.record('c', True, 0.05)
+        router.record('c', False, 0.05)
+        assert router.rank(['a', 'b', 'c']) == ['b', 'a', 'c']
+
+    def test_make_request_skips_open_provider(self, local_server):
+        """Test a dead provider is not retried while its circuit is open."""
+        router = ProviderRouter(failure_threshold=1, cooldown_s=60)
+        api = IndianRailwaysAPI(transport=PooledTransport(), router=router)
+        api.apis['rapidapi_journey']['base_url'] = "http://127.0.0.1:9"
+        api.apis['rapidapi']['base_url'] = local_server
+
+        assert api._make_request("/x/")['path'] == "/x/"
+        assert router.state('rapidapi_journey') == CircuitState.OPEN
+        assert api.current_api == 'rapidapi_journey'
+
+        assert api._make_request("/y/")['path'] == "/y/"
+        assert api.get_provider_health()['rapidapi_journey']['samples'] == 1
+
+    def test_journey_schedule_succeeds_only_once_parsed(self, local_server):
+        """Test a journey body without stops counts against the breaker and the slots are used."""
+        router = ProviderRouter(failure_threshold=2, cooldown_s=60)
+        api = IndianRailwaysAPI(transport=PooledTransport(), router=router, provider_slots=ProviderSlots(),
+                                rate_limiter=RateLimiter(quotas={}), cache=ResponseCache())
+        api.apis['rapidapi_journey']['base_url'] = local_server
+
+        schedule = api._fetch_journey_schedule('12951', '2026-10-16')
+        assert [stop['station_code'] for stop in schedule['stations']] == ['BCT', 'NDLS']
+        assert api._fetch_journey_schedule('11111', '2026-10-16') is None
+        assert api._fetch_journey_schedule('11112', '2026-10-16') is None
+        assert router.state('rapidapi_journey') == CircuitState.OPEN
+
+        # Open circuit: no request at all
+        assert api._fetch_journey_schedule('12951', '2026-10-16') is None
+        assert api.get_concurrency_stats()['rapidapi_journey']['acquired'] == 3
+
+
+class TestHedger:
+    """Test hedged requests."""
+
+    def _slow(self, delay, value):
+        def call():
+            time.sleep(delay)
+            return value
+        return call
+
+    def test_backup_wins_when_primary_is_slow(self):
+        """Test a slow primary is hedged and the faster backup wins."""
+        hedger = Hedger()
+        start = time.perf_counter()
+        result = hedger.call(self._slow(0.5, 'primary'), self._slow(0.01, 'backup'), hedge_after=0.05)
+
+        assert result == 'backup'
+        assert time.perf_counter() - start < 0.3
+        assert hedger.get_stats()['hedge_wins'] == 1
+
+    def test_no_hedge_when_primary_is_fast(self):
+        """Test a primary answering within its p90 sends no extra request."""
+        hedger = Hedger()
+        backup_calls = []
+        result = hedger.call(lambda: 'primary', lambda: backup_calls.append(1), hedge_after=0.5)
+
+        assert result == 'primary'
+        assert backup_calls == []
+        assert hedger.get_stats()['hedges_sent'] == 0
+
+    def test_budget_bounds_hedges(self):
+        """Test hedges stop once the budget is spent."""
+        hedger = Hedger(HedgeBudget(ratio=0.0, burst=1.0))
+        for _ in range(3):
+            hedger.call(self._slow(0.05, 'p'), self._slow(0.0, 'b'), hedge_after=0.01)
+
+        stats = hedger.get_stats()
+        assert stats['hedges_sent'] == 1
+        assert stats['budget_denied'] == 2
+
+
+NTES_SAMPLE = Path(__file__).parent.parent / "data" / "ntes_samples" / "running_status_12951.html"
+
+
+class TestNTESParser:
+    """Test the single-pass NTES running-status parser."""
+
+    def test_parses_recorded_page(self):
+        """Test header fields and events from a recorded page."""
+        result = parse_ntes_running_status(NTES_SAMPLE.read_text())
+
+        assert result['start_date'] == "15-Oct-2026"
+        assert result['last_update'] == datetime(2026, 10, 16, 8, 20)
+        assert result['events'][0]['type'] == "Departed"
+        assert result['events'][0]['code'] == "NDLS"
+        assert result['events'][-1]['station'] == "Mumbai Central"
+        # Text inside <script> blocks is never treated as status
+        assert all(event['code'] not in ("XXX", "SCR") for event in result['events'])
+
+    def test_event_dates_and_duplicates(self):
+        """Test partial dates take the last-update year and repeated lines collapse."""
+        html = (
+            "<div>Last Updates On 02-Jan-2027 01:10</div>\r\n"
+            "<td>ARRIVED AT Kota Jn (KOTA) 23:58 31-Dec Delay: (01:05)</td>\r\n"
+            "<td>ARRIVED AT Kota Jn (KOTA) 23:58 31-Dec Delay: (01:05)</td>\r\n"
+            "<td>Departed from Kota Jn (KOTA)</td>\r\n"
+        )
+        events = parse_ntes_running_status(html)['events']
+
+        assert len(events) == 2
+        assert events[0]['type'] == "Arrived"
+        assert events[0]['datetime'] == datetime(2027, 12, 31, 23, 58)
+        assert events[0]['delay'] == "01:05"
+        assert events[1]['datetime'] == datetime(2027, 1, 2, 0, 0)
+
+
+def _event(station, hour, event_type='Departed', delay='00:05'):
+    return {'raw': f"{event_type} {station}", 'type': event_type, 'station': station,
+            'code': station[:3].upper(), 'datetime': datetime(2026, 10, 15, hour, 0), 'delay': delay}
+
+
+class TestEventCursorStore:
+    """Test incremental NTES event diffing."""
+
+    def test_only_new_events_returned(self):
+        """Test successive polls return just the events added since the last one."""
+        store = EventCursorStore()
+        history = [_event('Delhi', 16), _event('Mathura', 18)]
+        first = store.advance('12951', '15-Oct-2026', history)
+        assert len(first['new_events']) == 2
+        assert first['current_position']['current_station'] == 'Mathura'
+
+        history = history + [_event('Kota', 21, delay='01:10')]
+        second = store.advance('12951', '15-Oct-2026', history)
+        assert [e['station'] for e in second['new_events']] == ['Kota']
+        assert second['current_position']['delay_minutes'] == 70
+
+        third = store.advance('12951', '15-Oct-2026', history)
+        assert third['new_events'] == []
+        assert third['current_position']['current_station'] == 'Kota'
+
+    def test_cursor_per_run_and_consumer(self):
+        """Test a new start date or another consumer starts from scratch."""
+        store = EventCursorStore()
+        history = [_event('Delhi', 16)]
+        store.advance('12951', '15-Oct-2026', history)
+
+        assert len(store.advance('12951', '16-Oct-2026', history)['new_events']) == 1
+        assert len(store.advance('12951', '15-Oct-2026', history, consumer='ui')['new_events']) == 1
+
+    def test_history_mismatch_resets(self):
+        """Test a history that no longer contains the cursor is returned in full."""
+        store = EventCursorStore()
+        store.advance('12951', 'd', [_event('Delhi', 16)])
+        update = store.advance('12951', 'd', [_event('Agra', 19), _event('Gwalior', 20)])
+        assert update['is_reset'] is True
+        assert len(update['new_events']) == 2
+
+
+class TestStationIndex:
+    """Test cases for the fuzzy station resolver."""
+
+    def setup_method(self):
+        self.index = StationIndex(
+            [('JP', 'Jaipur'), ('JU', 'Jodhpur'), ('NDLS', 'New Delhi'), ('SBC', 'Bangalore City')],
+            {'delhi': 'NDLS', 'bengaluru': 'SBC'}
+        )
+
+    def test_exact_substring_and_alias(self):
+        """Test exact names, codes, aliases and partial names resolve."""
+        assert self.index.resolve('Jaipur') == 'JP'
+        assert self.index.resolve('ndls') == 'NDLS'
+        assert self.index.resolve('Bengaluru') == 'SBC'
+        assert self.index.resolve('jod') == 'JU'
+        assert self.index.resolve('Jaipur City') == 'JP'
+
+    def test_typos_within_bound(self):
+        """Test typo matches are bounded by the edit distance."""
+        assert self.index.resolve('jodpur') == 'JU'
+        assert self.index.resolve('bangalor city') == 'SBC'
+        assert self.index.resolve('xyzzy') is None
+        assert self.index.resolve('jodpur', max_distance=0) is None
+
+    def test_ranking_prefers_better_tiers(self):
+        """Test exact matches rank ahead of typo matches and codes are not repeated."""
+        results = self.index.search('delhi', limit=5)
+        assert results[0]['code'] == 'NDLS'
+        assert len({r['code'] for r in results}) == len(results)
+
+    def test_api_uses_index(self):
+        """Test the API client resolves codes from the injected index without network calls."""
+        api = IndianRailwaysAPI(station_index=self.index, cache=ResponseCache())
+        assert api.get_station_code('Jodhpr') == 'JU'
+
+
+class TestRateLimiter:
+    """Test per-provider quotas, priority shedding and 429 backoff."""
+
+    def test_low_priority_shed_before_high(self):
+        """Test fare/PNR traffic stops at the reserve while live status still gets tokens."""
+        limiter = RateLimiter(quotas={'p': (0.01, 4.0)})
+        assert limiter.acquire('p', Priority.LOW)
+        assert limiter.acquire('p', Priority.LOW)
+        assert not limiter.acquire('p', Priority.LOW)
+        assert limiter.acquire('p', Priority.HIGH)
+        assert limiter.acquire('p', Priority.HIGH)
+        assert limiter.get_stats()['p']['shed'] == 1
+
+    def test_retry_after_blocks_bucket(self):
+        """Test a 429 blocks the bucket for the Retry-After period, even for high priority."""
+        limiter = RateLimiter(quotas={'p': (100.0, 10.0)})
+        assert limiter.throttled('p', parse_retry_after('30')) == 30
+        assert not limiter.acquire('p', Priority.HIGH)
+        assert limiter.get_stats()['p']['throttled'] == 1
+
+    def test_unmetered_and_aliased_providers(self):
+        """Test providers without a quota pass and aliases share one bucket."""
+        limiter = RateLimiter(quotas={'rapidapi': (0.01, 1.0)})
+        assert limiter.acquire('ntes', Priority.LOW)
+        assert limiter.acquire('rapidapi', Priority.HIGH)
+        assert not limiter.acquire('rapidapi_journey', Priority.HIGH)
+
+    def test_sqlite_budget_shared_between_limiters(self, tmp_path):
+        """Test two limiters (as in two processes) draw from one SQLite-backed budget."""
+        path = str(tmp_path / "limits.db")
+        first = RateLimiter(quotas={'p': (0.01, 2.0)}, store=SQLiteBucketStore(path))
+        second = RateLimiter(quotas={'p': (0.01, 2.0)}, store=SQLiteBucketStore(path))
+        assert first.acquire('p', Priority.HIGH)
+        assert second.acquire('p', Priority.HIGH)
+        assert not first.acquire('p', Priority.HIGH)
+
+    def test_429_does_not_trip_breaker(self, local_server):
+        """Test a throttled provider is backed off on quota without opening its circuit."""
+        router = ProviderRouter(failure_threshold=1)
+        limiter = RateLimiter(quotas={'rapidapi': (100.0, 10.0)})
+        api = IndianRailwaysAPI(transport=PooledTransport(), router=router, rate_limiter=limiter,
+                                cache=ResponseCache())
+        api.rest_providers = ['rapidapi_journey']
+        api.apis['rapidapi_journey']['base_url'] = local_server
+
+        assert api._make_request("/throttled/") is None
+        assert router.state('rapidapi_journey') == CircuitState.CLOSED
+        assert api.get_rate_limit_stats()['rapidapi']['blocked_for_s'] > 25
+        assert api._make_request("/ok/", priority=Priority.HIGH) is None
+
+
+class TestReplayHarness:
+    """Test the offline record/replay transport."""
+
+    def test_record_then_replay(self, local_server, tmp_path):
+        """Test a recorded response is served back without the server."""
+        store = FixtureStore(tmp_path)
+        recorder = record_transport(store)
+        live = recorder.get('local', f"{local_server}/live/train/12951/date/15-10-2026/").json()
+        recorder.close()
+
+        replay = replay_transport(FixtureStore(tmp_path))
+        # Another day, same train: dates are normalised out of the key
+        response = replay.get('local', f"{local_server}/live/train/12951/date/16-10-2026/")
+        assert response.status_code == 200
+        assert response.json() == live
+        assert replay.get('local', f"{local_server}/live/train/99999/").status_code == 404
+        assert replay.replay.stats == {'served': 1, 'misses': 1, 'injected_errors': 0}
+
+    def test_ntes_key_ignores_csrf_fields(self):
+        """Test NTES POST keys depend on the train, not on the CSRF token or timestamp."""
+        url = "https://enquiry.indianrail.gov.in/mntes/tr?opt=TrainRunning&refDate=16-Oct-2026"
+        first = fixture_key('POST', url, "trainNo=12951&jDate=16-Oct-2026&abc123=tok1")
+        second = fixture_key('POST', url, "trainNo=12951&jDate=17-Oct-2026&xyz789=tok2")
+        other = fixture_key('POST', url, "trainNo=12301&jDate=16-Oct-2026&abc123=tok1")
+        assert first == second
+        assert first != other
+
+    def test_error_injection_and_latency(self, tmp_path):
+        """Test injected failures surface as errors to the client stack."""
+        transport = replay_transport(FixtureStore(tmp_path), latency_s=0.02, error_rate=1.0, seed=1)
+        router = ProviderRouter()
+        api = IndianRailwaysAPI(transport=transport, router=router, cache=ResponseCache(),
+                                rate_limiter=RateLimiter(quotas={}))
+        start = time.perf_counter()
+        assert api._make_request("/live/train/12951/") is None
+        assert time.perf_counter() - start >= 0.04
+        assert transport.replay.stats['injected_errors'] == 2
+        assert api.get_provider_health()['rapidapi_journey']['error_rate'] == 1.0
+
+
+class TestMockData:
+    """Test the file-backed offline fallback data."""
+
+    def test_fixture_views_share_frozen_records(self):
+        """Test fixtures are returned as views: own top level, shared read-only records."""
+        store = MockDataStore()
+        first = store.journey_schedule('20844')
+        second = store.journey_schedule('20844')
+
+        assert first['train_name'] == 'Express Train 20844'
+        assert first['stations'] is second['stations']
+        first['overall_delay'] = 30
+        assert second['overall_delay'] == 0
+        with pytest.raises(TypeError):
+            first['stations'][0]['delay'] = 5
+        assert json.loads(json.dumps(first))['stations'][0]['station_code'] == 'NDLS'
+
+    def test_generated_journey_is_deterministic(self):
+        """Test unknown trains get the same generated journey across stores (reruns)."""
+        first = MockDataStore().journey_schedule('54321')
+        second = MockDataStore().journey_schedule('54321')
+        assert first == second
+        assert 6 <= first['total_stations'] <= 8
+        assert MockDataStore().journey_schedule('54322') != first
+
+    def test_api_fallbacks_use_store(self):
+        """Test the API's mock helpers are served from the store."""
+        api = IndianRailwaysAPI(mock_data=MockDataStore())
+        assert api._get_mock_schedule('12301')['to_station'] == 'Mumbai Central'
+        assert api._get_mock_train_fare('12301', 'NDLS', 'BCT', '3A')['total_fare'] == 1375
+        assert api._get_mock_status('00000') == {}
+
+
+class TestPrefetch:
+    """Test predictive cache warming."""
+
+    def _api(self):
+        api = IndianRailwaysAPI(cache=ResponseCache(), single_flight=SingleFlight(), demand=DemandTracker())
+        api.fetched = []
+        api._fetch_journey_schedule = lambda train_no, date: api.fetched.append(train_no) or {'train_no': train_no}
+        return api
+
+    def test_ranks_upcoming_and_popular_trains(self):
+        """Test trains departing soon and recently queried trains are prefetched within budget."""
+        api = self._api()
+        now = datetime.now()
+        minute = now.hour * 60 + now.minute
+        for _ in range(4):
+            api.demand.record('journey_schedule', '333')
+        prefetcher = PrefetchScheduler(api, departures=[('111', minute + 30), ('222', minute + 600)],
+                                       budget=2)
+
+        assert prefetcher.candidates('journey_schedule')[:2] == ['333', '111']
+        assert prefetcher.run_once() == 2
+        assert sorted(api.fetched) == ['111', '333']
+
+        # Already cached: the next cycle spends nothing
+        assert prefetcher.run_once() == 0
+        assert prefetcher.get_stats()['skipped_cached'] == 2
+
+    def test_hit_rate_counts_prefetched_queries(self):
+        """Test user queries served by a prefetched entry are reported as hits."""
+        api = self._api()
+        now = datetime.now()
+        prefetcher = PrefetchScheduler(api, departures=[('111', now.hour * 60 + now.minute + 5)])
+        prefetcher.run_once()
+
+        api.get_train_journey_schedule('111')
+        api.get_train_journey_schedule('444')
+        stats = api.get_prefetch_stats()
+        assert api.fetched == ['111', '444']
+        assert stats['queries'] == 2
+        assert stats['prefetch_hits'] == 1
+        assert stats['hit_rate'] == 0.5
+
+
+def _chunked(payload, size):
+    data = json.dumps(payload).encode()
+    return (data[i:i + size] for i in range(0, len(data), size))
+
+
+class TestJSONStream:
+    """Test incremental decoding of provider payloads."""
+
+    def test_events_match_full_decode(self):
+        """Test tiny chunks (splitting numbers, strings and UTF-8) decode like json.loads."""
+        payload = {'response_code': 200, 'total': 123456,
+                   'stations': [{'name': 'Hazrat Nizamuddin', 'distance': 1386.25, 'note': 'नई दिल्ली'}
+                                for _ in range(5)],
+                   'empty': [], 'journey': []}
+        events = list(iter_json_events(_chunked(payload, 3), ('stations', 'journey')))
+
+        items = [value for kind, key, value in events if kind == 'item']
+        fields = {key: value for kind, key, value in events if kind == 'field'}
+        assert items == payload['stations']
+        assert fields == {'response_code': 200, 'total': 123456, 'empty': [], 'journey': []}
+
+    def test_limit_stops_reading(self):
+        """Test decoding stops once the limit is reached, leaving later chunks unread."""
+        payload = {'trains': [{'number': str(i)} for i in range(1000)]}
+        chunks = _chunked(payload, 64)
+        trains = list(iter_json_array(chunks, ('trains',), limit=10))
+        assert [train['number'] for train in trains] == [str(i) for i in range(10)]
+        assert next(chunks, None) is not None
+
+    def test_api_between_stations_limit(self, local_server):
+        """Test the between-stations call streams and returns only the first `limit` trains."""
+        api = IndianRailwaysAPI(transport=PooledTransport(), cache=ResponseCache())
+        api.rest_providers = ['rapidapi']
+        api.apis['rapidapi']['base_url'] = local_server
+
+        trains = api.get_all_trains_between_stations('NDLS', 'BCT', '16-10-2026', limit=10)
+        assert [train['number'] for train in trains] == [str(12000 + i) for i in range(10)]
+        assert len(api.get_all_trains_between_stations('NDLS', 'BCT', '16-10-2026')) == 200
+        # The full list is cached and now serves limited calls too
+        assert len(api.get_all_trains_between_stations('NDLS', 'BCT', '16-10-2026', limit=5)) == 5
+
+
+class TestMetrics:
+    """Test the outbound call metrics registry."""
+
+    def test_histogram_percentiles(self):
+        """Test percentiles are interpolated from the fixed buckets."""
+        histogram = LatencyHistogram()
+        for ms in range(1, 101):
+            histogram.observe(ms / 1000)
+        assert 0.045 <= histogram.percentile(50) <= 0.055
+        assert 0.09 <= histogram.percentile(95) <= 0.1
+        assert histogram.percentile(99) <= histogram.max == 0.1
+
+    def test_endpoint_label(self):
+        """Test URLs collapse to their first meaningful path segment."""
+        assert endpoint_label("https://x/v2/live/train/12301/") == 'live'
+        assert endpoint_label("https://enquiry.indianrail.gov.in/mntes/tr?opt=x") == 'tr'
+        assert endpoint_label("https://x/12301/schedule") == ':id'
+
+    def test_transport_records_calls(self, local_server):
+        """Test every request through the transport is timed, sized and classified."""
+        metrics = MetricsRegistry()
+        transport = PooledTransport(metrics=metrics)
+        transport.get('local', f"{local_server}/live/train/1/")
+        transport.get('local', f"{local_server}/throttled/")
+        with pytest.raises(requests.exceptions.ConnectionError):
+            transport.get('down', "http://127.0.0.1:1/live/")
+        transport.close()
+
+        stats = metrics.get_stats()
+        assert stats['local']['live']['calls'] == 1
+        assert stats['local']['live']['bytes_received'] > 0
+        assert stats['local']['throttled']['errors_by_class'] == {'HTTP 429': 1}
+        assert stats['down']['live']['errors_by_class'] == {'ConnectionError': 1}
+
+    def test_text_export_is_scrapable(self):
+        """Test the /metrics endpoint serves the text exposition."""
+        metrics = MetricsRegistry()
+        with pytest.raises(TimeoutError):
+            with metrics.timed('cloud:firebase', 'publish_train_status'):
+                raise TimeoutError()
+        metrics.retry('cloud:firebase', 'publish_train_status')
+
+        server = start_metrics_server(0, metrics)
+        try:
+            text = requests.get(f"http://127.0.0.1:{server.server_address[1]}/metrics", timeout=5).text
+        finally:
+            server.shutdown()
+        labels = 'provider="cloud:firebase",endpoint="publish_train_status"'
+        assert f'railway_call_duration_seconds_count{{{labels}}} 1' in text
+        assert f'railway_call_errors_total{{{labels},error="TimeoutError"}} 1' in text
+        assert f'railway_call_retries_total{{{labels}}} 1' in text